@@ -0,0 +1,237 @@
+"""Per-run agent context shared by all tools in a single agent run."""
+
+import asyncio
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    DefaultDict,
+    Dict,
+    List,
+    Optional,
+    Set,
+)
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal, ReadSessionLocal
+from models.models import Goal, GoalData
+from services.read_models import GOAL_COLUMNS, GoalRow
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AgentContext:
+    """Context passed to all agent tools containing user-specific data.
+
+    Also the unit of work for one agent run: write tools share one lazily
+    opened session via db(), and the run is committed (or rolled back) once
+    when it finishes. Read-only tools use read_db() and can run in parallel;
+    they are served by a read replica (when configured) until the run
+    writes, then by the primary, so the run always reads its own writes.
+    Wrap Runner.run / Runner.run_streamed in `async with context:`.
+
+    The user's goals and their agent data are loaded in one query on first
+    use and kept for the run as GoalRow read models, so ownership checks and
+    repeated reads in a tool chain are answered from memory. Tools that
+    write goals update the cache through cache_goal / cache_goal_data.
+    """
+
+    user_id: str
+    # Per-run cache of the user's goals and goal data (None until loaded)
+    goals: Optional[Dict[int, GoalRow]] = None
+    goal_data: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    # DB queries answered from the cache instead, reported when the run ends
+    queries_saved: int = 0
+    # Skills this run created or updated; the shared skill catalog only
+    # sees them once the run commits
+    skills_written: Set[int] = field(default_factory=set)
+    _session: Optional[AsyncSession] = field(default=None, repr=False)
+    _has_writes: bool = field(default=False, repr=False)
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+    _cache_lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+    _goal_locks: DefaultDict[int, asyncio.Lock] = field(
+        default_factory=lambda: defaultdict(asyncio.Lock), repr=False
+    )
+    _after_commit: List[Callable[[], Awaitable[None]]] = field(
+        default_factory=list, repr=False
+    )
+    _after_rollback: List[Callable[[], Awaitable[None]]] = field(
+        default_factory=list, repr=False
+    )
+
+    @asynccontextmanager
+    async def db(self, goal_id: Optional[int] = None) -> AsyncIterator[AsyncSession]:
+        """Yield the run's shared session for a write.
+
+        Writes touching the same goal are serialized by that goal's lock, and
+        all writes take turns on the single session. Each block runs in a
+        savepoint: a failing tool call rolls back only its own changes and
+        the rest of the run can still commit.
+        """
+        async with self._goal_lock(goal_id):
+            self._has_writes = True
+            async with self._lock:
+                if self._session is None:
+                    self._session = AsyncSessionLocal(info={"unit_of_work": True})
+                async with self._session.begin_nested():
+                    yield self._session
+
+    @asynccontextmanager
+    async def read_db(self, goal_id: Optional[int] = None) -> AsyncIterator[AsyncSession]:
+        """Yield a session for a read-only tool.
+
+        Until the run has written anything, reads use their own pooled
+        session (on a replica when configured) so parallel read tools run
+        concurrently. After the first write to the run's session they go
+        through it to see its uncommitted changes. A read of a goal waits
+        for in-flight writes to that goal.
+        """
+        async with self._goal_lock(goal_id):
+            if not self._has_writes:
+                async with ReadSessionLocal() as session:
+                    yield session
+                return
+            async with self._lock:
+                if self._session is None:
+                    self._session = AsyncSessionLocal(info={"unit_of_work": True})
+                yield self._session
+
+    def shareable(self, db: AsyncSession) -> bool:
+        """Whether results read through db may go into caches shared with
+        other runs: not once this run has written skills, not when read
+        through the run's session (its writes may still be rolled back), and
+        not when read from a replica (it may lag behind an invalidation)."""
+        return (
+            not self.skills_written
+            and not db.info.get("unit_of_work")
+            and "replica" not in db.info
+        )
+
+    def _goal_lock(self, goal_id: Optional[int]) -> Any:
+        """Lock ordering operations on one goal (no-op when goal_id is None)."""
+        if goal_id is None:
+            return nullcontext()
+        return self._goal_locks[goal_id]
+
+    async def load_goals(self, db: AsyncSession) -> List[GoalRow]:
+        """Get all of the user's goals, loading them with their data on first use."""
+        if not await self._load_goals(db):
+            self.queries_saved += 1
+        return list(self.goals.values())
+
+    async def _load_goals(self, db: AsyncSession) -> bool:
+        """Fill the goal cache with one query (once, even under parallel
+        calls); returns whether this call ran it."""
+        if self.goals is not None:
+            return False
+        async with self._cache_lock:
+            if self.goals is not None:
+                return False
+            result = await db.execute(
+                self._goal_query()
+                .where(Goal.user_id == int(self.user_id))
+                .order_by(Goal.id)
+            )
+            self.goals = {}
+            for row in result.all():
+                self._cache_loaded(row)
+            return True
+
+    async def get_goal(self, db: AsyncSession, goal_id: int) -> GoalRow:
+        """Get a goal owned by the user, checking ownership from the run cache."""
+        loaded = await self._load_goals(db)
+        goal = self.goals.get(goal_id)
+        if goal is not None:
+            # A saving only if the cache answered without a query just now
+            if not loaded:
+                self.queries_saved += 1
+            return goal
+
+        # Not in the cache: missing, someone else's, or created mid-run elsewhere
+        result = await db.execute(self._goal_query().where(Goal.id == goal_id))
+        row = result.one_or_none()
+        if not row:
+            raise ValueError(f"Goal {goal_id} not found")
+        if row.user_id != int(self.user_id):
+            raise ValueError(f"Goal {goal_id} does not belong to user {self.user_id}")
+        return self._cache_loaded(row)
+
+    async def get_goal_data(self, db: AsyncSession, goal_id: int) -> Dict[str, Any]:
+        """Get a goal's agent data (empty if it has none) from the run cache;
+        loaded with the goal, so one lookup (and at most one saving) in all."""
+        await self.get_goal(db, goal_id)
+        return self.goal_data[goal_id]
+
+    @staticmethod
+    def _goal_query() -> Any:
+        """Goal columns and agent data, without hydrating ORM objects"""
+        return select(*GOAL_COLUMNS, GoalData.agent_data).outerjoin(
+            GoalData, GoalData.goal_id == Goal.id
+        )
+
+    def _cache_loaded(self, row: Any) -> GoalRow:
+        """Cache a goal row loaded together with its agent data."""
+        goal = GoalRow(*row[:-1])
+        if self.goals is None:
+            self.goals = {}
+        self.goals[goal.id] = goal
+        self.cache_goal_data(goal.id, row[-1])
+        return goal
+
+    def cache_goal(self, goal: Goal) -> None:
+        """Add or replace a goal in the run cache after a tool wrote it."""
+        if self.goals is None:
+            self.goals = {}
+        self.goals[goal.id] = GoalRow.from_goal(goal)
+
+    def cache_goal_data(self, goal_id: int, data: Optional[Dict[str, Any]]) -> None:
+        """Replace a goal's cached agent data with what is now stored."""
+        self.goal_data[goal_id] = data or {}
+
+    def after_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Run callback once the run's writes are committed (e.g. cache invalidation)."""
+        self._after_commit.append(callback)
+
+    def after_rollback(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Run callback if the run's writes are rolled back (e.g. cache invalidation)."""
+        self._after_rollback.append(callback)
+
+    async def _run_callbacks(self, callbacks: List[Callable[[], Awaitable[None]]]) -> None:
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                logger.error(f"Agent run callback failed: {e}", exc_info=True)
+
+    async def __aenter__(self) -> "AgentContext":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """Commit the run's work if it finished cleanly, otherwise roll it back."""
+        if self.queries_saved:
+            logger.info(
+                f"Agent run for user {self.user_id} saved {self.queries_saved} DB queries"
+            )
+        if self._session is None:
+            return
+        try:
+            if exc_type is None:
+                await self._session.commit()
+                await self._run_callbacks(self._after_commit)
+            else:
+                logger.warning(
+                    f"Rolling back agent run for user {self.user_id}: {exc_type.__name__}"
+                )
+                await self._session.rollback()
+                await self._run_callbacks(self._after_rollback)
+        finally:
+            await self._session.close()
+            self._session = None
@@ -1,23 +1,31 @@
-import os
-import json
-import httpx
-from dataclasses import dataclass
-from datetime import datetime
-from pathlib import Path
+from datetime import datetime, timezone
+from typing import Dict, List
 from pydantic import BaseModel, Field
+from sqlalchemy import and_
 from agents import function_tool, RunContextWrapper
+from ai.context import AgentContext
 from database import AsyncSessionLocal
 from services import (
     user_crud,
     user_preference_crud,
     goal_crud,
     goal_data_crud,
+    goal_event_crud,
     message_crud,
     scheduled_message_crud,
     skill_crud,
     goal_skill_crud,
+    skill_search_cache,
 )
-from models.models import MessageRole, MessageStatus
+from services.cache import normalize_query
+from prompts.docs import reference_docs
+from services.catalog import SkillEntry, skill_catalog
+from services.counters import skill_usage
+from services.serialization import dumps, loads
+from services.web_search import FETCH_CHARACTERS, exa_client, trim_results
+from services.dedup import prompt_fingerprint
+from services.embeddings import skill_embedding_index, skill_text
+from models.models import User, Goal, Skill, MessageRole, MessageStatus
 
 
 class JsonData(BaseModel):
@@ -29,185 +37,200 @@ class JsonData(BaseModel):
     data: str = Field(description="JSON string containing the data")
 
 
-@dataclass
-class AgentContext:
-    """Context passed to all agent tools containing user-specific data."""
-
-    user_id: str
-
-
 @function_tool
 # User context (read/write)
 async def update_user_preferences(
-    wrapper: RunContextWrapper[AgentContext], data_json: str
+    wrapper: RunContextWrapper[AgentContext], data_json: str, deep_merge: bool = False
 ) -> None:
-    """Update user preferences with the provided data as a JSON string."""
-    import json
+    """Update user preferences with the provided data as a JSON string.
 
+    Top-level keys are merged into the existing preferences. Set deep_merge
+    to also merge nested objects instead of replacing them.
+    """
     user_id = int(wrapper.context.user_id)
-    data = json.loads(data_json)
+    data = loads(data_json)
 
-    async with AsyncSessionLocal() as db:
-        # Get user to verify they exist
-        user = await user_crud.get(db, user_id)
-        if not user:
+    async with wrapper.context.db() as db:
+        # Single upsert: merges into existing preferences or creates them,
+        # guarded on the user existing
+        merged = await user_preference_crud.jsonb_merge(
+            db,
+            user_id,
+            "agent_data",
+            data,
+            deep=deep_merge,
+            upsert_on="user_id",
+            guard=User.id == user_id,
+        )
+        if merged is None:
             raise ValueError(f"User {user_id} not found")
 
-        # Get or create user preferences
-        prefs = await user_preference_crud.get_by(db, user_id=user_id)
-        if prefs:
-            # Update existing preferences
-            current_data = prefs.agent_data or {}
-            current_data.update(data)
-            await user_preference_crud.update(db, prefs.id, agent_data=current_data)
-        else:
-            # Create new preferences
-            await user_preference_crud.create(db, user_id=user_id, agent_data=data)
-
 
 @function_tool
 # Goals metadata (read-only)
 async def list_goals(wrapper: RunContextWrapper[AgentContext]) -> str:
     """List all goals for the current user with their progress data. Returns JSON string."""
-    import json
-
-    user_id = int(wrapper.context.user_id)
-
-    async with AsyncSessionLocal() as db:
-        goals = await goal_crud.get_all(db, user_id=user_id)
-        result = []
-        for goal in goals:
-            goal_data = await goal_data_crud.get_by(db, goal_id=goal.id)
-            result.append({
+    async with wrapper.context.read_db() as db:
+        # Served from the run cache after the first goal lookup
+        goals = await wrapper.context.load_goals(db)
+        result = [
+            {
                 "id": goal.id,
                 "title": goal.title,
-                "status": goal.status.value,
-                "created_at": goal.created_at.isoformat(),
-                "updated_at": goal.updated_at.isoformat(),
-                "data": goal_data.agent_data if goal_data and goal_data.agent_data else {},
-            })
-        return json.dumps(result)
+                "status": goal.status,
+                "created_at": goal.created_at,
+                "updated_at": goal.updated_at,
+                "data": wrapper.context.goal_data.get(goal.id, {}),
+            }
+            for goal in goals
+        ]
+        return dumps(result)
 
 
 @function_tool
 async def get_goal(wrapper: RunContextWrapper[AgentContext], goal_id: int) -> str:
     """Get a specific goal by ID. Returns JSON string."""
-    import json
-
-    user_id = int(wrapper.context.user_id)
-
-    async with AsyncSessionLocal() as db:
-        goal = await goal_crud.get(db, goal_id)
-        if not goal:
-            raise ValueError(f"Goal {goal_id} not found")
-
-        # Verify goal belongs to user
-        if goal.user_id != user_id:
-            raise ValueError(f"Goal {goal_id} does not belong to user {user_id}")
+    async with wrapper.context.read_db(goal_id=goal_id) as db:
+        # Verify goal belongs to user (answered from the run cache)
+        goal = await wrapper.context.get_goal(db, goal_id)
 
         result = {
             "id": goal.id,
             "title": goal.title,
-            "status": goal.status.value,
-            "created_at": goal.created_at.isoformat(),
-            "updated_at": goal.updated_at.isoformat(),
+            "status": goal.status,
+            "created_at": goal.created_at,
+            "updated_at": goal.updated_at,
             "meta_data": goal.meta_data,
         }
-        return json.dumps(result)
+        return dumps(result)
 
 
 @function_tool
 # Goal data (read/write, full autonomy)
 async def get_goal_data(wrapper: RunContextWrapper[AgentContext], goal_id: int) -> str:
     """Get the agent data for a specific goal. Returns JSON string."""
-    import json
-
-    user_id = int(wrapper.context.user_id)
-
-    async with AsyncSessionLocal() as db:
-        # Verify goal belongs to user
-        goal = await goal_crud.get(db, goal_id)
-        if not goal:
-            raise ValueError(f"Goal {goal_id} not found")
-        if goal.user_id != user_id:
-            raise ValueError(f"Goal {goal_id} does not belong to user {user_id}")
-
-        # Get goal data
-        goal_data = await goal_data_crud.get_by(db, goal_id=goal_id)
-        if not goal_data:
-            return json.dumps({})
-
-        return json.dumps(goal_data.agent_data or {})
+    async with wrapper.context.read_db(goal_id=goal_id) as db:
+        # Ownership check and data both come from the run cache
+        data = await wrapper.context.get_goal_data(db, goal_id)
+        return dumps(data)
 
 
 @function_tool
 async def update_goal_data(
-    wrapper: RunContextWrapper[AgentContext], goal_id: int, data_json: str
+    wrapper: RunContextWrapper[AgentContext],
+    goal_id: int,
+    data_json: str,
+    deep_merge: bool = False,
 ) -> None:
-    """Update the agent data for a specific goal. Provide data as JSON string."""
-    import json
+    """Update the agent data for a specific goal. Provide data as JSON string.
 
+    Top-level keys are merged into the existing data. Set deep_merge to also
+    merge nested objects (e.g. a partial snapshot) instead of replacing them.
+    """
     user_id = int(wrapper.context.user_id)
-    data = json.loads(data_json)
-
-    async with AsyncSessionLocal() as db:
-        # Verify goal belongs to user
-        goal = await goal_crud.get(db, goal_id)
-        if not goal:
-            raise ValueError(f"Goal {goal_id} not found")
-        if goal.user_id != user_id:
-            raise ValueError(f"Goal {goal_id} does not belong to user {user_id}")
-
-        # Get or create goal data
-        goal_data = await goal_data_crud.get_by(db, goal_id=goal_id)
-        if goal_data:
-            # Update existing data
-            current_data = goal_data.agent_data or {}
-            current_data.update(data)
-            await goal_data_crud.update(db, goal_data.id, agent_data=current_data)
-        else:
-            # Create new goal data
-            await goal_data_crud.create(db, goal_id=goal_id, agent_data=data)
+    data = loads(data_json)
+
+    async with wrapper.context.db(goal_id=goal_id) as db:
+        # Single upsert guarded on goal ownership
+        merged = await goal_data_crud.jsonb_merge(
+            db,
+            goal_id,
+            "agent_data",
+            data,
+            deep=deep_merge,
+            upsert_on="goal_id",
+            guard=and_(Goal.id == goal_id, Goal.user_id == user_id),
+        )
+        if merged is None:
+            raise ValueError(
+                f"Goal {goal_id} not found or does not belong to user {user_id}"
+            )
+        wrapper.context.cache_goal_data(goal_id, merged)
 
 
 @function_tool
 async def append_goal_event(
     wrapper: RunContextWrapper[AgentContext], goal_id: int, event_json: str
 ) -> None:
-    """Append an event to the goal's event log in agent_data. Provide event as JSON string."""
-    import json
-
+    """Append an event to the goal's event log. Provide event as JSON string."""
     user_id = int(wrapper.context.user_id)
-    event = json.loads(event_json)
-
-    async with AsyncSessionLocal() as db:
-        # Verify goal belongs to user
-        goal = await goal_crud.get(db, goal_id)
-        if not goal:
-            raise ValueError(f"Goal {goal_id} not found")
-        if goal.user_id != user_id:
-            raise ValueError(f"Goal {goal_id} does not belong to user {user_id}")
-
-        # Get or create goal data
-        goal_data = await goal_data_crud.get_by(db, goal_id=goal_id)
-
-        # Add timestamp to event
-        event["timestamp"] = datetime.utcnow().isoformat()
-
-        if goal_data:
-            # Append to existing events
-            current_data = goal_data.agent_data or {}
-            events = current_data.get("events", [])
-            events.append(event)
-            current_data["events"] = events
-            await goal_data_crud.update(db, goal_data.id, agent_data=current_data)
-        else:
-            # Create new goal data with event
-            await goal_data_crud.create(
-                db, goal_id=goal_id, agent_data={"events": [event]}
+    event = loads(event_json)
+    event_type = str(event.pop("type", "event"))
+    # Timestamp is recorded by the event log itself
+    event.pop("timestamp", None)
+
+    async with wrapper.context.db(goal_id=goal_id) as db:
+        # Single INSERT ... SELECT that also verifies the goal belongs to the user
+        row = await goal_event_crud.append(
+            db, goal_id=goal_id, user_id=user_id, event_type=event_type, payload=event
+        )
+        if row is None:
+            raise ValueError(
+                f"Goal {goal_id} not found or does not belong to user {user_id}"
             )
 
 
+# Largest page get_goal_events returns
+MAX_GOAL_EVENTS = 100
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """ISO timestamp as naive UTC, the way timestamps are stored"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+@function_tool
+async def get_goal_events(
+    wrapper: RunContextWrapper[AgentContext],
+    goal_id: int,
+    limit: int = 20,
+    since: str | None = None,
+    until: str | None = None,
+    before_id: int | None = None,
+) -> str:
+    """Get a page of events from a goal's event log, newest first. Returns JSON string.
+
+    Args:
+        goal_id: Goal to read events for
+        limit: Maximum number of events to return (default: 20, max: 100)
+        since: Only events at or after this ISO timestamp (UTC unless it has an offset)
+        until: Only events before this ISO timestamp (UTC unless it has an offset)
+        before_id: Pass next_before_id from the previous page to get older events
+    """
+    limit = max(1, min(limit, MAX_GOAL_EVENTS))
+    async with wrapper.context.read_db(goal_id=goal_id) as db:
+        # Verify goal belongs to user (answered from the run cache)
+        await wrapper.context.get_goal(db, goal_id)
+
+        events = await goal_event_crud.get_events(
+            db,
+            goal_id=goal_id,
+            since=_parse_timestamp(since) if since else None,
+            until=_parse_timestamp(until) if until else None,
+            before_id=before_id,
+            limit=limit,
+        )
+
+        result = {
+            "events": [
+                {
+                    # Payload first: its keys (written by the model) must not
+                    # shadow the event's own id, type and timestamp
+                    **(event.payload or {}),
+                    "id": event.id,
+                    "type": event.type,
+                    "timestamp": event.ts,
+                }
+                for event in events
+            ],
+            "next_before_id": events[-1].id if len(events) == limit else None,
+        }
+        return dumps(result)
+
+
 # Communication
 @function_tool
 async def send_message(
@@ -219,7 +242,9 @@ async def send_message(
     """Send a message to the user or schedule it for later."""
     user_id = int(wrapper.context.user_id)
 
-    async with AsyncSessionLocal() as db:
+    # The record is part of the run (it may point at a goal the run just
+    # created); the Telegram send can't be undone, so it waits for the commit
+    async with wrapper.context.db(goal_id=goal_id) as db:
         if is_scheduled:
             # Create scheduled message (will be sent by scheduler)
             await scheduled_message_crud.create(
@@ -230,25 +255,27 @@ async def send_message(
                 message_content=content,
                 status=MessageStatus.pending,
             )
-        else:
-            # Create message record
-            await message_crud.create(
-                db,
-                user_id=user_id,
-                goal_id=goal_id,
-                role=MessageRole.assistant,
-                content=content,
-            )
-            # Send via Telegram if user has telegram_id
-            user = await user_crud.get(db, user_id)
-            if user and user.telegram_id:
-                from telegram_client import send_telegram_message
-
-                await send_telegram_message(
-                    chat_id=user.telegram_id,
-                    text=content,
-                    parse_mode="HTML",
-                )
+            return
+        # Create message record
+        await message_crud.create(
+            db,
+            user_id=user_id,
+            goal_id=goal_id,
+            role=MessageRole.assistant,
+            content=content,
+        )
+        user = await user_crud.get(db, user_id)
+
+    # Send via Telegram if user has telegram_id
+    if user and user.telegram_id:
+        chat_id = user.telegram_id
+
+        async def send() -> None:
+            from telegram_client import send_telegram_message
+
+            await send_telegram_message(chat_id=chat_id, text=content, parse_mode="HTML")
+
+        wrapper.context.after_commit(send)
 
 
 @function_tool
@@ -258,27 +285,14 @@ async def get_recent_messages(
     goal_id: int | None = None,
 ) -> str:
     """Get recent messages for the user, optionally filtered by goal. Returns JSON string."""
-    import json
-
     user_id = int(wrapper.context.user_id)
 
-    async with AsyncSessionLocal() as db:
-        filters = {"user_id": user_id}
-        if goal_id is not None:
-            filters["goal_id"] = goal_id
-
-        messages = await message_crud.get_all(db, limit=limit, **filters)
-
-        result = [
-            {
-                "role": msg.role.value,
-                "content": msg.content,
-                "goal_id": msg.goal_id,
-                "created_at": msg.created_at.isoformat(),
-            }
-            for msg in reversed(messages)  # Most recent first
-        ]
-        return json.dumps(result)
+    async with wrapper.context.read_db() as db:
+        # Most recent first, as MessageRow read models (only these columns)
+        messages = await message_crud.get_recent_rows(
+            db, user_id, limit=limit, goal_id=goal_id
+        )
+        return dumps(messages)
 
 
 # Add these to your tools.py file
@@ -286,54 +300,98 @@ async def get_recent_messages(
 # ==================== SKILL MANAGEMENT TOOLS ====================
 
 
+async def _on_skill_written(context: AgentContext, db, skill: Skill) -> None:
+    """Propagate a skill write to the search cache, embedding index and catalog.
+
+    Cached searches are dropped now and again once the run commits or rolls
+    back, so no search that ran in between keeps serving stale results. The
+    skill enters this process's embedding index and catalog on commit, and
+    other processes' catalogs via NOTIFY (delivered by Postgres on commit too).
+    """
+    await skill_search_cache.invalidate()
+    await skill_catalog.notify(db, skill.id)
+    context.skills_written.add(skill.id)
+
+    async def on_commit() -> None:
+        skill_embedding_index.upsert(skill)
+        skill_catalog.put(skill)
+        await skill_search_cache.invalidate()
+
+    context.after_commit(on_commit)
+    context.after_rollback(skill_search_cache.invalidate)
+
+
+async def _get_skills(context: AgentContext, skill_ids: List[int]) -> Dict[int, SkillEntry]:
+    """Skills from the in-memory catalog; ones this run wrote are read through
+    the run's session so it sees its own uncommitted changes."""
+    written = [id for id in skill_ids if id in context.skills_written]
+    skills = await skill_catalog.get_many(
+        [id for id in skill_ids if id not in context.skills_written]
+    )
+    if written:
+        async with context.read_db() as db:
+            skills.update(await skill_catalog.fetch(written, db))
+    return skills
+
+
 @function_tool
 async def search_skills(
     wrapper: RunContextWrapper[AgentContext], query: str, top_k: int = 3
 ) -> str:
-    """Search for existing skills using semantic/text matching. Returns JSON string with matching skills."""
-    import json
-
-    async with AsyncSessionLocal() as db:
-        # Get active skills
-        skills = await skill_crud.search(db, query=query, limit=top_k)
+    """Search for existing skills using semantic/text matching. Returns JSON string with matching skills, best match first."""
+    # Repeated queries ("weight loss", "learn spanish") are served from cache
+    cache_key = f"{normalize_query(query)}|{top_k}"
+    generation = await skill_search_cache.generation()
+    result = await skill_search_cache.get(cache_key)
+    if result is not None:
+        return dumps(result)
+
+    async with wrapper.context.read_db() as db:
+        # Active skills ranked by embedding similarity blended with text
+        # rank, read as SkillRows (no prompts, vectors or fingerprints)
+        scored = await skill_crud.hybrid_search(db, query=query, limit=top_k)
 
         result = [
             {
                 "id": skill.id,
+                "score": round(score, 3),
                 "name": skill.name,
                 "title": skill.title,
                 "description": skill.description,
                 "usage_count": skill.usage_count,
-                "created_by_type": skill.created_by_type.value,
+                "created_by_type": skill.created_by_type,
                 "metadata": skill.skill_metadata,
             }
-            for skill in skills
+            for skill, score in scored
         ]
-        return json.dumps(result)
+        # Not stored if a skill write invalidated the cache meanwhile, if the
+        # results may include this run's uncommitted skills, or if a lagging
+        # replica served them
+        if wrapper.context.shareable(db):
+            await skill_search_cache.set(cache_key, result, generation=generation)
+        return dumps(result)
 
 
 @function_tool
 async def get_skill(wrapper: RunContextWrapper[AgentContext], skill_id: int) -> str:
     """Get detailed information about a specific skill including its prompt. Returns JSON string."""
-    import json
-
-    async with AsyncSessionLocal() as db:
-        skill = await skill_crud.get(db, skill_id)
-        if not skill:
-            raise ValueError(f"Skill {skill_id} not found")
-
-        result = {
-            "id": skill.id,
-            "name": skill.name,
-            "title": skill.title,
-            "description": skill.description,
-            "skill_prompt": skill.skill_prompt,
-            "metadata": skill.skill_metadata,
-            "usage_count": skill.usage_count,
-            "created_by_type": skill.created_by_type.value,
-            "created_at": skill.created_at.isoformat(),
-        }
-        return json.dumps(result)
+    # Served from the in-memory skill catalog (no DB round-trip)
+    skill = (await _get_skills(wrapper.context, [skill_id])).get(skill_id)
+    if not skill:
+        raise ValueError(f"Skill {skill_id} not found")
+
+    result = {
+        "id": skill.id,
+        "name": skill.name,
+        "title": skill.title,
+        "description": skill.description,
+        "skill_prompt": skill.skill_prompt,
+        "metadata": skill.skill_metadata,
+        "usage_count": skill.usage_count,
+        "created_by_type": skill.created_by_type,
+        "created_at": skill.created_at,
+    }
+    return dumps(result)
 
 
 @function_tool
@@ -345,15 +403,21 @@ async def create_skill(
     skill_prompt: str,
     metadata_json: str | None = None,
 ) -> int:
-    """Create a new skill. Returns the skill ID."""
-    import json
+    """Create a new skill. Returns the skill ID. If a near-duplicate skill already exists (same prompt or name/title), returns that skill's ID instead of creating one."""
     from models.models import SkillCreatedBy
 
     user_id = int(wrapper.context.user_id)
 
-    metadata = json.loads(metadata_json) if metadata_json else {}
+    metadata = loads(metadata_json) if metadata_json else {}
+    prompt_minhash, prompt_lsh = prompt_fingerprint(skill_prompt)
+
+    async with wrapper.context.db() as db:
+        duplicate = await skill_crud.find_duplicate(
+            db, name, title, prompt_minhash, prompt_lsh
+        )
+        if duplicate:
+            return duplicate.id
 
-    async with AsyncSessionLocal() as db:
         skill = await skill_crud.create(
             db,
             name=name,
@@ -364,7 +428,14 @@ async def create_skill(
             created_by_type=SkillCreatedBy.agent,
             created_by_user_id=user_id,
             usage_count=1,
+            embedding=skill_embedding_index.embed(
+                skill_text(name, title, description, metadata)
+            ),
+            embedding_model=skill_embedding_index.encoder.name,
+            prompt_minhash=prompt_minhash,
+            prompt_lsh=prompt_lsh,
         )
+        await _on_skill_written(wrapper.context, db, skill)
         return skill.id
 
 
@@ -377,10 +448,9 @@ async def update_skill(
     metadata_json: str | None = None,
 ) -> None:
     """Update an existing skill's prompt, description, or metadata."""
-    import json
     from models.models import SkillCreatedBy
 
-    async with AsyncSessionLocal() as db:
+    async with wrapper.context.db() as db:
         skill = await skill_crud.get(db, skill_id)
         if not skill:
             raise ValueError(f"Skill {skill_id} not found")
@@ -392,6 +462,9 @@ async def update_skill(
         updates = {}
         if skill_prompt is not None:
             updates["skill_prompt"] = skill_prompt
+            updates["prompt_minhash"], updates["prompt_lsh"] = prompt_fingerprint(
+                skill_prompt
+            )
             # Increment version in metadata
             metadata = skill.skill_metadata or {}
             metadata["version"] = metadata.get("version", 1) + 1
@@ -402,13 +475,25 @@ async def update_skill(
             updates["description"] = description
 
         if metadata_json is not None:
-            metadata = json.loads(metadata_json)
+            metadata = loads(metadata_json)
             current_metadata = skill.skill_metadata or {}
             current_metadata.update(metadata)
             updates["skill_metadata"] = current_metadata
 
+        if "description" in updates or "skill_metadata" in updates:
+            updates["embedding"] = skill_embedding_index.embed(
+                skill_text(
+                    skill.name,
+                    skill.title,
+                    updates.get("description", skill.description),
+                    updates.get("skill_metadata", skill.skill_metadata),
+                )
+            )
+            updates["embedding_model"] = skill_embedding_index.encoder.name
+
         if updates:
-            await skill_crud.update(db, skill_id, **updates)
+            skill = await skill_crud.update(db, skill_id, **updates)
+            await _on_skill_written(wrapper.context, db, skill)
 
 
 @function_tool
@@ -419,67 +504,56 @@ async def link_goal_to_skill(
     customizations_json: str | None = None,
 ) -> None:
     """Link a goal to a skill with optional customizations. Provide customizations as JSON string."""
-    import json
+    customizations = loads(customizations_json) if customizations_json else {}
 
-    user_id = int(wrapper.context.user_id)
-
-    customizations = json.loads(customizations_json) if customizations_json else {}
+    # Verify skill exists (from the in-memory catalog)
+    if skill_id not in await _get_skills(wrapper.context, [skill_id]):
+        raise ValueError(f"Skill {skill_id} not found")
 
-    async with AsyncSessionLocal() as db:
-        # Verify goal belongs to user
-        goal = await goal_crud.get(db, goal_id)
-        if not goal:
-            raise ValueError(f"Goal {goal_id} not found")
-        if goal.user_id != user_id:
-            raise ValueError(f"Goal {goal_id} does not belong to user {user_id}")
-
-        # Verify skill exists
-        skill = await skill_crud.get(db, skill_id)
-        if not skill:
-            raise ValueError(f"Skill {skill_id} not found")
+    async with wrapper.context.db(goal_id=goal_id) as db:
+        # Verify goal belongs to user (answered from the run cache)
+        await wrapper.context.get_goal(db, goal_id)
 
         # Create link
         await goal_skill_crud.create(
             db, goal_id=goal_id, skill_id=skill_id, customizations=customizations
         )
 
-        # Increment skill usage count
-        await skill_crud.update(db, skill_id, usage_count=skill.usage_count + 1)
+    # Count the use once the link is committed (server-side, batched)
+    async def count_usage() -> None:
+        await skill_usage.record(skill_id)
+
+    wrapper.context.after_commit(count_usage)
 
 
 @function_tool
 async def get_goal_skill(wrapper: RunContextWrapper[AgentContext], goal_id: int) -> str:
     """Get the skill(s) associated with a goal. Returns JSON string."""
-    import json
-
-    user_id = int(wrapper.context.user_id)
-
-    async with AsyncSessionLocal() as db:
-        # Verify goal belongs to user
-        goal = await goal_crud.get(db, goal_id)
-        if not goal:
-            raise ValueError(f"Goal {goal_id} not found")
-        if goal.user_id != user_id:
-            raise ValueError(f"Goal {goal_id} does not belong to user {user_id}")
+    async with wrapper.context.read_db(goal_id=goal_id) as db:
+        # Verify goal belongs to user (answered from the run cache)
+        await wrapper.context.get_goal(db, goal_id)
 
         # Get goal-skill links
         goal_skills = await goal_skill_crud.get_all(db, goal_id=goal_id)
 
-        result = []
-        for gs in goal_skills:
-            skill = await skill_crud.get(db, gs.skill_id)
-            result.append(
-                {
-                    "skill_id": skill.id,
-                    "name": skill.name,
-                    "title": skill.title,
-                    "skill_prompt": skill.skill_prompt,
-                    "customizations": gs.customizations,
-                    "linked_at": gs.created_at.isoformat(),
-                }
-            )
+    # Skill content comes from the in-memory catalog
+    skills = await _get_skills(wrapper.context, [gs.skill_id for gs in goal_skills])
+
+    result = []
+    for gs in goal_skills:
+        skill = skills[gs.skill_id]
+        result.append(
+            {
+                "skill_id": skill.id,
+                "name": skill.name,
+                "title": skill.title,
+                "skill_prompt": skill.skill_prompt,
+                "customizations": gs.customizations,
+                "linked_at": gs.created_at,
+            }
+        )
 
-        return json.dumps(result)
+    return dumps(result)
 
 
 @function_tool
@@ -489,12 +563,14 @@ async def create_goal(
     """Create a new goal for the user. Returns the goal ID."""
     user_id = int(wrapper.context.user_id)
 
-    async with AsyncSessionLocal() as db:
+    async with wrapper.context.db() as db:
         from models.models import GoalStatus
 
         goal = await goal_crud.create(
             db, user_id=user_id, title=title, status=GoalStatus(status)
         )
+        wrapper.context.cache_goal(goal)
+        wrapper.context.cache_goal_data(goal.id, {})
         return goal.id
 
 
@@ -503,19 +579,14 @@ async def update_goal_status(
     wrapper: RunContextWrapper[AgentContext], goal_id: int, status: str
 ) -> None:
     """Update a goal's status (active, paused, completed, abandoned)."""
-    user_id = int(wrapper.context.user_id)
-
-    async with AsyncSessionLocal() as db:
+    async with wrapper.context.db(goal_id=goal_id) as db:
         from models.models import GoalStatus
 
-        # Verify goal belongs to user
-        goal = await goal_crud.get(db, goal_id)
-        if not goal:
-            raise ValueError(f"Goal {goal_id} not found")
-        if goal.user_id != user_id:
-            raise ValueError(f"Goal {goal_id} does not belong to user {user_id}")
+        # Verify goal belongs to user (answered from the run cache)
+        await wrapper.context.get_goal(db, goal_id)
 
-        await goal_crud.update(db, goal_id, status=GoalStatus(status))
+        goal = await goal_crud.update(db, goal_id, status=GoalStatus(status))
+        wrapper.context.cache_goal(goal)
 
 
 # ==================== REFERENCE DOCUMENTATION TOOLS ====================
@@ -523,7 +594,7 @@ async def update_goal_status(
 
 @function_tool
 async def read_reference_doc(
-    wrapper: RunContextWrapper[AgentContext], doc_name: str
+    wrapper: RunContextWrapper[AgentContext], doc_name: str, section: str | None = None
 ) -> str:
     """Read reference documentation to guide your behavior.
 
@@ -535,66 +606,52 @@ async def read_reference_doc(
     - Understand skill structure and templates
     - Follow standardized patterns for goal types
 
-    Returns the full content of the requested document.
+    Pass section to get only that part of the document (with its subsections),
+    by heading or number, e.g. 'Skill Anatomy', 'Template A', '5'. Separate
+    several sections with commas. Without section the full document is returned.
     """
-    # Normalize doc_name
-    doc_map = {
-        "skills": "skills.md",
-        "skills.md": "skills.md",
-    }
-
-    normalized_name = doc_map.get(doc_name.lower())
-    if not normalized_name:
-        available = ", ".join(doc_map.keys())
-        raise ValueError(f"Unknown document '{doc_name}'. Available: {available}")
-
-    # Get the project root (assuming this file is in ai/ directory)
-    project_root = Path(__file__).parent.parent
-    doc_path = project_root / "prompts" / normalized_name
-
-    if not doc_path.exists():
-        raise FileNotFoundError(f"Document not found: {doc_path}")
-
-    return doc_path.read_text(encoding="utf-8")
+    # Served from memory; the file is re-read only when it changes
+    return reference_docs.read(doc_name, section)
 
 
 @function_tool
 async def search_web(
     query: str,
-    num_results: int = 10,
+    num_results: int = 5,
     search_type: str = "auto",
-    max_characters: int = 20000,
+    max_characters: int = 500,
 ) -> str:
     """Search the web using Exa API for latest information.
 
     Args:
         query: Search query string
-        num_results: Number of results to return (default: 10)
+        num_results: Number of results to return (default: 5, max: 10)
         search_type: Type of search - "auto", "keyword", or "neural" (default: "auto")
-        max_characters: Maximum characters to return per result (default: 20000)
+        max_characters: Maximum snippet characters per result (default: 500, max: 10000).
+            To read more of a result, repeat the same search with a larger value.
 
     Returns:
-        JSON string containing search results with text content
+        JSON string with a list of results: title, url, published_date and snippet
     """
-
-    api_key = os.getenv("EXA_API_KEY")
-    if not api_key:
-        raise ValueError("EXA_API_KEY not found in environment variables")
-
-    url = "https://api.exa.ai/search"
-    headers = {
-        "x-api-key": api_key,
-        "Content-Type": "application/json",
-    }
-
-    payload = {
-        "query": query,
-        "type": search_type,
-        "num_results": num_results,
-        "contents": {"text": {"max_characters": max_characters}},
-    }
-
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, headers=headers, json=payload, timeout=30.0)
-        response.raise_for_status()
-        return json.dumps(response.json(), indent=2)
+    response = await exa_client.search(
+        query, num_results=max(1, min(num_results, 10)), search_type=search_type
+    )
+    snippet_chars = max(100, min(max_characters, FETCH_CHARACTERS))
+    return dumps(trim_results(response, snippet_chars))
+
+
+# Tools that never write: they read through AgentContext.read_db() and never
+# take the run's write session (checked in tests/bench/test_tools.py), so
+# the several a model calls in one step (parallel_tool_calls) run concurrently.
+READ_ONLY_TOOLS = [
+    list_goals,
+    get_goal,
+    get_goal_data,
+    get_goal_events,
+    get_recent_messages,
+    search_skills,
+    get_skill,
+    get_goal_skill,
+    read_reference_doc,
+    search_web,
+]
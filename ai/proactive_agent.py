@@ -1,7 +1,7 @@
 """Proactive Agent - Evaluates whether to reach out proactively."""
 
-import json
 import logging
+import time
 from datetime import datetime
 from typing import Dict, Any
 
@@ -9,13 +9,23 @@ from openai import AsyncOpenAI
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
-from database import AsyncSessionLocal
+from database import AsyncSessionLocal, ReadSessionLocal
 from models.models import User, Goal, GoalStatus, Message
 from prompts.proactive_agent_prompt import PROACTIVE_EVALUATION_PROMPT
+from services import goal_event_crud
+from services.serialization import dumps, loads
 from ai.reactive_agent import ReactiveAgent
+from ai.tracing import LLM_MS, TOKENS
+from metrics import counter
 
 logger = logging.getLogger(__name__)
 
+DECISIONS = counter(
+    "proactive_decisions_total",
+    "Proactive check-in decisions (send_now, schedule, skip) and how they ended",
+    ("action", "status"),
+)
+
 
 class ProactiveAgent:
     """Evaluates whether Parth should proactively reach out to the user."""
@@ -33,14 +43,14 @@ class ProactiveAgent:
         Returns:
             Dict with user context including goals, messages, preferences
         """
-        async with AsyncSessionLocal() as db:
+        # Read-only: served by a replica when configured
+        async with ReadSessionLocal() as db:
             # Get user with relationships
             result = await db.execute(
                 select(User)
                 .options(
                     selectinload(User.goals).selectinload(Goal.goal_data),
                     selectinload(User.preferences),
-                    selectinload(User.messages),
                     selectinload(User.scheduled_messages),
                 )
                 .where(User.id == user_id)
@@ -57,13 +67,27 @@ class ProactiveAgent:
                     goal_info = {
                         "id": goal.id,
                         "title": goal.title,
-                        "created_at": goal.created_at.isoformat(),
-                        "updated_at": goal.updated_at.isoformat(),
+                        "created_at": goal.created_at,
+                        "updated_at": goal.updated_at,
                     }
                     if goal.goal_data:
                         goal_info["data"] = goal.goal_data.agent_data
                     active_goals.append(goal_info)
 
+            # Latest events per active goal (one query for all goals)
+            recent_events = await goal_event_crud.get_recent_by_goals(
+                db, [goal["id"] for goal in active_goals], per_goal=10
+            )
+            for goal_info in active_goals:
+                goal_info["recent_events"] = [
+                    {
+                        "type": event.type,
+                        "timestamp": event.ts,
+                        **(event.payload or {}),
+                    }
+                    for event in recent_events.get(goal_info["id"], [])
+                ]
+
             # Get recent messages (last 20)
             result = await db.execute(
                 select(Message)
@@ -74,9 +98,9 @@ class ProactiveAgent:
             messages = result.scalars().all()
             recent_messages = [
                 {
-                    "role": msg.role.value,
+                    "role": msg.role,
                     "content": msg.content,
-                    "created_at": msg.created_at.isoformat(),
+                    "created_at": msg.created_at,
                     "goal_id": msg.goal_id,
                 }
                 for msg in reversed(messages)  # Reverse to chronological order
@@ -105,7 +129,7 @@ class ProactiveAgent:
                     pending_scheduled.append(
                         {
                             "goal_id": scheduled_msg.goal_id,
-                            "scheduled_for": scheduled_msg.scheduled_for.isoformat(),
+                            "scheduled_for": scheduled_msg.scheduled_for,
                             "message_content": scheduled_msg.message_content,
                         }
                     )
@@ -115,18 +139,12 @@ class ProactiveAgent:
                 "telegram_id": user.telegram_id,
                 "timezone": user.timezone,
                 "is_active": user.is_active,
-                "current_datetime": datetime.utcnow().isoformat(),
+                "current_datetime": datetime.utcnow(),
                 "active_goals": active_goals,
                 "active_goals_count": len(active_goals),
                 "recent_messages": recent_messages,
-                "last_message_at": last_message_time.isoformat()
-                if last_message_time
-                else None,
-                "last_assistant_message_at": (
-                    last_assistant_message.isoformat()
-                    if last_assistant_message
-                    else None
-                ),
+                "last_message_at": last_message_time,
+                "last_assistant_message_at": last_assistant_message,
                 "hours_since_last_message": (
                     (datetime.utcnow() - last_message_time).total_seconds() / 3600
                     if last_message_time
@@ -178,18 +196,25 @@ class ProactiveAgent:
                 }
 
             # Build prompt with context
-            prompt = f"{PROACTIVE_EVALUATION_PROMPT}\n\n## CONTEXT\n\n```json\n{json.dumps(context, indent=2)}\n```\n\nProvide your decision as valid JSON:"
+            prompt = f"{PROACTIVE_EVALUATION_PROMPT}\n\n## CONTEXT\n\n```json\n{dumps(context)}\n```\n\nProvide your decision as valid JSON:"
 
             # Call LLM for decision
+            started = time.perf_counter()
             response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.7,
                 response_format={"type": "json_object"},
             )
+            LLM_MS.observe((time.perf_counter() - started) * 1000, agent="proactive")
+            if response.usage:
+                TOKENS.observe(response.usage.prompt_tokens, agent="proactive", kind="input")
+                TOKENS.observe(
+                    response.usage.completion_tokens, agent="proactive", kind="output"
+                )
 
             decision_text = response.choices[0].message.content
-            decision = json.loads(decision_text)
+            decision = loads(decision_text)
 
             # Validate decision structure
             required_keys = ["action", "message", "goal_id", "send_at", "reasoning"]
@@ -311,6 +336,11 @@ class ProactiveAgent:
 
         # Execute
         result = await self.execute_decision(user_id, decision)
+        action = decision.get("action")
+        DECISIONS.inc(
+            action=action if action in ("send_now", "schedule", "skip") else "invalid",
+            status=result.get("status", "failed"),
+        )
 
         # Combine decision and result
         return {
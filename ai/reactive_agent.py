@@ -2,7 +2,7 @@
 
 import logging
 from typing import AsyncIterator
-from agents import Agent, Runner, RunItemStreamEvent
+from agents import Agent, ModelSettings, Runner, RunItemStreamEvent
 from openai.types.responses import ResponseTextDeltaEvent
 
 from ai.llm_tools import (
@@ -12,6 +12,7 @@ from ai.llm_tools import (
     get_goal_data,
     update_goal_data,
     append_goal_event,
+    get_goal_events,
     send_message,
     get_recent_messages,
     update_user_preferences,
@@ -26,6 +27,7 @@ from ai.llm_tools import (
     read_reference_doc,
     search_web,
 )
+from ai.tracing import TracingHooks, instrument_tools, trace_run
 from prompts.agents import PARTH_AGENT_PROMPT
 from database import AsyncSessionLocal
 from services.services import MessageService
@@ -39,6 +41,7 @@ TOOLS_ALLOWED_LIST = [
     get_goal_data,
     update_goal_data,
     append_goal_event,
+    get_goal_events,
     send_message,
     get_recent_messages,
     create_goal,
@@ -69,7 +72,10 @@ class ReactiveAgent:
             name=name,
             instructions=instructions or PARTH_AGENT_PROMPT,
             model=model,
-            tools=TOOLS_ALLOWED_LIST,
+            # Tool calls are recorded as spans of the run's trace (ai/tracing.py)
+            tools=instrument_tools(TOOLS_ALLOWED_LIST),
+            # Independent tool calls in one step run concurrently (see AgentContext)
+            model_settings=ModelSettings(parallel_tool_calls=True),
         )
 
     async def stream_response(
@@ -91,28 +97,40 @@ class ReactiveAgent:
                 messages.append({"role": msg["role"], "content": msg["content"]})
         messages.append({"role": "user", "content": prompt})
 
-        # Create context with user_id
-        context = AgentContext(user_id=self.user_id)
-        result = Runner.run_streamed(self.agent, messages, context=context)
-        async for event in result.stream_events():
-            # Handle text deltas
-            if event.type == "raw_response_event" and isinstance(
-                event.data, ResponseTextDeltaEvent
-            ):
-                yield {"type": "text", "content": event.data.delta}
-
-            # Handle tool calls
-            elif isinstance(event, RunItemStreamEvent) and event.name == "tool_called":
-                tool_name = (
-                    event.item.raw_item.name
-                    if hasattr(event.item, "raw_item")
-                    else "Unknown"
-                )
-                yield {"type": "tool_call", "content": tool_name}
+        # Create context with user_id; tool writes are committed once the run ends
+        async with (
+            trace_run("reactive", self.user_id) as trace,
+            AgentContext(user_id=self.user_id) as context,
+        ):
+            result = Runner.run_streamed(
+                self.agent, messages, context=context, hooks=TracingHooks()
+            )
+            async for event in result.stream_events():
+                # Handle text deltas
+                if event.type == "raw_response_event" and isinstance(
+                    event.data, ResponseTextDeltaEvent
+                ):
+                    trace.mark_first_token()
+                    yield {"type": "text", "content": event.data.delta}
+
+                # Handle tool calls
+                elif (
+                    isinstance(event, RunItemStreamEvent)
+                    and event.name == "tool_called"
+                ):
+                    tool_name = (
+                        event.item.raw_item.name
+                        if hasattr(event.item, "raw_item")
+                        else "Unknown"
+                    )
+                    yield {"type": "tool_call", "content": tool_name}
 
-            # Handle tool outputs
-            elif isinstance(event, RunItemStreamEvent) and event.name == "tool_output":
-                yield {"type": "tool_output", "content": "completed"}
+                # Handle tool outputs
+                elif (
+                    isinstance(event, RunItemStreamEvent)
+                    and event.name == "tool_output"
+                ):
+                    yield {"type": "tool_output", "content": "completed"}
 
     async def get_response(self, prompt: str, history: list[dict] = None) -> str:
         """Get complete agent response (non-streaming).
@@ -131,9 +149,14 @@ class ReactiveAgent:
                 messages.append({"role": msg["role"], "content": msg["content"]})
         messages.append({"role": "user", "content": prompt})
 
-        # Create context with user_id
-        context = AgentContext(user_id=self.user_id)
-        result = await Runner.run(self.agent, messages, context=context)
+        # Create context with user_id; tool writes are committed once the run ends
+        async with (
+            trace_run("reactive", self.user_id),
+            AgentContext(user_id=self.user_id) as context,
+        ):
+            result = await Runner.run(
+                self.agent, messages, context=context, hooks=TracingHooks()
+            )
         return result.final_output
 
     async def send_proactive_message(
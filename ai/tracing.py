@@ -0,0 +1,277 @@
+"""Per-run tracing of agent turns: time to first token, LLM calls, tools and DB queries.
+
+Each run gets a RunTrace made of OpenTelemetry-style spans (trace_id,
+span_id, parent_span_id, start/end, attributes): the run itself, one span per
+LLM round-trip and one per tool call. Queries on the shared engine are
+attributed to the tool (or run) in progress through a contextvar. When the
+run ends the trace is logged as one JSON line and folded into the metrics in
+metrics.py.
+"""
+
+import dataclasses
+import json
+import logging
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from agents import Agent, FunctionTool, RunContextWrapper, RunHooks
+from agents.items import ModelResponse
+from sqlalchemy import event
+
+from database import engine, replica_engines
+from services.sql_profiler import query_scope
+from metrics import COUNT_BUCKETS, counter, histogram
+
+logger = logging.getLogger(__name__)
+
+# Log every run's trace as a JSON line (set to 0 to only aggregate metrics)
+AGENT_TRACE_LOG = os.getenv("AGENT_TRACE_LOG", "1") == "1"
+
+RUNS = counter("agent_runs_total", "Agent runs by outcome", ("agent", "status"))
+TURN_MS = histogram("agent_turn_ms", "Agent run wall time", labelnames=("agent",))
+TTFT_MS = histogram(
+    "agent_ttft_ms", "Time to first streamed text token", labelnames=("agent",)
+)
+LLM_MS = histogram("agent_llm_ms", "LLM round-trip time", labelnames=("agent",))
+LLM_CALLS = histogram(
+    "agent_llm_calls", "LLM round-trips per run", COUNT_BUCKETS, ("agent",)
+)
+TOKENS = histogram(
+    "agent_tokens", "LLM tokens per run", COUNT_BUCKETS, ("agent", "kind")
+)
+TOOL_CALLS = counter(
+    "agent_tool_calls_total", "Tool calls by outcome", ("tool", "status")
+)
+TOOL_MS = histogram("agent_tool_ms", "Tool call latency", labelnames=("tool",))
+TOOL_DB_QUERIES = histogram(
+    "agent_tool_db_queries", "DB queries per tool call", COUNT_BUCKETS, ("tool",)
+)
+TOOL_DB_MS = histogram("agent_tool_db_ms", "DB time per tool call", labelnames=("tool",))
+RUN_DB_QUERIES = histogram(
+    "agent_run_db_queries", "DB queries per run", COUNT_BUCKETS, ("agent",)
+)
+
+
+@dataclass
+class Span:
+    """One timed operation within a run."""
+
+    name: str
+    trace_id: str
+    parent_id: Optional[str] = None
+    span_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    db_queries: int = 0
+    db_ms: float = 0.0
+    _t0: float = field(default_factory=time.perf_counter, repr=False)
+
+    @property
+    def duration_ms(self) -> float:
+        if self.end_ns is None:
+            return (time.perf_counter() - self._t0) * 1000
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def finish(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+        self.end_ns = self.start_ns + int((time.perf_counter() - self._t0) * 1e9)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round(self.duration_ms, 2),
+            "attributes": {
+                **self.attributes,
+                "db.queries": self.db_queries,
+                "db.ms": round(self.db_ms, 2),
+            },
+        }
+
+
+class RunTrace:
+    """Spans and totals of one agent run."""
+
+    def __init__(self, agent: str, user_id: str):
+        self.agent = agent
+        self.trace_id = uuid.uuid4().hex
+        self.root = Span(
+            "agent.run", self.trace_id, attributes={"agent": agent, "user_id": user_id}
+        )
+        self.spans: List[Span] = []
+        self.first_token_ms: Optional[float] = None
+        self.llm_calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self._llm_span: Optional[Span] = None
+
+    def start_span(self, name: str, **attributes: Any) -> Span:
+        span = Span(name, self.trace_id, self.root.span_id, attributes=attributes)
+        self.spans.append(span)
+        return span
+
+    def mark_first_token(self) -> None:
+        if self.first_token_ms is None:
+            self.first_token_ms = self.root.duration_ms
+
+    def record_query(self, ms: float) -> None:
+        self.root.db_queries += 1
+        self.root.db_ms += ms
+        span = current_span.get()
+        if span is not None:
+            span.db_queries += 1
+            span.db_ms += ms
+
+    def llm_started(self) -> None:
+        self._llm_span = self.start_span("llm.call", call=self.llm_calls + 1)
+
+    def llm_finished(self, response: ModelResponse) -> None:
+        self.llm_calls += 1
+        usage = response.usage
+        self.input_tokens += usage.input_tokens
+        self.output_tokens += usage.output_tokens
+        if self._llm_span is not None:
+            self._llm_span.finish(
+                input_tokens=usage.input_tokens, output_tokens=usage.output_tokens
+            )
+            LLM_MS.observe(self._llm_span.duration_ms, agent=self.agent)
+            self._llm_span = None
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.root.finish(
+            status="error" if error else "ok",
+            ttft_ms=round(self.first_token_ms, 2) if self.first_token_ms else None,
+            llm_calls=self.llm_calls,
+            input_tokens=self.input_tokens,
+            output_tokens=self.output_tokens,
+            tool_calls=sum(1 for s in self.spans if s.name == "tool.call"),
+        )
+        RUNS.inc(agent=self.agent, status=self.root.attributes["status"])
+        TURN_MS.observe(self.root.duration_ms, agent=self.agent)
+        if self.first_token_ms is not None:
+            TTFT_MS.observe(self.first_token_ms, agent=self.agent)
+        LLM_CALLS.observe(self.llm_calls, agent=self.agent)
+        TOKENS.observe(self.input_tokens, agent=self.agent, kind="input")
+        TOKENS.observe(self.output_tokens, agent=self.agent, kind="output")
+        RUN_DB_QUERIES.observe(self.root.db_queries, agent=self.agent)
+        if AGENT_TRACE_LOG:
+            logger.info(f"agent_trace {json.dumps(self.to_dict(), default=str)}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "spans": [self.root.to_dict()] + [s.to_dict() for s in self.spans],
+        }
+
+
+current_trace: ContextVar[Optional[RunTrace]] = ContextVar("current_trace", default=None)
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+@asynccontextmanager
+async def trace_run(agent: str, user_id: str) -> AsyncIterator[RunTrace]:
+    """Trace the agent run inside the block (start the Runner within it)."""
+    trace = RunTrace(agent, user_id)
+    token = current_trace.set(trace)
+    error = None
+    try:
+        with query_scope(f"{agent} run (user {user_id})"):
+            yield trace
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        trace.finish(error)
+        try:
+            current_trace.reset(token)
+        except ValueError:
+            # Async generator closed from another context; nothing to restore
+            pass
+
+
+class TracingHooks(RunHooks):
+    """Times each LLM round-trip of the traced run."""
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items) -> None:
+        trace = current_trace.get()
+        if trace is not None:
+            trace.llm_started()
+
+    async def on_llm_end(
+        self, context: RunContextWrapper, agent: Agent, response: ModelResponse
+    ) -> None:
+        trace = current_trace.get()
+        if trace is not None:
+            trace.llm_finished(response)
+
+
+def instrument_tool(tool: FunctionTool) -> FunctionTool:
+    """A copy of tool whose calls are recorded as spans of the current trace."""
+    invoke = tool.on_invoke_tool
+
+    async def on_invoke_tool(ctx, arguments: str) -> Any:
+        trace = current_trace.get()
+        if trace is None:
+            return await invoke(ctx, arguments)
+        span = trace.start_span(
+            "tool.call",
+            tool=tool.name,
+            call_id=getattr(ctx, "tool_call_id", None),
+            args_bytes=len(arguments),
+        )
+        token = current_span.set(span)
+        try:
+            output = await invoke(ctx, arguments)
+        except BaseException as e:
+            span.finish(status="error", error=type(e).__name__)
+            raise
+        else:
+            span.finish(status="ok", output_bytes=len(str(output)))
+            return output
+        finally:
+            current_span.reset(token)
+            TOOL_CALLS.inc(tool=tool.name, status=span.attributes["status"])
+            TOOL_MS.observe(span.duration_ms, tool=tool.name)
+            TOOL_DB_QUERIES.observe(span.db_queries, tool=tool.name)
+            TOOL_DB_MS.observe(span.db_ms, tool=tool.name)
+
+    return dataclasses.replace(tool, on_invoke_tool=on_invoke_tool)
+
+
+def instrument_tools(tools: List[FunctionTool]) -> List[FunctionTool]:
+    return [instrument_tool(tool) for tool in tools]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_trace.get() is not None:
+        conn.info.setdefault("trace_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trace = current_trace.get()
+    starts = conn.info.get("trace_query_start")
+    if trace is not None and starts:
+        trace.record_query((time.perf_counter() - starts.pop()) * 1000)
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("trace_query_start"):
+        conn.info["trace_query_start"].pop()
+
+
+# Queries count towards the run's trace whichever engine serves them
+for _engine in (engine, *replica_engines):
+    event.listen(_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(_engine.sync_engine, "handle_error", _handle_error)
@@ -1,5 +1,6 @@
 from logging.config import fileConfig
 import os
+import re
 from dotenv import load_dotenv
 
 from sqlalchemy import engine_from_config
@@ -31,6 +32,16 @@ from models import Base
 
 target_metadata = Base.metadata
 
+# Monthly message partitions are created at runtime (ensure_message_partitions,
+# tasks.message_archive), not by the models; keep autogenerate from dropping them
+MESSAGE_PARTITION = re.compile(r"messages_(y\d{4}m\d{2}|default)$")
+
+
+def include_name(name, type_, parent_names):
+    if type_ == "table":
+        return not MESSAGE_PARTITION.match(name)
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -55,6 +66,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -75,7 +87,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,109 @@
+"""add_goal_events
+
+Revision ID: 4f2a9c1e7d30
+Revises: bccad34fbe5f
+Create Date: 2026-10-19 09:12:44.318207
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4f2a9c1e7d30"
+down_revision: Union[str, Sequence[str], None] = "bccad34fbe5f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create append-only goal_events table and backfill it from goal_data."""
+    op.create_table(
+        "goal_events",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("goal_id", sa.Integer(), nullable=False),
+        sa.Column("ts", sa.DateTime(), nullable=False),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column(
+            "payload",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+            server_default=sa.text("'{}'::jsonb"),
+        ),
+        sa.ForeignKeyConstraint(["goal_id"], ["goals.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_goal_events_goal_id_ts", "goal_events", ["goal_id", "ts"], unique=False
+    )
+
+    # Move every element of goal_data.agent_data->'events' into its own row.
+    # 'type' and 'timestamp' become columns, everything else stays in payload.
+    # Events without a parseable timestamp fall back to the goal_data row's
+    # updated_at; ordinality keeps the original append order within a goal.
+    op.execute("""
+        INSERT INTO goal_events (goal_id, ts, type, payload)
+        SELECT
+            gd.goal_id,
+            CASE
+                WHEN e.value->>'timestamp' ~ '^\\d{4}-\\d{2}-\\d{2}'
+                THEN (e.value->>'timestamp')::timestamp
+                ELSE gd.updated_at
+            END,
+            coalesce(e.value->>'type', 'event'),
+            CASE
+                WHEN jsonb_typeof(e.value) = 'object'
+                THEN e.value - 'type' - 'timestamp'
+                ELSE jsonb_build_object('value', e.value)
+            END
+        FROM goal_data gd
+        CROSS JOIN LATERAL jsonb_array_elements(gd.agent_data->'events')
+            WITH ORDINALITY AS e(value, ord)
+        WHERE jsonb_typeof(gd.agent_data->'events') = 'array'
+        ORDER BY gd.goal_id, e.ord
+    """)
+
+    # Events now live in goal_events; drop the embedded copies
+    op.execute("""
+        UPDATE goal_data
+        SET agent_data = agent_data - 'events'
+        WHERE jsonb_typeof(agent_data->'events') = 'array'
+    """)
+
+
+def downgrade() -> None:
+    """Fold goal_events back into goal_data.agent_data and drop the table."""
+    op.execute("""
+        WITH folded AS (
+            SELECT
+                goal_id,
+                jsonb_agg(
+                    jsonb_build_object(
+                        'type', type,
+                        'timestamp', to_char(ts, 'YYYY-MM-DD"T"HH24:MI:SS.US')
+                    ) || payload
+                    ORDER BY ts, id
+                ) AS events
+            FROM goal_events
+            GROUP BY goal_id
+        ),
+        updated AS (
+            UPDATE goal_data gd
+            SET agent_data = coalesce(gd.agent_data, '{}'::jsonb)
+                || jsonb_build_object('events', folded.events)
+            FROM folded
+            WHERE gd.goal_id = folded.goal_id
+            RETURNING gd.goal_id
+        )
+        INSERT INTO goal_data (goal_id, agent_data, created_at, updated_at)
+        SELECT folded.goal_id, jsonb_build_object('events', folded.events), now(), now()
+        FROM folded
+        WHERE folded.goal_id NOT IN (SELECT goal_id FROM updated)
+    """)
+
+    op.drop_index("ix_goal_events_goal_id_ts", table_name="goal_events")
+    op.drop_table("goal_events")
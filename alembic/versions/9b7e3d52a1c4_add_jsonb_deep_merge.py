@@ -0,0 +1,58 @@
+"""add_jsonb_deep_merge
+
+Revision ID: 9b7e3d52a1c4
+Revises: 4f2a9c1e7d30
+Create Date: 2026-10-19 11:40:02.517930
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9b7e3d52a1c4"
+down_revision: Union[str, Sequence[str], None] = "4f2a9c1e7d30"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add jsonb_deep_merge(a, b) used by BaseCRUD.jsonb_merge(deep=True)."""
+    # Objects are merged key by key, recursing into nested objects; for any
+    # other combination (arrays, scalars, null) the value from b wins, which
+    # matches the semantics of the top-level || operator.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION jsonb_deep_merge(a jsonb, b jsonb)
+        RETURNS jsonb
+        LANGUAGE plpgsql
+        IMMUTABLE
+        AS $$
+        BEGIN
+            IF jsonb_typeof(a) = 'object' AND jsonb_typeof(b) = 'object' THEN
+                RETURN (
+                    SELECT coalesce(
+                        jsonb_object_agg(
+                            coalesce(ka, kb),
+                            CASE
+                                WHEN va IS NULL THEN vb
+                                WHEN vb IS NULL THEN va
+                                ELSE jsonb_deep_merge(va, vb)
+                            END
+                        ),
+                        '{}'::jsonb
+                    )
+                    FROM jsonb_each(a) AS e1(ka, va)
+                    FULL JOIN jsonb_each(b) AS e2(kb, vb) ON ka = kb
+                );
+            END IF;
+            RETURN b;
+        END
+        $$
+    """)
+
+
+def downgrade() -> None:
+    """Remove jsonb_deep_merge."""
+    op.execute("DROP FUNCTION IF EXISTS jsonb_deep_merge(jsonb, jsonb)")
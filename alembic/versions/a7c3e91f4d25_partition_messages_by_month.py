@@ -0,0 +1,179 @@
+"""partition_messages_by_month
+
+Revision ID: a7c3e91f4d25
+Revises: f3a9c2d71b84
+Create Date: 2026-10-19 21:12:08.305716
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c3e91f4d25"
+down_revision: Union[str, Sequence[str], None] = "f3a9c2d71b84"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Monthly partitions messages_yYYYYmMM covering [from, to] (by month).
+# Rows that landed in messages_default for a month are moved into its new
+# partition before it is attached. Returns the number of partitions created.
+ENSURE_MESSAGE_PARTITIONS = """
+CREATE OR REPLACE FUNCTION ensure_message_partitions(from_month date, to_month date)
+RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    month date := date_trunc('month', from_month)::date;
+    next_month date;
+    partition text;
+    created integer := 0;
+BEGIN
+    WHILE month <= to_month LOOP
+        next_month := (month + interval '1 month')::date;
+        partition := to_char(month, '"messages_y"YYYY"m"MM');
+        IF to_regclass(partition) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I (LIKE messages INCLUDING DEFAULTS)', partition
+            );
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM messages_default '
+                'WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                'INSERT INTO %I SELECT * FROM moved',
+                month, next_month, partition
+            );
+            EXECUTE format(
+                'ALTER TABLE messages ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                partition, month, next_month
+            );
+            created := created + 1;
+        END IF;
+        month := next_month;
+    END LOOP;
+    RETURN created;
+END
+$$
+"""
+
+# Same column order as the table it replaces, so rows copy with SELECT *.
+# Constraint names are spelled out: generated ones would get a suffix while
+# the renamed table still holds them
+MESSAGES_COLUMNS = """
+    user_id INTEGER NOT NULL CONSTRAINT messages_user_id_fkey REFERENCES users (id),
+    goal_id INTEGER CONSTRAINT messages_goal_id_fkey REFERENCES goals (id),
+    role messagerole NOT NULL,
+    content TEXT NOT NULL,
+    telegram_message_id BIGINT,
+    id {id_type} NOT NULL DEFAULT nextval('messages_id_seq'),
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    meta_data JSONB
+"""
+
+
+def upgrade() -> None:
+    """Range-partition messages by month on created_at; add message_summaries."""
+    # The copy runs in the migration's transaction with the old table locked;
+    # for a large history run it in a maintenance window
+    op.execute("ALTER TABLE messages RENAME TO messages_unpartitioned")
+    op.execute("ALTER INDEX messages_pkey RENAME TO messages_unpartitioned_pkey")
+    op.execute("DROP INDEX ix_messages_user_id_created_at")
+    op.execute("DROP INDEX ix_messages_goal_id_created_at")
+    op.execute("ALTER SEQUENCE messages_id_seq OWNED BY NONE")
+    op.execute("ALTER SEQUENCE messages_id_seq AS BIGINT")
+
+    # The primary key has to include the partition key
+    op.execute(
+        f"""
+        CREATE TABLE messages (
+            {MESSAGES_COLUMNS.format(id_type="BIGINT")},
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    # Catches rows outside every monthly partition (e.g. a month that wasn't
+    # created ahead in time); ensure_message_partitions moves them out
+    op.execute("CREATE TABLE messages_default PARTITION OF messages DEFAULT")
+    op.create_index(
+        "ix_messages_user_id_created_at",
+        "messages",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_messages_goal_id_created_at",
+        "messages",
+        ["goal_id", "created_at", "id"],
+        unique=False,
+    )
+    op.execute(ENSURE_MESSAGE_PARTITIONS)
+    op.execute(
+        """
+        SELECT ensure_message_partitions(
+            coalesce((SELECT min(created_at) FROM messages_unpartitioned), now())::date,
+            (now() + interval '3 months')::date
+        )
+        """
+    )
+    op.execute("INSERT INTO messages SELECT * FROM messages_unpartitioned")
+    op.execute("DROP TABLE messages_unpartitioned")
+    op.execute("ALTER SEQUENCE messages_id_seq OWNED BY messages.id")
+
+    # Per user and month totals of archived (dropped) partitions
+    op.execute(
+        """
+        CREATE TABLE message_summaries (
+            user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            month DATE NOT NULL,
+            message_count INTEGER NOT NULL,
+            user_messages INTEGER NOT NULL,
+            assistant_messages INTEGER NOT NULL,
+            goal_ids INTEGER[],
+            first_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            last_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            id SERIAL PRIMARY KEY,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            meta_data JSONB,
+            CONSTRAINT uq_message_summaries_user_id_month UNIQUE (user_id, month)
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Restore the unpartitioned messages table (summaries are dropped)."""
+    op.execute("DROP TABLE message_summaries")
+
+    op.execute("ALTER TABLE messages RENAME TO messages_partitioned")
+    op.execute("ALTER INDEX messages_pkey RENAME TO messages_partitioned_pkey")
+    op.execute("DROP INDEX ix_messages_user_id_created_at")
+    op.execute("DROP INDEX ix_messages_goal_id_created_at")
+    op.execute("ALTER SEQUENCE messages_id_seq OWNED BY NONE")
+
+    op.execute(
+        f"""
+        CREATE TABLE messages (
+            {MESSAGES_COLUMNS.format(id_type="INTEGER")},
+            PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute("INSERT INTO messages SELECT * FROM messages_partitioned")
+    op.execute("DROP TABLE messages_partitioned")
+    op.execute("DROP FUNCTION ensure_message_partitions(date, date)")
+    op.execute("ALTER SEQUENCE messages_id_seq AS INTEGER")
+    op.execute("ALTER SEQUENCE messages_id_seq OWNED BY messages.id")
+    op.create_index(
+        "ix_messages_user_id_created_at",
+        "messages",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_messages_goal_id_created_at",
+        "messages",
+        ["goal_id", "created_at", "id"],
+        unique=False,
+    )
@@ -0,0 +1,42 @@
+"""add_trigram_indexes_to_skills
+
+Revision ID: c3d81f6a0b92
+Revises: 9b7e3d52a1c4
+Create Date: 2026-10-19 14:05:31.772046
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3d81f6a0b92"
+down_revision: Union[str, Sequence[str], None] = "9b7e3d52a1c4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_COLUMNS = ["name", "title", "description"]
+
+
+def upgrade() -> None:
+    """Add pg_trgm GIN indexes so fuzzy/ILIKE skill matching uses an index."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Serve similarity (%, <%) and ILIKE '%q%' predicates in SkillCRUD.search
+    for column in TRIGRAM_COLUMNS:
+        op.create_index(
+            f"idx_skills_{column}_trgm",
+            "skills",
+            [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    """Remove trigram indexes from skills table."""
+    for column in TRIGRAM_COLUMNS:
+        op.drop_index(f"idx_skills_{column}_trgm", table_name="skills")
+    # pg_trgm is left installed; other objects may depend on it
@@ -0,0 +1,35 @@
+"""add_embedding_to_skills
+
+Revision ID: d5e2a7c94f18
+Revises: c3d81f6a0b92
+Create Date: 2026-10-19 15:12:08.403917
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d5e2a7c94f18"
+down_revision: Union[str, Sequence[str], None] = "c3d81f6a0b92"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add embedding columns to skills table."""
+    # Filled on skill writes; existing rows by python -m tasks.skill_embeddings
+    op.add_column(
+        "skills", sa.Column("embedding", postgresql.ARRAY(postgresql.REAL()))
+    )
+    op.add_column("skills", sa.Column("embedding_model", sa.String()))
+
+
+def downgrade() -> None:
+    """Remove embedding columns from skills table."""
+    op.drop_column("skills", "embedding_model")
+    op.drop_column("skills", "embedding")
@@ -0,0 +1,44 @@
+"""add_prompt_minhash_to_skills
+
+Revision ID: e8f14b6c2d57
+Revises: d5e2a7c94f18
+Create Date: 2026-10-19 15:48:22.915304
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e8f14b6c2d57"
+down_revision: Union[str, Sequence[str], None] = "d5e2a7c94f18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add prompt MinHash columns and an index for LSH candidate lookup."""
+    # Existing skills are fingerprinted by `python -m tasks.skill_dedup`
+    op.add_column(
+        "skills", sa.Column("prompt_minhash", postgresql.ARRAY(sa.BigInteger()))
+    )
+    op.add_column("skills", sa.Column("prompt_lsh", postgresql.ARRAY(sa.BigInteger())))
+
+    # Serves prompt_lsh && :bands in SkillCRUD.find_duplicate
+    op.create_index(
+        "idx_skills_prompt_lsh",
+        "skills",
+        ["prompt_lsh"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Remove prompt MinHash columns from skills table."""
+    op.drop_index("idx_skills_prompt_lsh", table_name="skills")
+    op.drop_column("skills", "prompt_lsh")
+    op.drop_column("skills", "prompt_minhash")
@@ -0,0 +1,47 @@
+"""add_message_recency_indexes
+
+Revision ID: f3a9c2d71b84
+Revises: e8f14b6c2d57
+Create Date: 2026-10-19 17:05:31.448210
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a9c2d71b84"
+down_revision: Union[str, Sequence[str], None] = "e8f14b6c2d57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Replace the single-column message indexes with (col, created_at, id)."""
+    # Serve "latest N messages of a user / goal" as a backward index scan
+    # (MessageCRUD.get_by_user) and keyset walks; the new indexes lead with
+    # the old columns, so foreign key lookups keep an index
+    op.create_index(
+        "ix_messages_user_id_created_at",
+        "messages",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_messages_goal_id_created_at",
+        "messages",
+        ["goal_id", "created_at", "id"],
+        unique=False,
+    )
+    op.drop_index("ix_messages_user_id", table_name="messages")
+    op.drop_index("ix_messages_goal_id", table_name="messages")
+
+
+def downgrade() -> None:
+    """Restore the single-column message indexes."""
+    op.create_index("ix_messages_goal_id", "messages", ["goal_id"], unique=False)
+    op.create_index("ix_messages_user_id", "messages", ["user_id"], unique=False)
+    op.drop_index("ix_messages_goal_id_created_at", table_name="messages")
+    op.drop_index("ix_messages_user_id_created_at", table_name="messages")
@@ -4,11 +4,11 @@ import html
 import logging
 import os
 import time
+from typing import Any, Awaitable
 
-from telegram_client import md_to_html
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.pool import NullPool
+from telegram_client import TELEGRAM_API_URL, md_to_html, record_send
 from telegram import Update
+from telegram.error import BadRequest, RetryAfter
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -19,42 +19,45 @@ from telegram.ext import (
 from dotenv import load_dotenv
 
 from ai.agent_manager import AgentManager
+from database import AsyncSessionLocal
 from services.services import MessageService, UserCRUD
+from services.catalog import skill_catalog
+from services.counters import skill_usage
+from services.web_search import exa_client
+from services import sql_profiler
 from models.models import User
+import metrics
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-# Database
-_POSTGRES_HOST = os.getenv("POSTGRES_HOST", "localhost")
-_POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
-_POSTGRES_USER = os.getenv("POSTGRES_USER", "admin")
-_POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "admin123")
-_POSTGRES_DB = os.getenv("POSTGRES_DB", "parth_db")
-DATABASE_URL = f"postgresql+asyncpg://{_POSTGRES_USER}:{_POSTGRES_PASSWORD}@{_POSTGRES_HOST}:{_POSTGRES_PORT}/{_POSTGRES_DB}"
-
-
-def _make_session():
-    engine = create_async_engine(
-        DATABASE_URL,
-        echo=False,
-        pool_pre_ping=False,
-        poolclass=NullPool,
-    )
-    return async_sessionmaker(
-        engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-        autocommit=False,
-        autoflush=False,
-    )
+# Port for the Prometheus /metrics endpoint (0 disables it)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+
+
+async def _tracked(method: str, call: Awaitable) -> Any:
+    """Await a Telegram API call, counting its outcome (and 429s)."""
+    try:
+        result = await call
+    except RetryAfter:
+        record_send(method, "rate_limited")
+        raise
+    except BadRequest as e:
+        # Editing a message to the same text is rejected but harmless
+        not_modified = "not modified" in str(e).lower()
+        record_send(method, "not_modified" if not_modified else "error")
+        raise
+    except Exception:
+        record_send(method, "error")
+        raise
+    record_send(method, "ok")
+    return result
 
 
 async def get_user_and_history(telegram_id: int) -> tuple[User, list[dict]]:
     """Get or create user and fetch recent message history."""
-    SessionLocal = _make_session()
-    async with SessionLocal() as db:
+    async with AsyncSessionLocal() as db:
         user_crud = UserCRUD(model=User)
         user = await user_crud.get_or_create_by_telegram_id(db, telegram_id=telegram_id)
         msg_service = MessageService(db)
@@ -91,14 +94,16 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         user, history = await get_user_and_history(telegram_id)
     except Exception as e:
         logger.exception("DB error getting user/history: %s", e)
-        await update.message.reply_text(
-            "Sorry, I couldn't load your data. Please try again."
+        await _tracked(
+            "sendMessage",
+            update.message.reply_text(
+                "Sorry, I couldn't load your data. Please try again."
+            ),
         )
         return
 
     # Save user message
-    SessionLocal = _make_session()
-    async with SessionLocal() as db:
+    async with AsyncSessionLocal() as db:
         msg_service = MessageService(db)
         await msg_service.create_message(
             user_id=user.id,
@@ -114,7 +119,9 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         model=os.getenv("OPENAI_MODEL", "gpt-5.2"),
     )
 
-    sent_msg = await update.message.reply_text("🪶 Thinking...")
+    sent_msg = await _tracked(
+        "sendMessage", update.message.reply_text("🪶 Thinking...")
+    )
     full_response = ""
     tool_calls = []
     active_tools = []
@@ -137,9 +144,12 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             if now - last_edit >= EDIT_INTERVAL or event["type"] == "tool_call":
                 display = _build_display(full_response, tool_calls, active_tools)
                 try:
-                    await sent_msg.edit_text(
-                        display or "🪶 Thinking...",
-                        parse_mode="HTML",
+                    await _tracked(
+                        "editMessageText",
+                        sent_msg.edit_text(
+                            display or "🪶 Thinking...",
+                            parse_mode="HTML",
+                        ),
                     )
                     last_edit = now
                 except Exception:
@@ -147,14 +157,16 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
         # Final message
         display = _build_display(full_response, tool_calls, [])
-        await sent_msg.edit_text(
-            display or "No response generated.",
-            parse_mode="HTML",
+        await _tracked(
+            "editMessageText",
+            sent_msg.edit_text(
+                display or "No response generated.",
+                parse_mode="HTML",
+            ),
         )
 
         # Save assistant message
-        SessionLocal2 = _make_session()
-        async with SessionLocal2() as db:
+        async with AsyncSessionLocal() as db:
             msg_service = MessageService(db)
             await msg_service.create_message(
                 user_id=user.id,
@@ -183,12 +195,36 @@ def _build_display(response: str, tool_calls: list, active_tools: list) -> str:
     return text[:4090] + "..." if len(text) > 4096 else text
 
 
+async def post_init(app: Application) -> None:
+    """Preload the skill catalog so skill reads don't hit the DB, start
+    batching skill usage counts and serve metrics."""
+    sql_profiler.start()
+    await skill_catalog.start()
+    await skill_usage.start()
+    await metrics.start_server(METRICS_PORT)
+
+
+async def post_shutdown(app: Application) -> None:
+    await metrics.stop_server()
+    await skill_usage.stop()
+    await skill_catalog.stop()
+    await exa_client.close()
+    sql_profiler.stop()
+
+
 def main() -> None:
     token = os.getenv("TELEGRAM_BOT_TOKEN")
     if not token:
         raise ValueError("TELEGRAM_BOT_TOKEN must be set in environment")
 
-    app = Application.builder().token(token).build()
+    app = (
+        Application.builder()
+        .token(token)
+        .base_url(f"{TELEGRAM_API_URL}/bot")
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
     app.add_handler(CommandHandler("start", start))
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
 
@@ -0,0 +1 @@
+"""Performance benchmarks for Parth.ai (run against a local database)"""
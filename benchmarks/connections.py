@@ -0,0 +1,241 @@
+"""
+Benchmark server connections used versus throughput per pooling mode.
+
+Drives simulated agent runs through AgentContext (two read tools, a model
+call, a write, a second model call while the run's transaction stays
+open, commit) at a fixed concurrency, once per engine configuration. Each
+configuration runs in a subprocess with its environment set, since
+database.py reads it at import:
+
+- pool N+M:  the per-process pool (DB_POOL_SIZE=N, DB_MAX_OVERFLOW=M)
+- pgbouncer: DATABASE_POOLER=pgbouncer (NullPool, no prepared statement
+             reuse) against POSTGRES_HOST/PORT
+
+Server connections are sampled from pg_stat_activity every 20 ms (all
+client backends of the database, so run it on an otherwise idle one).
+Against Postgres directly the pgbouncer mode shows the client side: a
+connection per session, opened and closed each time. To measure through
+the pooler, point POSTGRES_HOST/PORT at PgBouncer (pool_mode=transaction)
+and DATABASE_DIRECT_URL at Postgres, which the sampler uses.
+
+Test users get telegram ids from BENCH_TELEGRAM_ID upwards and are
+deleted, with their goals and messages, at the end.
+
+Usage:
+    python -m benchmarks.connections [runs] [concurrency] [model_ms]
+    python -m benchmarks.connections 300 50 200
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BENCH_TELEGRAM_ID = 7_660_000_000
+
+CONFIGS = {
+    "pool 5+5": {"DB_POOL_SIZE": "5", "DB_MAX_OVERFLOW": "5"},
+    "pool 10+10": {"DB_POOL_SIZE": "10", "DB_MAX_OVERFLOW": "10"},
+    "pool 10+20": {"DB_POOL_SIZE": "10", "DB_MAX_OVERFLOW": "20"},
+    "pool 25+25": {"DB_POOL_SIZE": "25", "DB_MAX_OVERFLOW": "25"},
+    "pgbouncer": {"DATABASE_POOLER": "pgbouncer"},
+}
+
+COUNT_CONNECTIONS = """
+    SELECT count(*) FROM pg_stat_activity
+    WHERE datname = current_database()
+      AND backend_type = 'client backend'
+      AND pid <> pg_backend_pid()
+"""
+
+
+async def agent_run(user_id: int, model_s: float) -> None:
+    """One agent run's database pattern, with model calls as sleeps"""
+    from ai.context import AgentContext
+    from models.models import MessageRole
+    from services import message_crud
+
+    async with AgentContext(user_id=str(user_id)) as context:
+        async with context.read_db() as db:
+            await context.load_goals(db)
+        async with context.read_db() as db:
+            await message_crud.get_recent_rows(db, user_id, limit=20)
+        await asyncio.sleep(model_s)
+        async with context.db() as db:
+            await message_crud.create(
+                db, user_id=user_id, role=MessageRole.assistant, content="Nice work today"
+            )
+        await asyncio.sleep(model_s)
+
+
+async def _sample(dsn: str, samples: list[int], stop: asyncio.Event) -> None:
+    import asyncpg
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        while not stop.is_set():
+            samples.append(await conn.fetchval(COUNT_CONNECTIONS))
+            await asyncio.sleep(0.02)
+    finally:
+        await conn.close()
+
+
+async def run_config(user_ids: list[int], runs: int, concurrency: int, model_s: float) -> dict:
+    """Run in the subprocess: drive the runs and report one JSON line"""
+    from sqlalchemy import event
+
+    from database import DATABASE_DIRECT_URL, engine
+
+    opened = 0
+
+    def on_connect(*_):
+        nonlocal opened
+        opened += 1
+
+    event.listen(engine.sync_engine, "connect", on_connect)
+
+    samples: list[int] = []
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(
+        _sample(DATABASE_DIRECT_URL.replace("postgresql+asyncpg://", "postgresql://"), samples, stop)
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await agent_run(user_ids[i % len(user_ids)], model_s)
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(runs)))
+    wall = time.perf_counter() - start
+    stop.set()
+    await sampler
+    await engine.dispose()
+
+    ms = sorted(s * 1000 for s in latencies)
+    return {
+        "throughput": len(ms) / wall,
+        "p50": ms[len(ms) // 2] if ms else 0,
+        "p95": ms[min(len(ms) - 1, int(len(ms) * 0.95))] if ms else 0,
+        "peak": max(samples, default=0),
+        "mean": statistics.mean(samples) if samples else 0,
+        "opened": opened,
+        "errors": errors,
+    }
+
+
+async def _setup(users: int) -> list[int]:
+    from sqlalchemy import text
+
+    from database import engine
+
+    async with engine.begin() as conn:
+        result = await conn.execute(
+            text(
+                """
+                INSERT INTO users (telegram_id, timezone, is_active, created_at, updated_at)
+                SELECT CAST(:base AS bigint) + i, 'UTC', true, now(), now()
+                FROM generate_series(0, :users - 1) AS i
+                RETURNING id
+                """
+            ),
+            {"base": BENCH_TELEGRAM_ID, "users": users},
+        )
+        user_ids = [row[0] for row in result]
+        await conn.execute(
+            text(
+                """
+                INSERT INTO goals (user_id, title, status, created_at, updated_at)
+                SELECT u, 'Goal ' || g, 'active', now(), now()
+                FROM unnest(CAST(:ids AS int[])) AS u, generate_series(1, 3) AS g
+                """
+            ),
+            {"ids": user_ids},
+        )
+    return user_ids
+
+
+async def _cleanup() -> None:
+    from sqlalchemy import text
+
+    from database import engine
+
+    users = "telegram_id BETWEEN :base AND CAST(:base AS bigint) + 999999"
+    async with engine.begin() as conn:
+        for table in ("messages", "goals"):
+            await conn.execute(
+                text(f"DELETE FROM {table} WHERE user_id IN (SELECT id FROM users WHERE {users})"),
+                {"base": BENCH_TELEGRAM_ID},
+            )
+        await conn.execute(text(f"DELETE FROM users WHERE {users}"), {"base": BENCH_TELEGRAM_ID})
+
+
+async def compare(runs: int, concurrency: int, model_ms: float) -> None:
+    from database import engine
+
+    await _cleanup()
+    user_ids = await _setup(concurrency)
+    # Only the subprocesses' connections should be counted
+    await engine.dispose()
+
+    print(f"\n{'='*78}")
+    print(f"{runs} agent runs, concurrency {concurrency}, model calls {model_ms:.0f}ms")
+    print(f"{'='*78}")
+    print(
+        f"{'config':<12} {'runs/s':>7} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'peak conns':>11} {'mean conns':>11} {'opened':>7}"
+    )
+    try:
+        for label, env in CONFIGS.items():
+            args = json.dumps([user_ids, runs, concurrency, model_ms / 1000])
+            proc = await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "benchmarks.connections", "--run", args,
+                env={**os.environ, **env},
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            stdout, stderr = await proc.communicate()
+            if proc.returncode != 0:
+                print(f"{label:<12} failed: {stderr.decode().strip().splitlines()[-1]}")
+                continue
+            r = json.loads(stdout.decode().strip().splitlines()[-1])
+            print(
+                f"{label:<12} {r['throughput']:>7.1f} {r['p50']:>8.0f} {r['p95']:>8.0f} "
+                f"{r['peak']:>11} {r['mean']:>11.1f} {r['opened']:>7}"
+                + (f"   errors={r['errors']}" if r["errors"] else "")
+            )
+    finally:
+        await _cleanup()
+        await engine.dispose()
+    print(f"{'='*78}\n")
+
+
+def main():
+    if sys.argv[1:2] == ["--run"]:
+        user_ids, runs, concurrency, model_s = json.loads(sys.argv[2])
+        print(json.dumps(asyncio.run(run_config(user_ids, runs, concurrency, model_s))))
+        return
+
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    model_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 200
+    asyncio.run(compare(runs, concurrency, model_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Local stand-ins for external APIs, for benchmarks and offline runs"""
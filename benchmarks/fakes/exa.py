@@ -0,0 +1,100 @@
+"""
+Stub Exa search server.
+
+Answers POST /search with deterministic results shaped like Exa's (title,
+url, publishedDate, text), honoring num_results and max_characters, after
+an optional artificial latency. Any x-api-key is accepted. Run it and point
+the app at it:
+
+Usage:
+    python -m benchmarks.fakes.exa [port] [latency_ms]
+    EXA_BASE_URL=http://localhost:8765 EXA_API_KEY=stub python main.py
+"""
+
+import hashlib
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PARAGRAPH = (
+    "Consistency beats intensity: small daily actions compound into large "
+    "results. Track one primary metric, review progress weekly, and plan for "
+    "missed days instead of treating them as failures. "
+)
+
+
+def fake_results(query: str, num_results: int, max_characters: int) -> dict:
+    """Deterministic Exa-like response for a query"""
+    results = []
+    for i in range(num_results):
+        slug = hashlib.sha1(f"{query}:{i}".encode()).hexdigest()[:10]
+        text = f"{query.title()} - guide {i + 1}. " + PARAGRAPH * 200
+        results.append(
+            {
+                "id": slug,
+                "title": f"{query.title()}: guide {i + 1}",
+                "url": f"https://example.com/{slug}",
+                "publishedDate": "2026-01-15T00:00:00.000Z",
+                "author": None,
+                "text": text[:max_characters],
+            }
+        )
+    return {"requestId": hashlib.sha1(query.encode()).hexdigest(), "results": results}
+
+
+class ExaHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    requests = 0
+
+    def do_POST(self):
+        if self.path != "/search":
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        type(self).requests += 1
+        time.sleep(self.latency)
+        max_characters = (
+            body.get("contents", {}).get("text", {}).get("max_characters", 1000)
+        )
+        payload = json.dumps(
+            fake_results(body["query"], body.get("num_results", 10), max_characters)
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def running(port: int = 0, latency: float = 0.0):
+    """Run the stub in a background thread; yields (base URL, handler class,
+    whose requests attribute counts the searches served)"""
+    handler = type("Handler", (ExaHandler,), {"latency": latency, "requests": 0})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}", handler
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.0
+    ExaHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", port), ExaHandler)
+    print(f"Stub Exa server on http://127.0.0.1:{port} (latency {latency * 1000:.0f}ms)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Scripted OpenAI-compatible chat completions server.
+
+Answers POST /v1/chat/completions, streamed (SSE) or not, after configurable
+latencies: time to first token, then a delay per streamed chunk. Replies are
+scripted from the request rather than generated:
+
+- response_format json_object (the proactive agent): a check-in decision,
+  send_now / schedule / skip picked deterministically from the prompt
+- tools offered and no tool result since the last user message (the
+  reactive agent's first step): calls to the scripted tools that are offered
+- otherwise: a text answer of `tokens` words
+
+Usage reports token counts estimated from request and reply size. Any API
+key is accepted. Run it and point the app at it (the Agents SDK must use
+the chat completions API, see benchmarks/load.py):
+
+Usage:
+    python -m benchmarks.fakes.openai [port] [ttft_ms] [token_ms]
+    OPENAI_BASE_URL=http://localhost:8766/v1 OPENAI_API_KEY=stub python main.py
+"""
+
+import hashlib
+import json
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Tools called on the reactive agent's first step, when offered
+TOOL_SCRIPT = [
+    ("list_goals", {}),
+    ("get_recent_messages", {"limit": 20}),
+]
+
+WORDS = (
+    "Great progress this week. Keep the streak going: log today's session, "
+    "then plan tomorrow's before bed so the next step is already decided."
+).split()
+
+
+def _estimate_tokens(value) -> int:
+    return max(1, len(json.dumps(value)) // 4)
+
+
+def _decision(prompt: str) -> dict:
+    """Deterministic proactive decision for a prompt"""
+    action = ("send_now", "schedule", "skip")[
+        int(hashlib.sha1(prompt.encode()).hexdigest(), 16) % 3
+    ]
+    return {
+        "action": action,
+        "message": None if action == "skip" else "Quick check-in: how did today go?",
+        "goal_id": None,
+        "send_at": (
+            (datetime.utcnow() + timedelta(hours=2)).isoformat()
+            if action == "schedule"
+            else None
+        ),
+        "reasoning": f"Scripted {action} decision",
+    }
+
+
+def script_reply(body: dict, tokens: int) -> dict:
+    """The assistant message to answer body with: content or tool_calls"""
+    messages = body.get("messages", [])
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        prompt = str(messages[-1].get("content", "")) if messages else ""
+        return {"content": json.dumps(_decision(prompt))}
+
+    offered = {
+        tool.get("function", {}).get("name") for tool in body.get("tools") or []
+    }
+    last_user = max(
+        (i for i, m in enumerate(messages) if m.get("role") == "user"), default=-1
+    )
+    answered = any(m.get("role") == "tool" for m in messages[last_user + 1:])
+    calls = [(name, args) for name, args in TOOL_SCRIPT if name in offered]
+    if calls and not answered:
+        return {
+            "tool_calls": [
+                {
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {"name": name, "arguments": json.dumps(args)},
+                }
+                for name, args in calls
+            ]
+        }
+    return {"content": " ".join(WORDS[i % len(WORDS)] for i in range(tokens))}
+
+
+class OpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    ttft = 0.0
+    token_latency = 0.0
+    tokens = 60
+    requests = 0
+
+    def do_POST(self):
+        if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        type(self).requests += 1
+        reply = script_reply(body, self.tokens)
+        usage = {
+            "prompt_tokens": _estimate_tokens(body.get("messages", [])),
+            "completion_tokens": _estimate_tokens(reply),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        time.sleep(self.ttft)
+        if body.get("stream"):
+            self._stream(body, reply, usage)
+        else:
+            self._send_json(200, self._completion(body, reply, usage))
+
+    def _completion(self, body, reply, usage) -> dict:
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": None, **reply},
+                    "finish_reason": "tool_calls" if "tool_calls" in reply else "stop",
+                }
+            ],
+            "usage": usage,
+        }
+
+    def _stream(self, body, reply, usage):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        base = {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+        }
+
+        def chunk(delta, finish_reason=None):
+            self._event(
+                {
+                    **base,
+                    "choices": [
+                        {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                    ],
+                }
+            )
+
+        chunk({"role": "assistant", "content": ""})
+        if "tool_calls" in reply:
+            for index, call in enumerate(reply["tool_calls"]):
+                chunk(
+                    {
+                        "tool_calls": [
+                            {
+                                "index": index,
+                                "id": call["id"],
+                                "type": "function",
+                                "function": {"name": call["function"]["name"], "arguments": ""},
+                            }
+                        ]
+                    }
+                )
+                chunk(
+                    {
+                        "tool_calls": [
+                            {"index": index, "function": {"arguments": call["function"]["arguments"]}}
+                        ]
+                    }
+                )
+            chunk({}, "tool_calls")
+        else:
+            for i, word in enumerate(reply["content"].split(" ")):
+                if i:
+                    time.sleep(self.token_latency)
+                chunk({"content": word if i == 0 else f" {word}"})
+            chunk({}, "stop")
+        if (body.get("stream_options") or {}).get("include_usage"):
+            self._event({**base, "choices": [], "usage": usage})
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _event(self, data: dict):
+        self._write_chunk(f"data: {json.dumps(data)}\n\n".encode())
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status: int, payload: dict):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def running(port: int = 0, ttft: float = 0.0, token_latency: float = 0.0, tokens: int = 60):
+    """Run the fake in a background thread; yields (base URL ending in /v1,
+    handler class, whose requests attribute counts the completions served)"""
+    handler = type(
+        "Handler",
+        (OpenAIHandler,),
+        {"ttft": ttft, "token_latency": token_latency, "tokens": tokens, "requests": 0},
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/v1", handler
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8766
+    OpenAIHandler.ttft = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.0
+    OpenAIHandler.token_latency = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.0
+    server = ThreadingHTTPServer(("127.0.0.1", port), OpenAIHandler)
+    server.daemon_threads = True
+    print(
+        f"Fake OpenAI server on http://127.0.0.1:{port}/v1 "
+        f"(ttft {OpenAIHandler.ttft * 1000:.0f}ms, {OpenAIHandler.token_latency * 1000:.0f}ms/token)"
+    )
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
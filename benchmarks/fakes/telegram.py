@@ -0,0 +1,149 @@
+"""
+Fake Telegram Bot API server.
+
+Answers POST /bot<token>/<method> for the methods the app uses (getMe,
+sendMessage, editMessageText, sendChatAction, ...), with JSON or form
+bodies, as python-telegram-bot and telegram_client.py send them. Sent and
+edited messages get ids like Telegram's; calls are counted per method. Optionally enforces
+Telegram's per-chat flood limit: a call less than `chat_interval` seconds
+after the previous one to the same chat gets a 429 with retry_after.
+
+Usage:
+    python -m benchmarks.fakes.telegram [port] [chat_interval_ms]
+    TELEGRAM_API_URL=http://localhost:8767 TELEGRAM_BOT_TOKEN=stub python main.py
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+BOT_USER = {"id": 1000001, "is_bot": True, "first_name": "Parth", "username": "parth_fake_bot"}
+
+
+class TelegramHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    chat_interval = 0.0
+    calls: Counter = Counter()
+    rate_limited: Counter = Counter()
+    _last_call: dict = {}
+    _message_id = 0
+    _lock = threading.Lock()
+
+    def do_POST(self):
+        parts = self.path.strip("/").split("/")
+        if len(parts) != 2 or not parts[0].startswith("bot"):
+            self._reply(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+            return
+        method = parts[1]
+        params = self._params()
+        cls = type(self)
+        message_id = None
+        with cls._lock:
+            cls.calls[method] += 1
+            chat_id = params.get("chat_id")
+            now = time.monotonic()
+            if chat_id is not None and cls.chat_interval and method != "sendChatAction":
+                wait = cls._last_call.get(chat_id, -1e9) + cls.chat_interval - now
+                if wait > 0:
+                    cls.rate_limited[method] += 1
+                    retry_after = max(1, round(wait))
+                    self._reply(
+                        429,
+                        {
+                            "ok": False,
+                            "error_code": 429,
+                            "description": f"Too Many Requests: retry after {retry_after}",
+                            "parameters": {"retry_after": retry_after},
+                        },
+                    )
+                    return
+                cls._last_call[chat_id] = now
+            if method in ("sendMessage", "editMessageText"):
+                if method == "sendMessage":
+                    cls._message_id += 1
+                message_id = int(params.get("message_id") or cls._message_id)
+        self._reply(200, {"ok": True, "result": self._result(method, params, message_id)})
+
+    def _params(self) -> dict:
+        raw = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode()
+        if "json" in (self.headers.get("Content-Type") or ""):
+            return json.loads(raw or "{}")
+        params = {}
+        for key, value in parse_qsl(raw):
+            # python-telegram-bot JSON-encodes non-string form values
+            try:
+                params[key] = json.loads(value)
+            except ValueError:
+                params[key] = value
+        return params
+
+    @staticmethod
+    def _result(method: str, params: dict, message_id):
+        if method == "getMe":
+            return BOT_USER
+        if method in ("sendMessage", "editMessageText"):
+            chat_id = int(params.get("chat_id") or 0)
+            return {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": BOT_USER,
+                "text": str(params.get("text", "")),
+            }
+        return True
+
+    def _reply(self, status: int, payload: dict):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def running(port: int = 0, chat_interval: float = 0.0):
+    """Run the fake in a background thread; yields (API base URL, handler
+    class, whose calls and rate_limited counters are per method)"""
+    handler = type(
+        "Handler",
+        (TelegramHandler,),
+        {
+            "chat_interval": chat_interval,
+            "calls": Counter(),
+            "rate_limited": Counter(),
+            "_last_call": {},
+            "_message_id": 0,
+            "_lock": threading.Lock(),
+        },
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}", handler
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8767
+    TelegramHandler.chat_interval = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.0
+    server = ThreadingHTTPServer(("127.0.0.1", port), TelegramHandler)
+    server.daemon_threads = True
+    print(f"Fake Telegram Bot API on http://127.0.0.1:{port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Offline load test: the bot and worker paths against local fakes.
+
+Starts a scripted OpenAI server, a fake Telegram Bot API and the stub Exa
+server (benchmarks/fakes/), points the app at them and drives:
+
+- messages:  handle_message for each user (get/create user, history,
+             streamed agent turn with tool calls, Telegram edits, saves)
+- proactive: run_all_proactive_checkins, with enqueued check-ins run by an
+             in-process queue of `concurrency` workers instead of arq
+- scheduled: execute_scheduled_messages over one due message per user
+
+For each it reports throughput and latency percentiles, plus the calls the
+fakes served. Only OpenAI, Telegram and Exa are faked: a local, migrated
+database is needed. Load users get telegram ids from LOAD_TELEGRAM_ID_BASE
+upwards and are deleted, with everything they own, at the end. Proactive
+check-ins enqueued for other users are dropped, and the scheduled scenario
+is skipped if other users have due messages.
+
+The Agents SDK is switched to the chat completions API, which the fake
+implements, and its trace export is disabled.
+
+Usage:
+    python -m benchmarks.load [scenarios] [users] [concurrency] [ttft_ms] [token_ms]
+    python -m benchmarks.load messages,proactive,scheduled 50 10 300 15
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LOAD_TELEGRAM_ID_BASE = 7_700_000_000
+SCENARIOS = ("messages", "proactive", "scheduled")
+
+
+def _summary(label: str, latencies: list[float], wall: float, errors: int = 0) -> str:
+    ms = sorted(s * 1000 for s in latencies)
+    if not ms:
+        return f"{label:<10} no samples"
+    pct = lambda q: ms[min(len(ms) - 1, int(len(ms) * q))]  # noqa: E731
+    return (
+        f"{label:<10} n={len(ms):<5} {len(ms) / wall:7.1f}/s   "
+        f"p50 {pct(0.50):7.1f} ms   p95 {pct(0.95):7.1f} ms   p99 {pct(0.99):7.1f} ms"
+        + (f"   errors={errors}" if errors else "")
+    )
+
+
+async def _timed(semaphore, latencies, errors, coro_fn, *args):
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            await coro_fn(*args)
+        except Exception as e:
+            errors.append(e)
+        latencies.append(time.perf_counter() - start)
+
+
+async def _seed(users: int) -> dict[int, int]:
+    """Users with one active goal each; returns {telegram_id: user id}."""
+    from database import AsyncSessionLocal
+    from models.models import Goal, GoalData, GoalStatus, User
+
+    async with AsyncSessionLocal() as db:
+        created = {}
+        for i in range(users):
+            user = User(telegram_id=LOAD_TELEGRAM_ID_BASE + i, timezone="UTC")
+            goal = Goal(user=user, title=f"Run 5K (load user {i})", status=GoalStatus.active)
+            db.add_all([user, goal, GoalData(goal=goal, agent_data={"events": []})])
+            created[user.telegram_id] = user
+        await db.commit()
+        return {tid: user.id for tid, user in created.items()}
+
+
+async def _cleanup() -> None:
+    """Delete load users and every row that references them."""
+    from sqlalchemy import delete, select, update
+
+    from database import AsyncSessionLocal
+    from models.models import (
+        Goal,
+        GoalData,
+        GoalEvent,
+        GoalSkill,
+        Message,
+        ScheduledMessage,
+        Skill,
+        User,
+        UserPreference,
+    )
+
+    async with AsyncSessionLocal() as db:
+        users = select(User.id).where(User.telegram_id >= LOAD_TELEGRAM_ID_BASE)
+        goals = select(Goal.id).where(Goal.user_id.in_(users))
+        await db.execute(delete(Message).where(Message.user_id.in_(users)))
+        await db.execute(delete(ScheduledMessage).where(ScheduledMessage.user_id.in_(users)))
+        await db.execute(delete(GoalEvent).where(GoalEvent.goal_id.in_(goals)))
+        await db.execute(delete(GoalSkill).where(GoalSkill.goal_id.in_(goals)))
+        await db.execute(delete(GoalData).where(GoalData.goal_id.in_(goals)))
+        await db.execute(delete(Goal).where(Goal.id.in_(goals)))
+        await db.execute(delete(UserPreference).where(UserPreference.user_id.in_(users)))
+        await db.execute(
+            update(Skill)
+            .where(Skill.created_by_user_id.in_(users))
+            .values(created_by_user_id=None)
+        )
+        await db.execute(delete(User).where(User.telegram_id >= LOAD_TELEGRAM_ID_BASE))
+        await db.commit()
+
+
+async def run_messages(bot, telegram_ids: list[int], concurrency: int) -> str:
+    from telegram import Update
+
+    from app_telegram import handle_message
+
+    prompts = ["How's my progress?", "What should I focus on today?", "I ran 3km today"]
+    latencies, errors = [], []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int, telegram_id: int):
+        update = Update.de_json(
+            {
+                "update_id": i,
+                "message": {
+                    "message_id": i,
+                    "date": int(time.time()),
+                    "chat": {"id": telegram_id, "type": "private"},
+                    "from": {"id": telegram_id, "is_bot": False, "first_name": "Load"},
+                    "text": prompts[i % len(prompts)],
+                },
+            },
+            bot,
+        )
+        await handle_message(update, None)
+
+    # Untimed first turn: lazy imports and schema builds happen on first use
+    await one(len(telegram_ids), telegram_ids[0])
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(_timed(semaphore, latencies, errors, one, i, tid) for i, tid in enumerate(telegram_ids))
+    )
+    return _summary("messages", latencies, time.perf_counter() - start, len(errors))
+
+
+class InProcessQueue:
+    """Stands in for the arq pool in ctx: enqueued check-ins for load users
+    run on `concurrency` in-process workers, others are dropped."""
+
+    def __init__(self, user_ids: set[int], concurrency: int):
+        self.user_ids = user_ids
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.tasks: list[asyncio.Task] = []
+        self.latencies: list[float] = []
+        self.errors: list[Exception] = []
+        self.dropped = 0
+
+    async def enqueue_job(self, function: str, user_id: int):
+        from worker import run_proactive_checkin
+
+        if user_id not in self.user_ids:
+            self.dropped += 1
+            return
+        self.tasks.append(
+            asyncio.create_task(
+                _timed(self.semaphore, self.latencies, self.errors, run_proactive_checkin, {}, user_id)
+            )
+        )
+
+    async def join(self):
+        await asyncio.gather(*self.tasks)
+
+
+async def run_proactive(user_ids: set[int], concurrency: int) -> str:
+    from ai.proactive_agent import DECISIONS
+    from worker import run_all_proactive_checkins
+
+    queue = InProcessQueue(user_ids, concurrency)
+    start = time.perf_counter()
+    await run_all_proactive_checkins({"redis": queue})
+    await queue.join()
+    wall = time.perf_counter() - start
+    mix = {action: int(DECISIONS.value(action=action, status="completed")) for action in ("send_now", "schedule", "skip")}
+    line = _summary("proactive", queue.latencies, wall, len(queue.errors))
+    return f"{line}\n{'':<10} decisions {mix}" + (
+        f", {queue.dropped} non-load users dropped" if queue.dropped else ""
+    )
+
+
+async def run_scheduled(user_ids: set[int]) -> str:
+    from sqlalchemy import func, select
+
+    from database import AsyncSessionLocal
+    from models.models import MessageStatus, ScheduledMessage
+    from tasks.scheduled_messages import execute_scheduled_messages
+
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        others = await db.scalar(
+            select(func.count())
+            .select_from(ScheduledMessage)
+            .where(
+                ScheduledMessage.status == MessageStatus.pending,
+                ScheduledMessage.scheduled_for <= now,
+                ScheduledMessage.user_id.not_in(user_ids),
+            )
+        )
+        if others:
+            return f"{'scheduled':<10} skipped: {others} due messages of other users would be sent"
+        db.add_all(
+            ScheduledMessage(
+                user_id=user_id,
+                scheduled_for=now - timedelta(minutes=1),
+                message_content="Scheduled check-in: how is it going?",
+            )
+            for user_id in user_ids
+        )
+        await db.commit()
+
+    start = time.perf_counter()
+    result = await execute_scheduled_messages({})
+    wall = time.perf_counter() - start
+    sent = result.get("messages_sent", 0)
+    return (
+        f"{'scheduled':<10} n={sent + result.get('messages_failed', 0):<5} "
+        f"{sent / wall:7.1f} sent/s   wall {wall * 1000:7.1f} ms   "
+        f"failed={result.get('messages_failed', 0)}"
+    )
+
+
+async def main():
+    scenarios = sys.argv[1].split(",") if len(sys.argv) > 1 else list(SCENARIOS)
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    ttft = float(sys.argv[4]) / 1000 if len(sys.argv) > 4 else 0.3
+    token_latency = float(sys.argv[5]) / 1000 if len(sys.argv) > 5 else 0.01
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        print(f"Unknown scenarios {sorted(unknown)}; choose from {', '.join(SCENARIOS)}")
+        sys.exit(1)
+
+    from benchmarks.fakes import exa as fake_exa
+    from benchmarks.fakes import openai as fake_openai
+    from benchmarks.fakes import telegram as fake_telegram
+
+    with (
+        fake_openai.running(ttft=ttft, token_latency=token_latency) as (openai_url, llm),
+        fake_telegram.running() as (telegram_url, tg),
+        fake_exa.running() as (exa_url, _),
+        tempfile.TemporaryDirectory() as cache_dir,
+    ):
+        # Before the app modules read them at import
+        os.environ.update(
+            OPENAI_BASE_URL=openai_url,
+            OPENAI_API_KEY="stub",
+            TELEGRAM_API_URL=telegram_url,
+            TELEGRAM_BOT_TOKEN="stub",
+            EXA_BASE_URL=exa_url,
+            EXA_API_KEY="stub",
+            WEB_SEARCH_CACHE_DIR=cache_dir,
+            AGENT_TRACE_LOG="0",
+        )
+        from agents import set_default_openai_api, set_tracing_disabled
+        from telegram import Bot
+
+        from services.catalog import skill_catalog
+        from services.counters import skill_usage
+
+        set_default_openai_api("chat_completions")
+        set_tracing_disabled(True)
+        # worker.py configures INFO logging at import; keep the report readable
+        import worker  # noqa: F401
+
+        logging.getLogger().setLevel(logging.WARNING)
+
+        print("=" * 78)
+        print(
+            f"{users} users, concurrency {concurrency}, "
+            f"fake LLM ttft {ttft * 1000:.0f}ms + {token_latency * 1000:.0f}ms/token"
+        )
+        print("=" * 78)
+
+        await _cleanup()
+        ids = await _seed(users)
+        user_ids = set(ids.values())
+        await skill_catalog.start()
+        await skill_usage.start()
+        bot = Bot("stub", base_url=f"{telegram_url}/bot")
+        await bot.initialize()
+        try:
+            if "messages" in scenarios:
+                print(await run_messages(bot, list(ids), concurrency))
+            if "proactive" in scenarios:
+                print(await run_proactive(user_ids, concurrency))
+            if "scheduled" in scenarios:
+                print(await run_scheduled(user_ids))
+        finally:
+            await bot.shutdown()
+            await skill_usage.stop()
+            await skill_catalog.stop()
+            await _cleanup()
+
+        print("-" * 78)
+        print(f"LLM completions: {llm.requests}")
+        print(f"Telegram calls:  {dict(tg.calls)}")
+        if tg.rate_limited:
+            print(f"Telegram 429s:   {dict(tg.rate_limited)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
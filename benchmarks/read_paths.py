@@ -0,0 +1,245 @@
+"""
+Benchmark tool read paths: ORM objects + json.dumps vs read models + dumps.
+
+For large result sets (a long message history, a user with many goals,
+a wide skill search candidate pool) compares the previous read path
+(hydrate full ORM objects, copy fields into dicts, json.dumps) with the
+projected one (select only the needed columns into slotted read models,
+services.serialization.dumps). Reports client CPU per call (the app's
+share: driver decoding, hydration, encoding; not server time) and peak
+Python memory allocated during a call.
+
+Rows are inserted in a transaction that is rolled back afterwards, so the
+database is left unchanged.
+
+Usage:
+    python -m benchmarks.read_paths [rows] [repeats]
+    python -m benchmarks.read_paths 5000 20
+"""
+
+import asyncio
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BENCH_TELEGRAM_ID = 7_650_000_000
+
+INSERT_ROWS = """
+    WITH u AS (
+        INSERT INTO users (telegram_id, timezone, is_active, created_at, updated_at)
+        VALUES (:telegram_id, 'UTC', true, now(), now())
+        RETURNING id
+    ), g AS (
+        INSERT INTO goals (user_id, title, status, created_at, updated_at)
+        SELECT u.id, 'Goal ' || i, 'active', now(), now()
+        FROM u, generate_series(1, :goals) AS i
+        RETURNING id
+    ), gd AS (
+        INSERT INTO goal_data (goal_id, agent_data, created_at, updated_at)
+        SELECT g.id, jsonb_build_object(
+            'target_level', 'beginner', 'daily_minutes', 30,
+            'snapshot', jsonb_build_object('current_streak', 12, 'longest_streak', 21)
+        ), now(), now()
+        FROM g
+    )
+    INSERT INTO messages (user_id, role, content, created_at, updated_at)
+    SELECT u.id,
+        CASE WHEN i % 2 = 0 THEN 'user' ELSE 'assistant' END::messagerole,
+        'Message ' || i || ': ran 3 km this morning, legs are a bit sore but the streak is alive',
+        now() - i * interval '1 minute', now()
+    FROM u, generate_series(1, :messages) AS i
+"""
+
+INSERT_SKILLS = """
+    INSERT INTO skills (
+        name, title, description, skill_prompt, skill_metadata, created_by_type,
+        usage_count, is_active, created_at, updated_at,
+        embedding, embedding_model, prompt_minhash, prompt_lsh
+    )
+    SELECT
+        'read_paths_' || i, 'Read paths skill ' || i,
+        'Guides daily practice with weekly reviews', repeat('Coach the user. ', 60),
+        '{"category": "health", "intensity": "medium"}'::jsonb, 'agent',
+        i % 50, true, now(), now(),
+        (SELECT array_agg(random()::real) FROM generate_series(1, :dim) WHERE i > 0),
+        'bench',
+        (SELECT array_agg((random() * 1e15)::bigint) FROM generate_series(1, 128) WHERE i > 0),
+        (SELECT array_agg((random() * 1e15)::bigint) FROM generate_series(1, 32) WHERE i > 0)
+    FROM generate_series(1, :skills) AS i
+    RETURNING id
+"""
+
+
+async def measure(db, call, repeats: int) -> tuple[float, float, int]:
+    """Median client CPU ms per call, peak KiB allocated, output size"""
+    await call()
+    db.expunge_all()
+    cpu = []
+    for _ in range(repeats):
+        start = time.process_time()
+        await call()
+        cpu.append(time.process_time() - start)
+        # Tools read through a fresh session; don't reuse hydrated objects
+        db.expunge_all()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    output = await call()
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    db.expunge_all()
+    return statistics.median(cpu) * 1000, peak / 1024, len(output)
+
+
+def _paths(db, user_id: int, skill_ids: list[int], rows: int):
+    from sqlalchemy import select
+    from sqlalchemy.orm import joinedload
+
+    from ai.context import AgentContext
+    from models.models import Goal, Skill
+    from services import message_crud
+    from services.read_models import SKILL_COLUMNS, SkillRow
+    from services.serialization import dumps
+
+    async def messages_orm():
+        messages = await message_crud.get_by_user(db, user_id, limit=rows)
+        return json.dumps(
+            [
+                {
+                    "role": m.role.value,
+                    "content": m.content,
+                    "goal_id": m.goal_id,
+                    "created_at": m.created_at.isoformat(),
+                }
+                for m in messages
+            ]
+        )
+
+    async def messages_rows():
+        return dumps(await message_crud.get_recent_rows(db, user_id, limit=rows))
+
+    async def goals_orm():
+        result = await db.execute(
+            select(Goal).options(joinedload(Goal.goal_data)).where(Goal.user_id == user_id)
+        )
+        return json.dumps(
+            [
+                {
+                    "id": g.id,
+                    "title": g.title,
+                    "status": g.status.value,
+                    "created_at": g.created_at.isoformat(),
+                    "updated_at": g.updated_at.isoformat(),
+                    "data": g.goal_data.agent_data if g.goal_data else {},
+                }
+                for g in result.unique().scalars().all()
+            ]
+        )
+
+    async def goals_rows():
+        context = AgentContext(user_id=str(user_id))
+        goals = await context.load_goals(db)
+        return dumps(
+            [
+                {
+                    "id": g.id,
+                    "title": g.title,
+                    "status": g.status,
+                    "created_at": g.created_at,
+                    "updated_at": g.updated_at,
+                    "data": context.goal_data[g.id],
+                }
+                for g in goals
+            ]
+        )
+
+    def skill_dict(skill):
+        return {
+            "id": skill.id,
+            "name": skill.name,
+            "title": skill.title,
+            "description": skill.description,
+            "usage_count": skill.usage_count,
+            "created_by_type": skill.created_by_type.value,
+            "metadata": skill.skill_metadata,
+        }
+
+    async def skills_orm():
+        result = await db.execute(select(Skill).where(Skill.id.in_(skill_ids)))
+        return json.dumps([skill_dict(s) for s in result.scalars().all()])
+
+    async def skills_rows():
+        result = await db.execute(select(*SKILL_COLUMNS).where(Skill.id.in_(skill_ids)))
+        return dumps([skill_dict(SkillRow(*row)) for row in result.all()])
+
+    return {
+        "messages": (messages_orm, messages_rows),
+        "goals": (goals_orm, goals_rows),
+        "skills": (skills_orm, skills_rows),
+    }
+
+
+async def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from database import engine
+    from services import serialization
+    from services.embeddings import skill_embedding_index
+
+    goals = max(rows // 25, 1)
+    print(f"\n{'='*78}")
+    print(
+        f"Tool read paths: {rows:,} messages, {goals:,} goals, {rows // 10:,} skills "
+        f"(encoder: {'orjson' if serialization.orjson else 'json'})"
+    )
+    print(f"{'='*78}")
+    print(f"{'path':<10} {'variant':<12} {'cpu ms/call':>12} {'peak KiB':>10} {'output KiB':>11}")
+
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            await conn.execute(
+                text(INSERT_ROWS),
+                {"telegram_id": BENCH_TELEGRAM_ID, "goals": goals, "messages": rows},
+            )
+            result = await conn.execute(
+                text(INSERT_SKILLS),
+                {"skills": rows // 10, "dim": skill_embedding_index.encoder.dim},
+            )
+            skill_ids = [row[0] for row in result]
+            user_id = (
+                await conn.execute(
+                    text("SELECT id FROM users WHERE telegram_id = :t"),
+                    {"t": BENCH_TELEGRAM_ID},
+                )
+            ).scalar_one()
+
+            db = AsyncSession(bind=conn)
+            for path, (orm, projected) in _paths(db, user_id, skill_ids, rows).items():
+                before = await measure(db, orm, repeats)
+                after = await measure(db, projected, repeats)
+                for label, (cpu, peak, size) in (("orm+json", before), ("rows+dumps", after)):
+                    print(f"{path:<10} {label:<12} {cpu:>12.2f} {peak:>10.0f} {size / 1024:>11.1f}")
+                print(
+                    f"{'':<10} {'change':<12} {(after[0] / before[0] - 1) * 100:>+11.0f}% "
+                    f"{(after[1] / before[1] - 1) * 100:>+9.0f}% "
+                    f"{(after[2] / before[2] - 1) * 100:>+10.0f}%"
+                )
+        finally:
+            await transaction.rollback()
+    print(f"{'='*78}\n")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,506 @@
+"""
+Seed a production-sized synthetic dataset with COPY.
+
+Generates N users with realistic, heavy-tailed distributions: goals per user
+(mixed statuses) with goal_data, an event log per goal (goal_events; a few
+goals have thousands of events), goal-skill links drawn from a Zipf-like
+skill popularity, message histories (lognormal per user around the given
+mean, user/assistant turns spread since sign-up) and scheduled messages
+(pending, sent and cancelled). goal_data.agent_data snapshots grow with the
+goal's event count, as the agent's summaries do.
+
+Users are generated in chunks by a pool of worker processes, each streaming
+rows with asyncpg's binary COPY; users, goals and skills get ids from
+reserved ranges so no round-trips are needed to link rows. Sequences are
+advanced and message partitions created up front, and the tables analyzed
+at the end. With the default 100
+messages per user, 1M users is ~100M messages.
+
+Seeded users have telegram ids from SEED_TELEGRAM_ID_BASE and seeded skills
+are named seed-*; `clear` deletes them again (on a dedicated benchmark
+database, dropping it is faster).
+
+Usage:
+    python -m benchmarks.seed <users> [messages_per_user] [workers] [random_seed]
+    python -m benchmarks.seed clear
+"""
+
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SEED_TELEGRAM_ID_BASE = 6_000_000_000
+SEED_TELEGRAM_ID_END = 7_000_000_000
+CHUNK_USERS = 5_000
+MAX_GOALS = 8
+# Skills in the catalog per seeded user (at least MIN_SKILLS)
+SKILLS_PER_USER = 0.01
+MIN_SKILLS = 200
+
+NOW = datetime.utcnow().replace(microsecond=0)
+HISTORY_DAYS = 730
+
+TIMEZONES = [
+    "UTC", "Asia/Kolkata", "America/New_York", "Europe/London", "Europe/Berlin",
+    "America/Los_Angeles", "Asia/Singapore", "Australia/Sydney",
+]
+TIMEZONE_WEIGHTS = [0.10, 0.35, 0.15, 0.10, 0.08, 0.10, 0.07, 0.05]
+
+CATEGORIES = ["health", "wealth", "wisdom", "work", "hobby"]
+GOALS = {
+    "health": ["Run a 5K", "Lose 8 kg", "Sleep 7 hours", "Meditate daily", "Train for a half marathon"],
+    "wealth": ["Save 20% of income", "Pay off credit card", "Build an emergency fund", "Track every expense"],
+    "wisdom": ["Read 24 books this year", "Learn Spanish to B1", "Journal every evening", "Study the Gita"],
+    "work": ["Ship the side project", "Get promoted to senior", "Deep work 3 hours a day", "Inbox zero weekly"],
+    "hobby": ["Learn guitar chords", "Paint every weekend", "Cook a new recipe weekly", "Photograph 100 days"],
+}
+GOAL_STATUSES = ["active", "paused", "completed", "abandoned"]
+GOAL_STATUS_WEIGHTS = [0.55, 0.15, 0.15, 0.15]
+
+EVENT_TYPES = [
+    "check_in", "weigh_in", "workout", "progress_update", "missed_checkin",
+    "milestone", "struggle_pattern", "note",
+]
+EVENT_WEIGHTS = [0.40, 0.12, 0.15, 0.12, 0.08, 0.05, 0.04, 0.04]
+
+USER_LINES = [
+    "Done for today", "Missed yesterday, busy at work", "How am I doing this week?",
+    "Ran {n} km this morning", "Weighed in at {n} kg", "Read {n} pages",
+    "I just can't stay consistent", "Can we change the plan?", "What should I focus on today?",
+    "Feeling great, {n} days in a row!",
+]
+ASSISTANT_LINES = [
+    "Nice. That's {n} days straight - the streak is real now.",
+    "Logged it. You're at {n}% of the weekly target; one more session gets you there.",
+    "Fair. Want to stick with the same rhythm or make it {n} sessions a week?",
+    "Two weeks since the last check-in. What got in the way?",
+    "Small steps compound. Plan tomorrow's session before bed so it's already decided.",
+    "Good progress. Let's bump the target to {n} next week.",
+]
+
+
+def _dsn() -> str:
+    # Session settings (session_replication_role) need a direct connection
+    from database import DATABASE_DIRECT_URL
+
+    return DATABASE_DIRECT_URL.replace("postgresql+asyncpg://", "postgresql://")
+
+
+def _timestamps(rng, start: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """n[i] sorted timestamps between start[i] and NOW for each i, flattened."""
+    now = np.datetime64(NOW, "s")
+    span = (now - start).astype(np.int64)
+    owner = np.repeat(np.arange(len(n)), n)
+    offsets = (rng.random(owner.size) * span[owner]).astype(np.int64)
+    order = np.lexsort((offsets, owner))
+    return start[owner][order] + offsets[order].astype("timedelta64[s]")
+
+
+def _choice_list(rng, items, size, weights=None):
+    index = rng.choice(len(items), size=size, p=weights)
+    return [items[i] for i in index.tolist()]
+
+
+def _agent_data(rng, category: str, events: int) -> str:
+    """Goal snapshot; summaries accumulate as the event log grows."""
+    weeks = max(1, events // 7)
+    data = {
+        "category": category,
+        "check_in_frequency": ["daily", "3x week", "weekly"][int(rng.integers(3))],
+        "snapshot": {
+            "current_streak": int(rng.integers(0, 60)),
+            "longest_streak": int(rng.integers(0, 120)),
+            "completion_rate": round(float(rng.random()), 2),
+        },
+        "weekly_summaries": [
+            {"week": w + 1, "sessions": int(rng.integers(0, 7)), "note": "steady"}
+            for w in range(min(weeks, 104))
+        ],
+    }
+    return json.dumps(data)
+
+
+async def _load_chunk(
+    first: int,
+    count: int,
+    user_base: int,
+    goal_base: int,
+    skill_ids: list[int],
+    messages_per_user: int,
+    random_seed: int,
+) -> dict:
+    import asyncpg
+
+    rng = np.random.default_rng(random_seed + first)
+    conn = await asyncpg.connect(_dsn())
+    await conn.execute("SET synchronous_commit = off")
+    try:
+        # Rows are consistent by construction; skipping the per-row FK
+        # triggers roughly halves load time (needs a superuser)
+        await conn.execute("SET session_replication_role = replica")
+    except asyncpg.InsufficientPrivilegeError:
+        pass
+    rows = {}
+    try:
+        # Users, signed up over the last HISTORY_DAYS
+        index = np.arange(first, first + count)
+        user_ids = (user_base + index).tolist()
+        signup = np.datetime64(NOW, "s") - (
+            rng.random(count) * HISTORY_DAYS * 86400
+        ).astype("timedelta64[s]")
+        signup_py = signup.astype("datetime64[us]").tolist()
+        timezones = _choice_list(rng, TIMEZONES, count, TIMEZONE_WEIGHTS)
+        active = (rng.random(count) < 0.95).tolist()
+        rows["users"] = await conn.copy_records_to_table(
+            "users",
+            columns=["id", "telegram_id", "timezone", "is_active", "created_at", "updated_at"],
+            records=zip(
+                user_ids,
+                (SEED_TELEGRAM_ID_BASE + index).tolist(),
+                timezones,
+                active,
+                signup_py,
+                signup_py,
+            ),
+        )
+
+        # Goals: ids from each user's reserved block of MAX_GOALS
+        goals_per_user = np.minimum(rng.poisson(1.8, count), MAX_GOALS)
+        goal_owner = np.repeat(np.arange(count), goals_per_user)
+        goal_slot = np.arange(goal_owner.size) - np.repeat(
+            np.cumsum(goals_per_user) - goals_per_user, goals_per_user
+        )
+        goal_ids = goal_base + (first + goal_owner) * MAX_GOALS + goal_slot
+        goal_created = signup[goal_owner] + (
+            rng.random(goal_owner.size) * (np.datetime64(NOW, "s") - signup[goal_owner]).astype(np.int64)
+        ).astype("timedelta64[s]")
+        categories = _choice_list(rng, CATEGORIES, goal_owner.size)
+        titles = [
+            GOALS[c][int(i)] for c, i in zip(categories, rng.integers(0, 4, goal_owner.size))
+        ]
+        statuses = _choice_list(rng, GOAL_STATUSES, goal_owner.size, GOAL_STATUS_WEIGHTS)
+        goal_created_py = goal_created.astype("datetime64[us]").tolist()
+        goal_user_ids = (user_base + first + goal_owner).tolist()
+        rows["goals"] = await conn.copy_records_to_table(
+            "goals",
+            columns=["id", "user_id", "title", "status", "created_at", "updated_at"],
+            records=zip(
+                goal_ids.tolist(), goal_user_ids, titles, statuses, goal_created_py, goal_created_py
+            ),
+        )
+
+        # Event log per goal: lognormal, median ~20, a long tail into the thousands
+        events_per_goal = np.minimum(
+            rng.lognormal(3.0, 1.2, goal_owner.size).astype(np.int64), 5000
+        )
+        rows["goal_data"] = await conn.copy_records_to_table(
+            "goal_data",
+            columns=["goal_id", "agent_data", "created_at", "updated_at"],
+            records=(
+                (goal_id, _agent_data(rng, category, int(events)), created, NOW)
+                for goal_id, category, events, created in zip(
+                    goal_ids.tolist(), categories, events_per_goal.tolist(), goal_created_py
+                )
+            ),
+        )
+        event_goal = np.repeat(goal_ids, events_per_goal).tolist()
+        event_ts = _timestamps(rng, goal_created, events_per_goal).astype("datetime64[us]").tolist()
+        event_types = _choice_list(rng, EVENT_TYPES, len(event_goal), EVENT_WEIGHTS)
+        values = rng.integers(1, 100, len(event_goal)).tolist()
+        rows["goal_events"] = await conn.copy_records_to_table(
+            "goal_events",
+            columns=["goal_id", "ts", "type", "payload"],
+            records=(
+                (goal_id, ts, kind, f'{{"value": {value}}}')
+                for goal_id, ts, kind, value in zip(event_goal, event_ts, event_types, values)
+            ),
+        )
+
+        # Goal-skill links, popular skills much more often (Zipf-like)
+        links = rng.integers(0, 3, goal_owner.size)
+        link_goal = np.repeat(goal_ids, links).tolist()
+        ranks = (rng.zipf(1.3, len(link_goal)) - 1) % len(skill_ids)
+        link_skill = [skill_ids[r] for r in ranks.tolist()]
+        link_created = np.repeat(goal_created, links).astype("datetime64[us]").tolist()
+        rows["goal_skills"] = await conn.copy_records_to_table(
+            "goal_skills",
+            columns=["goal_id", "skill_id", "customizations", "created_at", "updated_at"],
+            records=(
+                (goal_id, skill_id, '{"daily_minutes": 20}', created, created)
+                for goal_id, skill_id, created in zip(link_goal, link_skill, link_created)
+            ),
+        )
+
+        # Messages: lognormal per user around messages_per_user, alternating roles
+        sigma = 1.0
+        mu = math.log(max(messages_per_user, 1)) - sigma**2 / 2
+        per_user = np.minimum(
+            rng.lognormal(mu, sigma, count).astype(np.int64), messages_per_user * 50
+        )
+        if messages_per_user == 0:
+            per_user[:] = 0
+        msg_owner = np.repeat(np.arange(count), per_user)
+        msg_ts = _timestamps(rng, signup, per_user).astype("datetime64[us]").tolist()
+        position = np.arange(msg_owner.size) - np.repeat(np.cumsum(per_user) - per_user, per_user)
+        roles = np.where(position % 2 == 0, "user", "assistant").tolist()
+        # ~60% of messages are about one of the user's goals
+        has_goal = (goals_per_user[msg_owner] > 0) & (rng.random(msg_owner.size) < 0.6)
+        slot = (rng.random(msg_owner.size) * np.maximum(goals_per_user[msg_owner], 1)).astype(np.int64)
+        msg_goal = np.where(has_goal, goal_base + (first + msg_owner) * MAX_GOALS + slot, -1).tolist()
+        line = rng.integers(0, 60, msg_owner.size).tolist()
+        amount = rng.integers(2, 40, msg_owner.size).tolist()
+        rows["messages"] = await conn.copy_records_to_table(
+            "messages",
+            columns=["user_id", "goal_id", "role", "content", "created_at", "updated_at"],
+            records=(
+                (
+                    user_base + first + owner,
+                    goal if goal >= 0 else None,
+                    role,
+                    (USER_LINES if role == "user" else ASSISTANT_LINES)[
+                        i % (len(USER_LINES) if role == "user" else len(ASSISTANT_LINES))
+                    ].format(n=n),
+                    ts,
+                    ts,
+                )
+                for owner, goal, role, i, n, ts in zip(
+                    msg_owner.tolist(), msg_goal, roles, line, amount, msg_ts
+                )
+            ),
+        )
+
+        # Scheduled messages for ~30% of users
+        scheduled = np.where(rng.random(count) < 0.3, rng.integers(1, 4, count), 0)
+        sched_owner = np.repeat(np.arange(count), scheduled)
+        status = _choice_list(rng, ["pending", "sent", "cancelled"], sched_owner.size, [0.3, 0.6, 0.1])
+        hours = rng.integers(-24 * 30, 24 * 7, sched_owner.size).tolist()
+        rows["scheduled_messages"] = await conn.copy_records_to_table(
+            "scheduled_messages",
+            columns=["user_id", "scheduled_for", "message_content", "status", "created_at", "updated_at"],
+            records=(
+                (
+                    user_base + first + owner,
+                    # pending ones are due within the next week
+                    NOW + timedelta(hours=abs(h) if s == "pending" else h),
+                    "Quick check-in: how did this week go?",
+                    s,
+                    NOW,
+                    NOW,
+                )
+                for owner, s, h in zip(sched_owner.tolist(), status, hours)
+            ),
+        )
+    finally:
+        await conn.close()
+    return {table: int(result.split()[-1]) for table, result in rows.items()}
+
+
+def _run_chunk(*args) -> dict:
+    return asyncio.run(_load_chunk(*args))
+
+
+async def _reserve_ids(conn) -> tuple[int, int, int]:
+    """First free ids for users, goals and skills."""
+    bases = []
+    for table in ("users", "goals", "skills"):
+        bases.append(await conn.fetchval(f"SELECT coalesce(max(id), 0) + 1 FROM {table}"))
+    return tuple(bases)
+
+
+async def _seed_skills(conn, rng, skill_base: int, count: int) -> list[int]:
+    """Skills catalog; returned ids are ordered by popularity rank."""
+    ids = list(range(skill_base, skill_base + count))
+    categories = _choice_list(rng, CATEGORIES, count)
+    records = []
+    for skill_id, category, i in zip(ids, categories, range(count)):
+        topic = GOALS[category][i % len(GOALS[category])]
+        records.append(
+            (
+                skill_id,
+                f"seed-{category}-{i}",
+                f"{topic} coach #{i}",
+                f"Coaching framework for: {topic.lower()}.",
+                f"Help the user {topic.lower()}. Track progress weekly, "
+                f"celebrate streaks, adjust the plan after missed check-ins. Variant {i}.",
+                json.dumps(
+                    {
+                        "category": category,
+                        "intensity": ["low", "medium", "high"][i % 3],
+                        "tracking_type": ["binary", "numeric", "qualitative"][i % 3],
+                    }
+                ),
+                "system" if i % 4 == 0 else "agent",
+                0,
+                True,
+                NOW,
+                NOW,
+            )
+        )
+    await conn.copy_records_to_table(
+        "skills",
+        columns=[
+            "id", "name", "title", "description", "skill_prompt", "skill_metadata",
+            "created_by_type", "usage_count", "is_active", "created_at", "updated_at",
+        ],
+        records=records,
+    )
+    return ids
+
+
+async def seed(users: int, messages_per_user: int, workers: int, random_seed: int) -> None:
+    import asyncpg
+
+    conn = await asyncpg.connect(_dsn())
+    try:
+        existing = await conn.fetchval(
+            "SELECT count(*) FROM users WHERE telegram_id >= $1 AND telegram_id < $2",
+            SEED_TELEGRAM_ID_BASE,
+            SEED_TELEGRAM_ID_END,
+        )
+        if existing:
+            print(f"{existing} seeded users already exist; run `python -m benchmarks.seed clear` first")
+            sys.exit(1)
+
+        start = time.perf_counter()
+        user_base, goal_base, skill_base = await _reserve_ids(conn)
+        rng = np.random.default_rng(random_seed)
+        skill_ids = await _seed_skills(
+            conn, rng, skill_base, max(MIN_SKILLS, int(users * SKILLS_PER_USER))
+        )
+        # Advance the sequences past the reserved ranges before loading, so
+        # concurrent inserts by a running app can't collide with seeded ids
+        for table, last in (
+            ("users", user_base + users - 1),
+            ("goals", goal_base + users * MAX_GOALS - 1),
+            ("skills", skill_ids[-1]),
+        ):
+            await conn.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"greatest($1, (SELECT coalesce(max(id), 1) FROM {table})))",
+                last,
+            )
+        # Monthly message partitions for the whole history, so messages don't
+        # pile up in messages_default
+        await conn.execute(
+            "SELECT ensure_message_partitions($1, $2)",
+            (NOW - timedelta(days=HISTORY_DAYS)).date(),
+            NOW.date(),
+        )
+    finally:
+        await conn.close()
+
+    print("=" * 70)
+    print(
+        f"Seeding {users:,} users (~{users * messages_per_user:,} messages) "
+        f"with {workers} workers, {len(skill_ids)} skills"
+    )
+    print("=" * 70)
+
+    totals: dict[str, int] = {}
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(
+                _run_chunk,
+                first,
+                min(CHUNK_USERS, users - first),
+                user_base,
+                goal_base,
+                skill_ids,
+                messages_per_user,
+                random_seed,
+            )
+            for first in range(0, users, CHUNK_USERS)
+        ]
+        for future in as_completed(futures):
+            for table, n in future.result().items():
+                totals[table] = totals.get(table, 0) + n
+            done += 1
+            elapsed = time.perf_counter() - start
+            rows = sum(totals.values())
+            print(
+                f"  {done}/{len(futures)} chunks  {rows:,} rows  "
+                f"{elapsed:6.1f}s  {rows / elapsed:,.0f} rows/s"
+            )
+
+    conn = await asyncpg.connect(_dsn())
+    try:
+        # Usage counts consistent with the links just created
+        await conn.execute(
+            """
+            UPDATE skills SET usage_count = links.n
+            FROM (SELECT skill_id, count(*) AS n FROM goal_skills GROUP BY skill_id) AS links
+            WHERE skills.id = links.skill_id AND skills.name LIKE 'seed-%'
+            """
+        )
+        analyze_start = time.perf_counter()
+        await conn.execute("ANALYZE")
+        analyze = time.perf_counter() - analyze_start
+    finally:
+        await conn.close()
+
+    elapsed = time.perf_counter() - start
+    print("-" * 70)
+    for table, n in totals.items():
+        print(f"{table:<20} {n:>14,}")
+    print(f"{'skills':<20} {len(skill_ids):>14,}")
+    print(f"Loaded in {elapsed:.1f}s (ANALYZE {analyze:.1f}s)")
+
+
+async def clear() -> None:
+    """Delete seeded users, everything referencing them, and seeded skills."""
+    import asyncpg
+
+    users = "SELECT id FROM users WHERE telegram_id >= $1 AND telegram_id < $2"
+    goals = f"SELECT id FROM goals WHERE user_id IN ({users})"
+    skills = "SELECT id FROM skills WHERE name LIKE 'seed-%'"
+    statements = [
+        f"DELETE FROM messages WHERE user_id IN ({users})",
+        f"DELETE FROM scheduled_messages WHERE user_id IN ({users})",
+        f"DELETE FROM goal_events WHERE goal_id IN ({goals})",
+        f"DELETE FROM goal_skills WHERE goal_id IN ({goals}) OR skill_id IN ({skills})",
+        f"DELETE FROM goal_data WHERE goal_id IN ({goals})",
+        f"DELETE FROM goals WHERE user_id IN ({users})",
+        f"DELETE FROM user_preferences WHERE user_id IN ({users})",
+        f"UPDATE skills SET created_by_user_id = NULL WHERE created_by_user_id IN ({users})",
+        "DELETE FROM users WHERE telegram_id >= $1 AND telegram_id < $2",
+    ]
+    conn = await asyncpg.connect(_dsn())
+    try:
+        async with conn.transaction():
+            for statement in statements:
+                args = (SEED_TELEGRAM_ID_BASE, SEED_TELEGRAM_ID_END) if "$1" in statement else ()
+                result = await conn.execute(statement, *args)
+                print(f"{result:<24} {statement[:60]}")
+            print(await conn.execute(f"DELETE FROM skills WHERE id IN ({skills})"), "seeded skills")
+    finally:
+        await conn.close()
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    if sys.argv[1] == "clear":
+        asyncio.run(clear())
+        return
+
+    users = int(sys.argv[1])
+    messages_per_user = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 4)
+    random_seed = int(sys.argv[4]) if len(sys.argv) > 4 else 20261019
+    asyncio.run(seed(users, messages_per_user, workers, random_seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark SkillCRUD.search latency as the skills table grows.
+
+For each size, synthetic skills are bulk-inserted with generate_series inside
+a transaction, the table is analyzed, and a fixed set of queries (exact,
+stemmed, multi-word, misspelled, no-match) is timed. The transaction is
+rolled back afterwards, so the database is left unchanged.
+
+Needs a migrated database (including the pg_trgm indexes). Inserting 1M
+skills maintains every index on the table and takes a few minutes.
+
+Usage:
+    python -m benchmarks.skill_search [sizes] [repeats]
+    python -m benchmarks.skill_search 1000,100000,1000000 20
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+WORDS = [
+    "weight", "loss", "running", "marathon", "spanish", "language", "reading",
+    "meditation", "sleep", "savings", "budget", "guitar", "coding", "python",
+    "strength", "yoga", "journaling", "writing", "cooking", "nutrition",
+    "habit", "streak", "swimming", "cycling", "french", "piano", "drawing",
+    "focus", "hydration", "walking", "mobility", "posture", "debt", "investing",
+    "gardening", "chess", "photography", "public", "speaking", "networking",
+]
+
+QUERIES = [
+    "weight loss",
+    "learn spanish",
+    "runner",
+    "marathon training plan",
+    "meditaton",  # misspelled, trigram-only
+    "quantum entanglement",  # no match
+]
+
+INSERT_SKILLS = """
+    INSERT INTO skills (
+        name, title, description, skill_prompt, skill_metadata,
+        created_by_type, usage_count, is_active, created_at, updated_at
+    )
+    SELECT
+        'bench_' || w.w1 || '_' || w.w2 || '_' || i,
+        initcap(w.w1 || ' ' || w.w2 || ' ' || w.w3),
+        'Guides ' || w.w1 || ' and ' || w.w2 || ' goals with ' || w.w3 || ' check-ins',
+        'Synthetic benchmark skill prompt',
+        '{}'::jsonb,
+        'agent',
+        (random() * 200)::int,
+        true,
+        now(),
+        now()
+    FROM generate_series(1, :n) AS i
+    CROSS JOIN LATERAL (
+        SELECT
+            (CAST(:words AS text[]))[1 + (i * 7) % :k] AS w1,
+            (CAST(:words AS text[]))[1 + (i * 13 + 3) % :k] AS w2,
+            (CAST(:words AS text[]))[1 + (i * 31 + 5) % :k] AS w3
+    ) AS w
+"""
+
+
+async def bench_size(n: int, repeats: int) -> dict[str, list[float]]:
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from database import engine
+    from services import skill_crud
+
+    timings: dict[str, list[float]] = {query: [] for query in QUERIES}
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            # Loading 1M skills can outlast the app's DB_STATEMENT_TIMEOUT_MS
+            await conn.execute(text("SET LOCAL statement_timeout = 0"))
+            start = time.perf_counter()
+            await conn.execute(
+                text(INSERT_SKILLS), {"n": n, "words": WORDS, "k": len(WORDS)}
+            )
+            await conn.execute(text("ANALYZE skills"))
+            print(f"  inserted {n:,} skills in {time.perf_counter() - start:.1f}s")
+
+            db = AsyncSession(bind=conn)
+            for query in QUERIES:
+                await skill_crud.search_scored(db, query, limit=3)  # warm up
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    await skill_crud.search_scored(db, query, limit=3)
+                    timings[query].append(time.perf_counter() - start)
+        finally:
+            await transaction.rollback()
+    return timings
+
+
+async def main():
+    sizes = [1_000, 100_000, 1_000_000]
+    if len(sys.argv) > 1:
+        sizes = [int(size) for size in sys.argv[1].split(",")]
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    from database import engine
+
+    print(f"\n{'='*72}")
+    print("SkillCRUD.search latency (ms)")
+    print(f"{'='*72}")
+    for n in sizes:
+        print(f"\n{n:,} skills")
+        timings = await bench_size(n, repeats)
+        for query, samples in timings.items():
+            ms = sorted(s * 1000 for s in samples)
+            p95 = statistics.quantiles(ms, n=20)[-1] if len(ms) > 1 else ms[0]
+            print(
+                f"  {query!r:<26} p50 {statistics.median(ms):8.2f}   p95 {p95:8.2f}"
+            )
+    print(f"\n{'='*72}\n")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,141 @@
+"""
+Benchmark wall-clock latency of multi-tool agent turns.
+
+Tool bodies are invoked directly (no LLM), inside one AgentContext per turn,
+the same way the Agents SDK runs one model step: every tool call of the step
+is started at once with asyncio.gather. Each turn is also run with the calls
+awaited one after another for comparison. Writes are rolled back at the end
+of every turn, so the database is left unchanged.
+
+Needs a migrated database with a user that has at least one goal.
+
+Usage:
+    python -m benchmarks.tool_turns <user_id> [rounds]
+"""
+
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class _Rollback(Exception):
+    """Raised at the end of a turn so AgentContext rolls its writes back."""
+
+
+async def _invoke(context, tool, **kwargs):
+    from agents.tool_context import ToolContext
+
+    arguments = json.dumps(kwargs)
+    tool_context = ToolContext(
+        context=context,
+        tool_name=tool.name,
+        tool_call_id=f"bench-{tool.name}",
+        tool_arguments=arguments,
+    )
+    return await tool.on_invoke_tool(tool_context, arguments)
+
+
+async def _run_turn(user_id: str, calls, parallel: bool) -> float:
+    from ai.context import AgentContext
+
+    start = time.perf_counter()
+    try:
+        async with AgentContext(user_id=user_id) as context:
+            if parallel:
+                await asyncio.gather(
+                    *(_invoke(context, tool, **kwargs) for tool, kwargs in calls)
+                )
+            else:
+                for tool, kwargs in calls:
+                    await _invoke(context, tool, **kwargs)
+            elapsed = time.perf_counter() - start
+            raise _Rollback
+    except _Rollback:
+        pass
+    return elapsed
+
+
+def _build_turns(goal_ids: list[int]):
+    from ai.llm_tools import (
+        list_goals,
+        get_goal_data,
+        get_goal_skill,
+        search_skills,
+        get_recent_messages,
+        update_goal_data,
+        append_goal_event,
+    )
+
+    goal_id = goal_ids[0]
+    return {
+        "reads (goal data x3 + skill search + history)": [
+            *[(get_goal_data, {"goal_id": g}) for g in (goal_ids * 3)[:3]],
+            (search_skills, {"query": "weight loss", "top_k": 3}),
+            (get_recent_messages, {"limit": 20}),
+        ],
+        "list + per-goal skills": [
+            (list_goals, {}),
+            *[(get_goal_skill, {"goal_id": g}) for g in goal_ids[:3]],
+        ],
+        "read + write same goal": [
+            (get_goal_data, {"goal_id": goal_id}),
+            (append_goal_event, {"goal_id": goal_id, "event_json": '{"type": "bench"}'}),
+            (
+                update_goal_data,
+                {"goal_id": goal_id, "data_json": '{"bench": true}', "deep_merge": False},
+            ),
+        ],
+    }
+
+
+def _summary(samples: list[float]) -> str:
+    ms = sorted(s * 1000 for s in samples)
+    p95 = statistics.quantiles(ms, n=20)[-1] if len(ms) > 1 else ms[0]
+    return f"p50 {statistics.median(ms):7.1f} ms   p95 {p95:7.1f} ms   mean {statistics.fmean(ms):7.1f} ms"
+
+
+async def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    user_id = sys.argv[1]
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    from database import AsyncSessionLocal, engine
+    from services import goal_crud
+
+    async with AsyncSessionLocal() as db:
+        goals = await goal_crud.get_all(db, user_id=int(user_id))
+    if not goals:
+        print(f"User {user_id} has no goals")
+        sys.exit(1)
+
+    turns = _build_turns([goal.id for goal in goals])
+
+    print(f"\n{'='*78}")
+    print(f"Multi-tool turn latency - user {user_id}, {rounds} rounds per turn")
+    print(f"{'='*78}")
+    for name, calls in turns.items():
+        # Warm up the connection pool and caches
+        await _run_turn(user_id, calls, parallel=True)
+        for parallel in (False, True):
+            samples = [
+                await _run_turn(user_id, calls, parallel=parallel)
+                for _ in range(rounds)
+            ]
+            mode = "parallel  " if parallel else "sequential"
+            print(f"{name:<48} {mode}  {_summary(samples)}")
+    print(f"{'='*78}\n")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+"""
+Benchmark search_web against a local stub Exa server (no API key needed).
+
+Compares the previous implementation (new HTTP client per call, 10 results
+of up to 20000 characters, indented JSON) with ExaSearchClient (pooled
+client, content-addressed cache, trimmed snippets): latency per call and
+size of what is returned to the model. Queries repeat, as they do across
+users asking about the same goal types.
+
+Usage:
+    python -m benchmarks.web_search [calls] [latency_ms]
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+QUERIES = [
+    "beginner marathon training plan",
+    "how to learn spanish fast",
+    "sustainable weight loss habits",
+    "meditation for beginners",
+]
+
+
+async def previous_search(base_url: str, query: str) -> str:
+    """search_web as it was: fresh client, full results, indented JSON"""
+    payload = {
+        "query": query,
+        "type": "auto",
+        "num_results": 10,
+        "contents": {"text": {"max_characters": 20000}},
+    }
+    async with httpx.AsyncClient() as client:
+        response = await client.post(
+            f"{base_url}/search",
+            headers={"x-api-key": "stub", "Content-Type": "application/json"},
+            json=payload,
+            timeout=30.0,
+        )
+        response.raise_for_status()
+        return json.dumps(response.json(), indent=2)
+
+
+async def run(label, search, calls):
+    latencies, sizes = [], []
+    for i in range(calls):
+        start = time.perf_counter()
+        output = await search(QUERIES[i % len(QUERIES)])
+        latencies.append((time.perf_counter() - start) * 1000)
+        sizes.append(len(output))
+    latencies.sort()
+    print(
+        f"{label:<10} p50={statistics.median(latencies):7.2f}ms "
+        f"p95={latencies[int(len(latencies) * 0.95) - 1]:7.2f}ms "
+        f"mean size={statistics.mean(sizes) / 1024:7.1f}KB"
+    )
+
+
+async def main(calls: int, latency: float):
+    from benchmarks.fakes.exa import running
+    from services.cache import DiskCache
+    from services.web_search import ExaSearchClient, trim_results
+
+    os.environ.setdefault("EXA_API_KEY", "stub")
+    with (
+        running(latency=latency) as (base_url, handler),
+        tempfile.TemporaryDirectory() as cache_dir,
+    ):
+        print("=" * 60)
+        print(f"{calls} calls over {len(QUERIES)} queries, stub latency {latency * 1000:.0f}ms")
+        print("=" * 60)
+
+        await run("previous", lambda q: previous_search(base_url, q), calls)
+        served = handler.requests
+
+        client = ExaSearchClient(base_url, cache=DiskCache(cache_dir))
+
+        async def current(query):
+            return json.dumps(trim_results(await client.search(query), 500))
+
+        await run("current", current, calls)
+        print(f"upstream requests: previous={served} current={handler.requests - served}")
+        print(f"cache: {client.cache.stats()}")
+        await client.close()
+
+
+if __name__ == "__main__":
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.08
+    asyncio.run(main(calls, latency))
@@ -1,7 +1,15 @@
+import itertools
 import os
+from typing import Any, Dict
+from uuid import uuid4
+from sqlalchemy import Delete, Insert, Update
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool, QueuePool
 from dotenv import load_dotenv
 
+from metrics import add_collector, gauge
+
 load_dotenv()
 
 # Database configuration
@@ -14,15 +22,101 @@ POSTGRES_DB = os.getenv('POSTGRES_DB', 'parth_db')
 
 DATABASE_URL = f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 
+# Read replicas: comma-separated URLs (postgresql+asyncpg://...). Unset,
+# replica reads go to the primary. Point it at the primary's own URL to
+# exercise the routing with a single instance.
+DATABASE_REPLICA_URLS = [
+    url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+
+# Direct connection to Postgres for what a transaction pooler can't relay
+# (LISTEN/NOTIFY, session settings); defaults to DATABASE_URL
+DATABASE_DIRECT_URL = os.getenv("DATABASE_DIRECT_URL", DATABASE_URL)
+
+# "pgbouncer": POSTGRES_HOST/PORT (and the replica URLs) point at an
+# external pooler in transaction mode, which owns the server connections.
+# Unset: each process keeps its own pool.
+DATABASE_POOLER = os.getenv("DATABASE_POOLER", "")
+
+# Jobs an arq worker runs at once (max_jobs). Each holds about one
+# connection at a time, plus a burst for parallel read tools; the bot
+# handles fewer at once. Connections open on demand, so the pool size and
+# overflow are ceilings per process, not reservations.
+WORKER_MAX_JOBS = int(os.getenv("WORKER_MAX_JOBS", "10"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(WORKER_MAX_JOBS)))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", str(WORKER_MAX_JOBS)))
+
+# Server-side limits (0 disables). An agent run's write transaction stays
+# open across model calls until the run ends, so the idle limit must exceed
+# the longest run. Behind PgBouncer these can't be sent on connect; set
+# them on the role (ALTER ROLE ... SET statement_timeout = ...) or use
+# PgBouncer's query_timeout / idle_transaction_timeout.
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "60000"))
+DB_IDLE_IN_TRANSACTION_TIMEOUT_MS = int(
+    os.getenv("DB_IDLE_IN_TRANSACTION_TIMEOUT_MS", "600000")
+)
+
+
+def _engine_options() -> Dict[str, Any]:
+    """create_async_engine options for the configured pooling mode"""
+    if DATABASE_POOLER == "pgbouncer":
+        return {
+            # The pooler reuses server connections; holding client-side
+            # ones would only pin them
+            "poolclass": NullPool,
+            "connect_args": {
+                # Consecutive transactions may run on different server
+                # connections: don't reuse prepared statements, and name
+                # them uniquely so they never collide on a shared one
+                "prepared_statement_cache_size": 0,
+                "statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            },
+        }
+    return {
+        "pool_pre_ping": True,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "connect_args": {
+            "server_settings": {
+                "statement_timeout": str(DB_STATEMENT_TIMEOUT_MS),
+                "idle_in_transaction_session_timeout": str(
+                    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS
+                ),
+            }
+        },
+    }
+
+
 # Create async engine
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=False,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+engine = create_async_engine(DATABASE_URL, echo=False, **_engine_options())
+
+replica_engines = [
+    create_async_engine(url, echo=False, **_engine_options())
+    for url in DATABASE_REPLICA_URLS
+]
+_next_replica = itertools.cycle(replica_engines)
+
+DB_POOL = gauge(
+    "db_pool_connections", "Connections of the engine pool by state", ("state",)
 )
 
+
+def _collect_pool_metrics() -> None:
+    # Summed over the primary and replica pools (none behind PgBouncer)
+    pools = [
+        e.sync_engine.pool
+        for e in (engine, *replica_engines)
+        if isinstance(e.sync_engine.pool, QueuePool)
+    ]
+    DB_POOL.set(sum(pool.size() for pool in pools), state="size")
+    DB_POOL.set(sum(pool.checkedout() for pool in pools), state="checked_out")
+    DB_POOL.set(sum(pool.checkedin() for pool in pools), state="idle")
+    DB_POOL.set(sum(max(pool.overflow(), 0) for pool in pools), state="overflow")
+
+
+add_collector(_collect_pool_metrics)
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -33,6 +127,36 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+class RoutingSession(Session):
+    """Session for read paths: queries go to one replica (picked round-robin
+    when the session first needs a connection), anything that writes or
+    locks rows goes to the primary."""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            not replica_engines
+            or self._flushing
+            or isinstance(clause, (Insert, Update, Delete))
+            or getattr(clause, "_for_update_arg", None) is not None
+        ):
+            return engine.sync_engine
+        if "replica" not in self.info:
+            self.info["replica"] = next(_next_replica).sync_engine
+        return self.info["replica"]
+
+
+# Sessions for reads that may lag the primary by the replication delay
+# (read tools before the run writes, proactive context, fan-out scans)
+ReadSessionLocal = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+
 async def get_db() -> AsyncSession:
     """Dependency for getting async database sessions"""
     async with AsyncSessionLocal() as session:
@@ -0,0 +1,281 @@
+"""
+In-process metrics: counters, gauges and histograms aggregated per label set,
+served in the Prometheus text format.
+
+Metrics are created once at import with counter(), gauge() or histogram()
+and shared by every caller in the process. Values that are cheaper to read
+on demand (DB pool, queue depth) are filled in by collectors registered with
+add_collector(), which run just before each scrape. start_server() exposes
+everything on GET /metrics.
+"""
+
+import asyncio
+import bisect
+import inspect
+import logging
+import threading
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Milliseconds, from a fast cache hit to a slow multi-tool turn
+LATENCY_BUCKETS_MS = (
+    1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000,
+)
+# Counts (queries per tool, tokens per run, ...)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 50000)
+
+
+class _Metric:
+    """Name, help text and label names shared by all metric types."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...], **extra: str) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra.items())
+        if not pairs:
+            return ""
+        body = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+        return "{" + body + "}"
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, one series per label set."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{self._labels(key)} {_number(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """Value that goes up and down (or is set by a collector at scrape time)."""
+
+    type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values, one series per label set."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        buckets: Sequence[float] = LATENCY_BUCKETS_MS,
+        labelnames: Sequence[str] = (),
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def quantile(self, q: float, **labels: str) -> Optional[float]:
+        """Estimated q-quantile (upper bound of the bucket it falls in)."""
+        series = self._series.get(self._key(labels))
+        if not series or not series[2]:
+            return None
+        rank = q * series[2]
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), series[0]):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> List[dict]:
+        """Per label set: labels, cumulative bucket counts, sum and count."""
+        with self._lock:
+            items = [(key, list(s[0]), s[1], s[2]) for key, s in self._series.items()]
+        result = []
+        for key, counts, total, count in items:
+            cumulative, running = [], 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                running += n
+                cumulative.append((bound, running))
+            result.append(
+                {
+                    "key": key,
+                    "labels": dict(zip(self.labelnames, key)),
+                    "buckets": cumulative,
+                    "sum": total,
+                    "count": count,
+                }
+            )
+        return result
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for series in self.snapshot():
+            key = series["key"]
+            for bound, count in series["buckets"]:
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                lines.append(f"{self.name}_bucket{self._labels(key, le=le)} {count}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_number(series['sum'])}")
+            lines.append(f"{self.name}_count{self._labels(key)} {series['count']}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+REGISTRY: Dict[str, _Metric] = {}
+
+Collector = Callable[[], Union[None, Awaitable[None]]]
+_collectors: List[Collector] = []
+
+
+def _get_or_create(cls, name: str, *args) -> _Metric:
+    metric = REGISTRY.get(name)
+    if metric is None:
+        metric = REGISTRY[name] = cls(name, *args)
+    elif not isinstance(metric, cls):
+        raise ValueError(f"Metric {name} already registered as {metric.type}")
+    return metric
+
+
+def counter(name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+    """Get or create the process-wide counter called name."""
+    return _get_or_create(Counter, name, help, labelnames)
+
+
+def gauge(name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+    """Get or create the process-wide gauge called name."""
+    return _get_or_create(Gauge, name, help, labelnames)
+
+
+def histogram(
+    name: str,
+    help: str,
+    buckets: Sequence[float] = LATENCY_BUCKETS_MS,
+    labelnames: Sequence[str] = (),
+) -> Histogram:
+    """Get or create the process-wide histogram called name."""
+    return _get_or_create(Histogram, name, help, buckets, labelnames)
+
+
+def add_collector(collector: Collector) -> None:
+    """Run collector (sync or async) before every scrape to refresh gauges."""
+    if collector not in _collectors:
+        _collectors.append(collector)
+
+
+async def collect() -> None:
+    for collector in list(_collectors):
+        try:
+            result = collector()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            name = getattr(collector, "__name__", repr(collector))
+            logger.warning(f"Metrics collector {name} failed: {e}")
+
+
+async def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    await collect()
+    lines = []
+    for metric in list(REGISTRY.values()):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+        # Drain headers; the request has no body
+        while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+            pass
+        parts = request_line.decode("latin-1").split()
+        if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+            status, content_type = "200 OK", "text/plain; version=0.0.4; charset=utf-8"
+            body = (await render()).encode()
+        else:
+            status, content_type, body = "404 Not Found", "text/plain", b"Not Found\n"
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+    except Exception as e:
+        logger.debug(f"Metrics request failed: {e}")
+    finally:
+        writer.close()
+
+
+_server: Optional[asyncio.AbstractServer] = None
+
+
+async def start_server(port: int, host: str = "0.0.0.0") -> None:
+    """Serve GET /metrics on the running event loop (no-op when port is 0)."""
+    global _server
+    if not port or _server is not None:
+        return
+    try:
+        _server = await asyncio.start_server(_handle, host, port)
+    except OSError as e:
+        logger.error(f"Could not serve metrics on port {port}: {e}")
+        return
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+
+
+async def stop_server() -> None:
+    global _server
+    if _server is not None:
+        _server.close()
+        await _server.wait_closed()
+        _server = None
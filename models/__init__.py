@@ -5,10 +5,12 @@ from models.models import (
     UserPreference,
     Goal,
     GoalData,
+    GoalEvent,
     ScheduledMessage,
     Skill,
     GoalSkill,
     Message,
+    MessageSummary,
     GoalStatus,
     MessageStatus,
     SkillCreatedBy,
@@ -22,10 +24,12 @@ __all__ = [
     "UserPreference",
     "Goal",
     "GoalData",
+    "GoalEvent",
     "ScheduledMessage",
     "Skill",
     "GoalSkill",
     "Message",
+    "MessageSummary",
     "GoalStatus",
     "MessageStatus",
     "SkillCreatedBy",
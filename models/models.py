@@ -6,12 +6,15 @@ from sqlalchemy import (
     String,
     Text,
     Boolean,
+    Date,
     DateTime,
     Enum,
     ForeignKey,
     Computed,
+    Index,
+    UniqueConstraint,
 )
-from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, REAL, TSVECTOR
 from sqlalchemy.orm import declarative_base, relationship
 import enum
 
@@ -87,6 +90,7 @@ class Goal(BaseModel):
     # Relationships
     user = relationship("User", back_populates="goals")
     goal_data = relationship("GoalData", back_populates="goal", uselist=False)
+    events = relationship("GoalEvent", back_populates="goal")
     scheduled_messages = relationship("ScheduledMessage", back_populates="goal")
     goal_skills = relationship("GoalSkill", back_populates="goal")
     messages = relationship("Message", back_populates="goal")
@@ -102,6 +106,22 @@ class GoalData(BaseModel):
     goal = relationship("Goal", back_populates="goal_data")
 
 
+class GoalEvent(Base):
+    """Append-only goal event log (one row per event, never updated)."""
+
+    __tablename__ = "goal_events"
+    __table_args__ = (Index("ix_goal_events_goal_id_ts", "goal_id", "ts"),)
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    goal_id = Column(Integer, ForeignKey("goals.id"), nullable=False)
+    ts = Column(DateTime, nullable=False, default=datetime.utcnow)
+    type = Column(String, nullable=False)
+    payload = Column(JSONB, nullable=False, default=dict)
+
+    # Relationships
+    goal = relationship("Goal", back_populates="events")
+
+
 class ScheduledMessage(BaseModel):
     __tablename__ = "scheduled_messages"
 
@@ -136,6 +156,12 @@ class Skill(BaseModel):
             "to_tsvector('english', coalesce(name, '') || ' ' || coalesce(title, '') || ' ' || coalesce(description, ''))"
         ),
     )
+    # Semantic search vector from the local encoder (services/embeddings.py)
+    embedding = Column(ARRAY(REAL))
+    embedding_model = Column(String)
+    # MinHash of skill_prompt and its LSH band keys (services/dedup.py)
+    prompt_minhash = Column(ARRAY(BigInteger))
+    prompt_lsh = Column(ARRAY(BigInteger))
 
     # Relationships
     creator = relationship("User", back_populates="skills")
@@ -156,9 +182,21 @@ class GoalSkill(BaseModel):
 
 class Message(BaseModel):
     __tablename__ = "messages"
+    # Recency lookups per user / goal and keyset walks (created_at, id).
+    # Range-partitioned by month on created_at (messages_yYYYYmMM plus
+    # messages_default), see tasks.message_archive
+    __table_args__ = (
+        Index("ix_messages_user_id_created_at", "user_id", "created_at", "id"),
+        Index("ix_messages_goal_id_created_at", "goal_id", "created_at", "id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    goal_id = Column(Integer, ForeignKey("goals.id"), nullable=True, index=True)
+    # The primary key has to include the partition key
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
+
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    goal_id = Column(Integer, ForeignKey("goals.id"), nullable=True)
     role = Column(Enum(MessageRole), nullable=False)
     content = Column(Text, nullable=False)
     telegram_message_id = Column(BigInteger, nullable=True)
@@ -166,3 +204,21 @@ class Message(BaseModel):
     # Relationships
     user = relationship("User", back_populates="messages")
     goal = relationship("Goal", back_populates="messages")
+
+
+class MessageSummary(BaseModel):
+    """Per user and month message totals, kept when a month's partition is archived."""
+
+    __tablename__ = "message_summaries"
+    __table_args__ = (
+        UniqueConstraint("user_id", "month", name="uq_message_summaries_user_id_month"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    month = Column(Date, nullable=False)
+    message_count = Column(Integer, nullable=False)
+    user_messages = Column(Integer, nullable=False)
+    assistant_messages = Column(Integer, nullable=False)
+    goal_ids = Column(ARRAY(Integer))
+    first_at = Column(DateTime, nullable=False)
+    last_at = Column(DateTime, nullable=False)
@@ -2,5 +2,6 @@
 
 from prompts.agents import PARTH_AGENT_PROMPT
 from prompts.proactive_agent_prompt import PROACTIVE_EVALUATION_PROMPT
+from prompts.docs import reference_docs
 
-__all__ = ["PARTH_AGENT_PROMPT", "PROACTIVE_EVALUATION_PROMPT"]
+__all__ = ["PARTH_AGENT_PROMPT", "PROACTIVE_EVALUATION_PROMPT", "reference_docs"]
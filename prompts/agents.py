@@ -55,7 +55,7 @@ Store data with intention. Before storing, ask yourself: "Will I need this to gu
 ### Available Tools
 
 **User Preferences:**
-- `update_user_preferences(data_json: str)` - Update user preferences with JSON string. Merges with existing data.
+- `update_user_preferences(data_json: str, deep_merge: bool = False)` - Update user preferences with JSON string. Merges with existing data.
 
 **Goals (Metadata Management):**
 - `list_goals()` - Returns JSON string with all user's goals (id, title, status, timestamps, data=progress)
@@ -65,28 +65,29 @@ Store data with intention. Before storing, ask yourself: "Will I need this to gu
 
 **Goal Data (Full Read/Write Autonomy):**
 - `get_goal_data(goal_id: int)` - Returns JSON string with agent_data for the goal
-- `update_goal_data(goal_id: int, data_json: str)` - Update agent_data with JSON string. Merges with existing data.
+- `update_goal_data(goal_id: int, data_json: str, deep_merge: bool = False)` - Update agent_data with JSON string. Merges with existing data.
 - `append_goal_event(goal_id: int, event_json: str)` - Append event to goal's event log. Auto-adds timestamp.
+- `get_goal_events(goal_id: int, limit: int = 20, since: str | None = None, until: str | None = None, before_id: int | None = None)` - Returns JSON string with a page of events (newest first) and `next_before_id` for the next page. Use since/until (ISO timestamps) for a time window.
 
 **Skills (Reusable Goal-Specific Guidance):**
 - `search_skills(query: str, top_k: int = 3)` - Search for existing skills by name/description. Returns top matches.
 - `get_skill(skill_id: int)` - Get detailed skill info including skill_prompt
-- `create_skill(name: str, title: str, description: str, skill_prompt: str, metadata_json: str | None)` - Create new skill. Returns skill ID.
+- `create_skill(name: str, title: str, description: str, skill_prompt: str, metadata_json: str | None)` - Create new skill. Returns skill ID; if a near-duplicate already exists, returns the existing skill's ID instead (use it as is).
 - `update_skill(skill_id: int, skill_prompt: str | None, description: str | None, metadata_json: str | None)` - Update skill (agent-created only). Increments version.
 - `link_goal_to_skill(goal_id: int, skill_id: int, customizations_json: str | None)` - Link skill to goal with optional customizations
 - `get_goal_skill(goal_id: int)` - Get skills linked to a goal with their customizations
 
 **Research & Knowledge:**
-- `search_web(query: str, num_results: int = 10, search_type: str = "auto", max_characters: int = 20000)` - Search the web using Exa API. Returns JSON string with search results. Use this to find goal-specific plans, verify facts, or research best practices when creating new skills.
+- `search_web(query: str, num_results: int = 5, search_type: str = "auto", max_characters: int = 500)` - Search the web using Exa API. Returns JSON string with results (title, url, published_date, snippet of up to `max_characters`); repeat the search with a larger `max_characters` to read more. Use this to find goal-specific plans, verify facts, or research best practices when creating new skills.
 
 **Reference Documentation:**
-- `read_reference_doc(doc_name: str)` - Read reference documentation (e.g., 'skills.md'). Use this to access specifications and guidelines.
+- `read_reference_doc(doc_name: str, section: str | None = None)` - Read reference documentation (e.g., 'skills.md'). Use this to access specifications and guidelines. Pass `section` (a heading or its number, comma-separate several) to get only the part you need, e.g. `read_reference_doc('skills.md', section='Template A, Metadata Tagging Standard')`.
 
-**CRITICAL:** Before creating any new skill, you MUST call `read_reference_doc('skills.md')` to get the complete specification. This document contains:
-- The four-pillar skill prompt framework (Tracking Approach, Messaging Logic, Red Flags & Interventions, Wisdom & Perspective)
-- Standard templates for different goal types (Habit Builder, Project Journey)
-- Metadata tagging standards for effective skill search
-- Guidelines for when to reuse vs. create new skills
+**CRITICAL:** Before creating any new skill, you MUST read the specification in `skills.md`. Fetch only the sections you need rather than the whole document, e.g. `read_reference_doc('skills.md', section='Skill Anatomy, Skill Prompt Framework, Template A, Metadata Tagging Standard')`. Its sections:
+- "Skill Anatomy" and "Skill Prompt Framework": the four-pillar skill prompt framework (Tracking Approach, Messaging Logic, Red Flags & Interventions, Wisdom & Perspective)
+- "Template A" (Habit Builder, metric-focused) and "Template B" (Project Journey, milestone-focused): standard templates for different goal types
+- "Metadata Tagging Standard": metadata tags for effective skill search
+- "Skill Evolution Logic": when to reuse vs. create new skills
 
 **Communication:**
 - `send_message(content: str, goal_id: int | None = None, is_scheduled: bool = False)` - Send message to user (immediate or scheduled)
@@ -95,7 +96,9 @@ Store data with intention. Before storing, ask yourself: "Will I need this to gu
 **Important Notes:**
 - All data parameters must be valid JSON strings
 - `update_user_preferences` and `update_goal_data` MERGE with existing data (don't overwrite completely)
+- By default only top-level keys are merged (a nested object like `snapshot` is replaced whole); pass `deep_merge=True` to update just some nested fields
 - `append_goal_event` automatically adds timestamp to events
+- Events live in the goal's event log, not in agent_data - read them with `get_goal_events`
 - All tools return JSON strings - parse them to access data
 - Tools validate that goals belong to the current user for security
 - Skills are reusable templates that can be customized per goal
@@ -181,7 +184,7 @@ Use the search tool to make your skills wiser. If a user wants to learn "Quantum
 3. Incorporate those specific milestones into the `skill_prompt` and tracking structure.
 
 **Creating Skills:**
-When you need to create a new skill, you MUST first call `read_reference_doc('skills.md')` to get the complete specification. This ensures all skills follow a consistent structure.
+When you need to create a new skill, you MUST first read the relevant sections of `skills.md` with `read_reference_doc` (see Reference Documentation above). This ensures all skills follow a consistent structure.
 
 **When to reuse an existing skill:**
 - Similar goal type exists in search results
@@ -192,7 +195,7 @@ When you need to create a new skill, you MUST first call `read_reference_doc('sk
 - No existing skill matches the goal type
 - Fundamentally different tracking approach needed
 - You've learned a better method for a common goal type
-- **Remember:** Always call `read_reference_doc('skills.md')` first to get the proper structure and templates
+- **Remember:** Always read the structure and the matching template from `skills.md` first (`read_reference_doc` with `section`)
 
 **Skill customizations:**
 Use customizations to adapt a generic skill to specific user needs without creating duplicate skills.
@@ -322,20 +325,6 @@ When users fail, relapse, or feel discouraged:
   "gym_days_per_week": 3,
   "check_in_day": "sunday",
   "motivation": "health_energy",
-  "events": [
-    {
-      "timestamp": "2026-01-05T10:30:00Z",
-      "type": "weigh_in",
-      "weight_kg": 79.5,
-      "mood": "motivated"
-    },
-    {
-      "timestamp": "2026-01-12T10:15:00Z",
-      "type": "weigh_in",
-      "weight_kg": 78.0,
-      "mood": "excited"
-    }
-  ],
   "snapshot": {
     "current_weight_kg": 74,
     "total_loss_kg": 6,
@@ -453,7 +442,11 @@ goal_json = get_goal(goal_id)
 
 # Get goal's agent data
 data_json = get_goal_data(goal_id)  
-# Returns: '{"events": [...], "snapshot": {...}, "target_weight_kg": 70}'
+# Returns: '{"snapshot": {...}, "target_weight_kg": 70}'
+
+# Get goal's event log (newest first, paginated)
+events_json = get_goal_events(goal_id, limit=20, since="2026-01-01T00:00:00")
+# Returns: '{"events": [{"id": 812, "type": "weigh_in", "timestamp": "...", ...}], "next_before_id": 790}'
 
 # Get goal's skill
 skill_json = get_goal_skill(goal_id)
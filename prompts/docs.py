@@ -0,0 +1,136 @@
+"""Registry of the markdown reference docs under prompts/, with section lookup."""
+
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+
+
+def _normalize_heading(text: str) -> str:
+    """'## 2. The Skill Prompt Framework' -> 'the skill prompt framework'."""
+    text = re.sub(r"^(\d+|[IVX]+|[A-Z])\.\s+", "", text.strip())
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+@dataclass
+class ReferenceDoc:
+    """One doc's content and its sections, parsed when the file changes."""
+
+    path: Path
+    mtime: float = 0.0
+    content: str = ""
+    # (level, heading, start offset, end offset) in document order
+    sections: List[Tuple[int, str, int, int]] = field(default_factory=list)
+
+    def refresh(self) -> None:
+        """Re-read the file if it changed on disk since it was last read."""
+        mtime = os.stat(self.path).st_mtime
+        if mtime == self.mtime:
+            return
+        self.content = self.path.read_text(encoding="utf-8")
+        self.sections = self._parse(self.content)
+        self.mtime = mtime
+
+    @staticmethod
+    def _parse(content: str) -> List[Tuple[int, str, int, int]]:
+        headings = []
+        offset = 0
+        in_code = False
+        for line in content.splitlines(keepends=True):
+            if line.startswith("```"):
+                in_code = not in_code
+            elif not in_code and (match := HEADING.match(line)):
+                headings.append((len(match.group(1)), match.group(2), offset))
+            offset += len(line)
+
+        # A section runs until the next heading of the same or higher level
+        sections = []
+        for i, (level, heading, start) in enumerate(headings):
+            end = next(
+                (s for lvl, _, s in headings[i + 1:] if lvl <= level), len(content)
+            )
+            sections.append((level, heading, start, end))
+        return sections
+
+    def outline(self) -> List[str]:
+        return [heading for _, heading, _, _ in self.sections]
+
+    def section(self, query: str) -> Optional[str]:
+        """A section by heading or its number: exact match first, then a
+        heading containing query."""
+        query = query.strip()
+        wanted = _normalize_heading(query)
+        if not wanted:
+            return None
+        for exact in (True, False):
+            for _, heading, start, end in self.sections:
+                normalized = _normalize_heading(heading)
+                if (
+                    normalized == wanted
+                    # By number, e.g. "2" for "## 2. The Skill Prompt Framework"
+                    or heading.startswith(f"{query}. ")
+                    or (not exact and wanted in normalized)
+                ):
+                    return self.content[start:end].strip()
+        return None
+
+
+class ReferenceDocRegistry:
+    """
+    The .md docs in a directory, discovered at import and kept in memory.
+
+    Each lookup stats the file and re-reads it only when its mtime changed,
+    so edits are picked up without a restart. Docs are addressed by file
+    name with or without extension ('skills.md' or 'skills').
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._docs: Dict[str, ReferenceDoc] = {}
+        for path in sorted(directory.glob("*.md")):
+            doc = ReferenceDoc(path)
+            doc.refresh()
+            self._docs[path.stem.lower()] = doc
+
+    def names(self) -> List[str]:
+        return [doc.path.name for doc in self._docs.values()]
+
+    def get(self, doc_name: str) -> ReferenceDoc:
+        """Look up a doc (reloaded if changed). Raises ValueError if unknown."""
+        key = doc_name.lower().removesuffix(".md")
+        doc = self._docs.get(key)
+        if doc is None:
+            path = self.directory / f"{key}.md"
+            if not re.fullmatch(r"[\w-]+", key) or not path.exists():
+                available = ", ".join(self.names())
+                raise ValueError(f"Unknown document '{doc_name}'. Available: {available}")
+            # Added after import
+            doc = self._docs[key] = ReferenceDoc(path)
+        doc.refresh()
+        return doc
+
+    def read(self, doc_name: str, section: Optional[str] = None) -> str:
+        """
+        Full text of a doc, or only the named section(s) with their
+        subsections. Several sections can be requested comma-separated.
+        """
+        doc = self.get(doc_name)
+        if not section:
+            return doc.content
+
+        parts = []
+        for query in section.split(","):
+            text = doc.section(query)
+            if text is None:
+                outline = "; ".join(doc.outline())
+                raise ValueError(
+                    f"No section '{query.strip()}' in {doc.path.name}. Sections: {outline}"
+                )
+            parts.append(text)
+        return "\n\n".join(parts)
+
+
+reference_docs = ReferenceDocRegistry(Path(__file__).parent)
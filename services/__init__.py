@@ -1,9 +1,14 @@
-from services.services import BaseCRUD, SkillCRUD
+import os
+
+from services.services import BaseCRUD, SkillCRUD, GoalEventCRUD, MessageCRUD
+from services.cache import QueryCache
+from services.catalog import skill_catalog
 from models.models import (
     User,
     UserPreference,
     Goal,
     GoalData,
+    GoalEvent,
     ScheduledMessage,
     Skill,
     GoalSkill,
@@ -15,20 +20,33 @@ user_crud = BaseCRUD(User)
 user_preference_crud = BaseCRUD(UserPreference)
 goal_crud = BaseCRUD(Goal)
 goal_data_crud = BaseCRUD(GoalData)
+goal_event_crud = GoalEventCRUD(GoalEvent)
 scheduled_message_crud = BaseCRUD(ScheduledMessage)
 skill_crud = SkillCRUD(Skill)
 goal_skill_crud = BaseCRUD(GoalSkill)
-message_crud = BaseCRUD(Message)
+message_crud = MessageCRUD(Message)
+
+# Skill search results, invalidated whenever a skill is created or updated:
+# by the writer, and in every other process by the catalog's NOTIFY (so
+# without CACHE_REDIS_URL too)
+skill_search_cache = QueryCache(
+    "skill_search", ttl=float(os.getenv("SKILL_SEARCH_CACHE_TTL", "600"))
+)
+skill_catalog.on_change(lambda skill_id: skill_search_cache.invalidate_local())
 
 __all__ = [
     "BaseCRUD",
     "SkillCRUD",
+    "GoalEventCRUD",
+    "MessageCRUD",
     "user_crud",
     "user_preference_crud",
     "goal_crud",
     "goal_data_crud",
+    "goal_event_crud",
     "scheduled_message_crud",
     "skill_crud",
     "goal_skill_crud",
     "message_crud",
+    "skill_search_cache",
 ]
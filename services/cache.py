@@ -0,0 +1,284 @@
+"""Result caches: in-process LRU with TTL, optionally backed by Redis, and
+an on-disk TTL cache for processes without Redis."""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import metrics
+from services.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+
+CACHE_LOOKUPS = metrics.gauge(
+    "cache_lookups",
+    "Query cache lookups since start by result: local hit, Redis hit or miss",
+    ("cache", "result"),
+)
+CACHE_HIT_RATIO = metrics.gauge(
+    "cache_hit_ratio", "Share of query cache lookups served from either tier", ("cache",)
+)
+CACHE_ENTRIES = metrics.gauge("cache_entries", "Entries in the local cache tier", ("cache",))
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query for use as a cache key."""
+    return " ".join(re.sub(r"[^\w\s]", " ", query.lower()).split())
+
+
+def content_key(value: Any) -> str:
+    """Content address of a JSON-serializable value (sha256 of canonical JSON)."""
+    return hashlib.sha256(dumps(value).encode()).hexdigest()
+
+
+class TTLCache:
+    """In-process LRU cache whose entries expire after ttl seconds"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached value, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        """Cache a value, evicting the least recently used entry when full"""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+        }
+
+
+class QueryCache:
+    """
+    Two-tier cache for query results: a TTLCache in front of optional Redis.
+
+    Keys are scoped by a generation number. invalidate() bumps it, which drops
+    every entry at once; with Redis the generation is shared, so other
+    processes pick up the bump within gen_check_interval seconds. Without
+    Redis, other processes must be told some other way and call
+    invalidate_local() (skill searches: the skill catalog's NOTIFY). A result
+    computed before an invalidate() must not be stored after it: read
+    generation() before the lookup and pass it to set(). Values must be
+    JSON-serializable. Hit rates are exported as metrics.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: float = 300,
+        maxsize: int = 1024,
+        redis_url: Optional[str] = CACHE_REDIS_URL,
+        gen_check_interval: float = 5,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.redis_hits = 0
+        self._generation = 0
+        self._gen_checked_at = 0.0
+        self._gen_check_interval = gen_check_interval
+        self._redis = None
+        if redis_url:
+            try:
+                import redis.asyncio as aioredis
+
+                self._redis = aioredis.Redis.from_url(redis_url)
+            except ImportError:
+                logger.warning(f"redis not installed - {namespace} cache is local only")
+        metrics.add_collector(self._collect_metrics)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get a cached value from the local tier, then Redis"""
+        generation = await self.generation()
+        value = self.local.get(f"{generation}:{key}")
+        if value is not None or self._redis is None:
+            return value
+        try:
+            raw = await self._redis.get(self._redis_key(generation, key))
+        except Exception as e:
+            logger.warning(f"{self.namespace} cache: Redis get failed: {e}")
+            return None
+        if raw is None:
+            return None
+        self.redis_hits += 1
+        value = loads(raw)
+        self.local.set(f"{generation}:{key}", value)
+        return value
+
+    async def set(self, key: str, value: Any, generation: Optional[int] = None) -> None:
+        """Cache a value in both tiers.
+
+        generation is the one read before the value was computed; if the cache
+        has been invalidated since, the value may be stale and is not stored.
+        """
+        current = await self.generation(refresh=generation is not None)
+        if generation is not None and generation != current:
+            return
+        generation = current
+        self.local.set(f"{generation}:{key}", value)
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(
+                self._redis_key(generation, key), dumps(value), ex=int(self.ttl)
+            )
+        except Exception as e:
+            logger.warning(f"{self.namespace} cache: Redis set failed: {e}")
+
+    async def invalidate(self) -> None:
+        """Drop every cached entry, in this process and (via Redis) in others"""
+        self.local.clear()
+        if self._redis is None:
+            self._generation += 1
+            return
+        try:
+            self._generation = await self._redis.incr(f"{self.namespace}:gen")
+            self._gen_checked_at = time.monotonic()
+        except Exception as e:
+            logger.warning(f"{self.namespace} cache: Redis invalidate failed: {e}")
+            self._generation += 1
+
+    def invalidate_local(self) -> None:
+        """Drop this process's entries after another process's invalidate()
+
+        Values computed before this call are not stored by a later set(), and
+        the next lookup re-reads the shared generation from Redis.
+        """
+        self.local.clear()
+        self._generation += 1
+        self._gen_checked_at = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate metrics across both tiers"""
+        stats = self.local.stats()
+        lookups = stats["hits"] + stats["misses"]
+        stats["redis_hits"] = self.redis_hits
+        stats["hit_rate"] = (
+            (stats["hits"] + self.redis_hits) / lookups if lookups else 0.0
+        )
+        return stats
+
+    def _collect_metrics(self) -> None:
+        stats = self.stats()
+        CACHE_LOOKUPS.set(stats["hits"], cache=self.namespace, result="local_hit")
+        CACHE_LOOKUPS.set(stats["redis_hits"], cache=self.namespace, result="redis_hit")
+        CACHE_LOOKUPS.set(
+            stats["misses"] - stats["redis_hits"], cache=self.namespace, result="miss"
+        )
+        CACHE_HIT_RATIO.set(stats["hit_rate"], cache=self.namespace)
+        CACHE_ENTRIES.set(stats["size"], cache=self.namespace)
+
+    async def generation(self, refresh: bool = False) -> int:
+        """Generation to scope keys by, refreshed from Redis now and then
+        (or now, with refresh)"""
+        if self._redis is None:
+            return self._generation
+        now = time.monotonic()
+        if refresh or now - self._gen_checked_at >= self._gen_check_interval:
+            try:
+                raw = await self._redis.get(f"{self.namespace}:gen")
+                self._generation = int(raw or 0)
+            except Exception as e:
+                logger.warning(f"{self.namespace} cache: Redis unavailable: {e}")
+            self._gen_checked_at = now
+        return self._generation
+
+    def _redis_key(self, generation: int, key: str) -> str:
+        return f"{self.namespace}:{generation}:{key}"
+
+
+class DiskCache:
+    """
+    TTL cache of JSON values in files under directory, one file per key.
+
+    Survives restarts and is shared by processes on the same host. Keys are
+    hashed into file names; expired files are replaced on the next set.
+    """
+
+    def __init__(self, directory: str, ttl: float = 3600):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get a cached value, or None if missing or expired"""
+        value = await asyncio.to_thread(self._read, self._path(key))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        """Cache a value for ttl seconds"""
+        await asyncio.to_thread(self._write, self._path(key), value)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def _read(self, path: Path) -> Optional[Any]:
+        try:
+            entry = loads(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+        if entry["expires_at"] < time.time():
+            return None
+        return entry["value"]
+
+    def _write(self, path: Path, value: Any) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so readers never see a partial file
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(
+                dumps({"expires_at": time.time() + self.ttl, "value": value}),
+                encoding="utf-8",
+            )
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Disk cache write to {path} failed: {e}")
@@ -0,0 +1,244 @@
+"""Process-wide, memory-resident catalog of skills."""
+
+import asyncio
+import logging
+import sys
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+
+from database import AsyncSessionLocal, DATABASE_DIRECT_URL
+from models.models import Skill
+
+logger = logging.getLogger(__name__)
+
+# Postgres channel skill writers notify (payload: skill id) once they commit
+NOTIFY_CHANNEL = "skill_catalog"
+
+# Columns a SkillEntry is built from (skips search vectors and embeddings)
+_ENTRY_COLUMNS = load_only(
+    Skill.name,
+    Skill.title,
+    Skill.description,
+    Skill.skill_prompt,
+    Skill.skill_metadata,
+    Skill.usage_count,
+    Skill.created_by_type,
+    Skill.is_active,
+    Skill.created_at,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SkillEntry:
+    """Immutable snapshot of a skill as served from the catalog."""
+
+    id: int
+    name: str
+    title: str
+    description: Optional[str]
+    skill_prompt: str
+    skill_metadata: Optional[Dict[str, Any]]
+    usage_count: int
+    created_by_type: str
+    is_active: bool
+    created_at: datetime
+
+
+class SkillCatalog:
+    """
+    All skills, held in memory so skill reads need no DB round-trip.
+
+    Skills are shared by every user and change rarely, so each process loads
+    them once (at startup via start(), or on first use) into slotted,
+    immutable entries with interned names; each prompt is held once per
+    process instead of being re-read on every call. Writers call notify()
+    inside their transaction; Postgres delivers it on commit, and every
+    process listening through start() reloads that one skill and runs the
+    on_change() callbacks (e.g. dropping cached skill searches). As a
+    fallback (no listener, or a dropped notification) skills updated since
+    the last sync are reloaded at most every refresh_interval seconds on
+    access.
+    """
+
+    def __init__(self, refresh_interval: float = 300):
+        self.refresh_interval = refresh_interval
+        self._skills: Dict[int, SkillEntry] = {}
+        self._loaded = False
+        self._synced_at: Optional[datetime] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self._listener = None
+        self._pending: set = set()
+        self._on_change: List[Callable[[int], None]] = []
+
+    def __len__(self) -> int:
+        return len(self._skills)
+
+    async def start(self) -> None:
+        """Load the catalog and listen for skill changes (call once at startup)."""
+        await self._sync(force=True)
+        if self._listener is not None:
+            return
+        try:
+            import asyncpg
+
+            # LISTEN needs a session of its own, so not through a pooler
+            self._listener = await asyncpg.connect(
+                DATABASE_DIRECT_URL.replace("postgresql+asyncpg://", "postgresql://")
+            )
+            await self._listener.add_listener(NOTIFY_CHANNEL, self._on_notify)
+            logger.info(f"Skill catalog loaded {len(self)} skills, listening for changes")
+        except Exception as e:
+            self._listener = None
+            logger.warning(
+                f"Skill catalog LISTEN failed ({e}) - refreshing every "
+                f"{self.refresh_interval:.0f}s instead"
+            )
+
+    async def stop(self) -> None:
+        """Close the LISTEN connection."""
+        if self._listener is not None:
+            await self._listener.close()
+            self._listener = None
+
+    async def get(
+        self, skill_id: int, db: Optional[AsyncSession] = None
+    ) -> Optional[SkillEntry]:
+        """
+        Get a skill from memory. A miss (skill not seen yet by this process)
+        is read through db, or a fresh session if none is given.
+        """
+        await self._sync()
+        entry = self._skills.get(skill_id)
+        if entry is None:
+            entry = (await self.fetch([skill_id], db)).get(skill_id)
+        return entry
+
+    async def get_many(
+        self, skill_ids: Iterable[int], db: Optional[AsyncSession] = None
+    ) -> Dict[int, SkillEntry]:
+        """Get several skills by id, reading any misses in one query."""
+        await self._sync()
+        entries = {id: self._skills[id] for id in skill_ids if id in self._skills}
+        missing = [id for id in skill_ids if id not in entries]
+        if missing:
+            entries.update(await self.fetch(missing, db))
+        return entries
+
+    def put(self, skill: Skill) -> None:
+        """Add or replace a committed skill (e.g. after a local write)."""
+        self._skills[skill.id] = self._entry(skill)
+
+    def add_usage(self, counts: Dict[int, int]) -> None:
+        """Apply usage increments written by this process to cached entries
+        (usage bumps keep updated_at, so the periodic sync won't see them)."""
+        for skill_id, n in counts.items():
+            entry = self._skills.get(skill_id)
+            if entry is not None:
+                self._skills[skill_id] = replace(entry, usage_count=entry.usage_count + n)
+
+    async def notify(self, db: AsyncSession, skill_id: int) -> None:
+        """Tell every process's catalog that a skill changed, once db commits."""
+        await db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": NOTIFY_CHANNEL, "payload": str(skill_id)},
+        )
+
+    def on_change(self, callback: Callable[[int], None]) -> None:
+        """Call callback(skill_id) whenever a skill change is notified, in
+        every listening process (the writer's included)."""
+        self._on_change.append(callback)
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        skill_id = int(payload)
+        for callback in self._on_change:
+            try:
+                callback(skill_id)
+            except Exception as e:
+                logger.error(f"Skill change callback failed: {e}", exc_info=True)
+        if skill_id in self._pending:
+            return
+        self._pending.add(skill_id)
+        asyncio.get_running_loop().create_task(self._reload(skill_id))
+
+    async def _reload(self, skill_id: int) -> None:
+        self._pending.discard(skill_id)
+        try:
+            await self.fetch([skill_id])
+        except Exception as e:
+            logger.error(f"Skill catalog reload of {skill_id} failed: {e}", exc_info=True)
+
+    async def fetch(
+        self, skill_ids: Iterable[int], db: Optional[AsyncSession] = None
+    ) -> Dict[int, SkillEntry]:
+        """
+        Read skills from the DB, bypassing memory. What is read through a
+        committed view (not an agent run's unit of work) is cached.
+        """
+        query = (
+            select(Skill).options(_ENTRY_COLUMNS).where(Skill.id.in_(list(skill_ids)))
+        )
+        if db is not None and db.info.get("unit_of_work"):
+            # May see this run's uncommitted writes: serve, but don't cache
+            result = await db.execute(query)
+            return {skill.id: self._entry(skill) for skill in result.scalars().all()}
+        if db is not None:
+            skills = (await db.execute(query)).scalars().all()
+        else:
+            async with AsyncSessionLocal() as session:
+                skills = (await session.execute(query)).scalars().all()
+        for skill in skills:
+            self.put(skill)
+        return {skill.id: self._skills[skill.id] for skill in skills}
+
+    def _entry(self, skill: Skill) -> SkillEntry:
+        return SkillEntry(
+            id=skill.id,
+            name=sys.intern(skill.name),
+            title=skill.title,
+            description=skill.description,
+            skill_prompt=skill.skill_prompt,
+            skill_metadata=skill.skill_metadata,
+            usage_count=skill.usage_count,
+            created_by_type=sys.intern(skill.created_by_type.value),
+            is_active=skill.is_active,
+            created_at=skill.created_at,
+        )
+
+    async def _sync(self, force: bool = False) -> None:
+        """Full load on first use, then periodic catch-up on updated_at."""
+        if (
+            not force
+            and self._loaded
+            and time.monotonic() - self._checked_at < self.refresh_interval
+        ):
+            return
+        async with self._lock:
+            if (
+                not force
+                and self._loaded
+                and time.monotonic() - self._checked_at < self.refresh_interval
+            ):
+                return
+            started = datetime.utcnow()
+            query = select(Skill).options(_ENTRY_COLUMNS)
+            if self._synced_at is not None:
+                query = query.where(Skill.updated_at >= self._synced_at)
+            try:
+                async with AsyncSessionLocal() as db:
+                    for skill in (await db.execute(query)).scalars().all():
+                        self.put(skill)
+                self._synced_at = started
+                self._loaded = True
+            except Exception as e:
+                logger.error(f"Skill catalog sync failed: {e}", exc_info=True)
+            self._checked_at = time.monotonic()
+
+
+skill_catalog = SkillCatalog()
@@ -0,0 +1,140 @@
+"""Buffered skill usage counters flushed to Postgres in batches."""
+
+import asyncio
+import logging
+import os
+import uuid
+from collections import Counter
+from typing import Dict, Optional
+
+from database import AsyncSessionLocal
+from models.models import Skill
+from services.cache import CACHE_REDIS_URL
+from services.catalog import skill_catalog
+from services.services import SkillCRUD
+
+logger = logging.getLogger(__name__)
+
+# Seconds between flushes; 0 writes every increment straight through
+SKILL_USAGE_FLUSH_INTERVAL = float(os.getenv("SKILL_USAGE_FLUSH_INTERVAL", "10"))
+
+
+class SkillUsageCounter:
+    """
+    Collects skill usage increments and applies them in one batched UPDATE.
+
+    Linking a popular skill would otherwise take that skill's row lock in
+    every agent run. Increments are buffered in Redis (a hash shared by all
+    processes) when CACHE_REDIS_URL is set, else in process, and written by
+    flush() every flush_interval seconds once start() runs the flush loop.
+    With flush_interval 0 (or before start()) increments are written
+    directly.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = SKILL_USAGE_FLUSH_INTERVAL,
+        redis_url: Optional[str] = CACHE_REDIS_URL,
+        key: str = "skill_usage",
+    ):
+        self.flush_interval = flush_interval
+        self.key = key
+        self._pending: Counter = Counter()
+        self._task: Optional[asyncio.Task] = None
+        self._redis = None
+        if redis_url:
+            try:
+                import redis.asyncio as aioredis
+
+                self._redis = aioredis.Redis.from_url(redis_url)
+            except ImportError:
+                logger.warning("redis not installed - skill usage is buffered in process")
+
+    @property
+    def buffered(self) -> bool:
+        return self._task is not None
+
+    async def record(self, skill_id: int, n: int = 1) -> None:
+        """Count n uses of a skill (call once the use is committed)."""
+        if not self.buffered:
+            await self._write({skill_id: n})
+            return
+        if self._redis is not None:
+            try:
+                await self._redis.hincrby(self.key, str(skill_id), n)
+                return
+            except Exception as e:
+                logger.warning(f"Skill usage: Redis HINCRBY failed, buffering locally: {e}")
+        self._pending[skill_id] += n
+
+    async def flush(self) -> int:
+        """Write all buffered increments in one UPDATE; returns skills updated."""
+        counts = Counter(self._pending)
+        self._pending.clear()
+        if self._redis is not None:
+            counts.update(await self._drain_redis())
+        if not counts:
+            return 0
+        written = False
+        try:
+            await self._write(counts)
+            written = True
+        finally:
+            if not written:
+                # Failed or cancelled (e.g. at shutdown): keep the increments
+                # for the next flush
+                self._pending.update(counts)
+        return len(counts)
+
+    async def start(self) -> None:
+        """Start the periodic flush loop (no-op when flush_interval is 0)."""
+        if self.flush_interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write what is still buffered."""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        task.cancel()
+        # Let a flush in progress put back what it took before the final one
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Final skill usage flush failed: {e}", exc_info=True)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                flushed = await self.flush()
+                if flushed:
+                    logger.info(f"Flushed usage counts for {flushed} skills")
+            except Exception as e:
+                logger.error(f"Skill usage flush failed: {e}", exc_info=True)
+
+    async def _drain_redis(self) -> Dict[int, int]:
+        """Atomically take the shared hash (RENAME), so concurrent HINCRBYs
+        land in a fresh one and no increment is read twice."""
+        claimed = f"{self.key}:flushing:{uuid.uuid4().hex}"
+        try:
+            await self._redis.rename(self.key, claimed)
+        except Exception:
+            # No such key (nothing buffered) or Redis unavailable
+            return {}
+        raw = await self._redis.hgetall(claimed)
+        await self._redis.delete(claimed)
+        return {int(k): int(v) for k, v in raw.items()}
+
+    async def _write(self, counts: Dict[int, int]) -> None:
+        async with AsyncSessionLocal() as db:
+            await _skill_crud.increment_usage(db, counts)
+        skill_catalog.add_usage(counts)
+
+
+_skill_crud = SkillCRUD(Skill)
+skill_usage = SkillUsageCounter()
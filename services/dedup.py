@@ -0,0 +1,72 @@
+"""MinHash signatures and LSH band keys for near-duplicate skill prompts."""
+
+import hashlib
+import re
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+MINHASH_PERMUTATIONS = 64
+# 16 bands of 4 rows: pairs with Jaccard >= ~0.5 share a band with high odds
+LSH_BANDS = 16
+SHINGLE_WORDS = 3
+
+_ROWS_PER_BAND = MINHASH_PERMUTATIONS // LSH_BANDS
+# Fixed seed: signatures are stored with the skills, so the hash family must
+# never change between processes or releases
+_rng = np.random.default_rng(20261019)
+_MULTIPLIERS = _rng.integers(1, 2**63, size=MINHASH_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_OFFSETS = _rng.integers(0, 2**63, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+
+def shingles(text: str) -> List[str]:
+    """Overlapping word n-grams of the normalized text."""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= SHINGLE_WORDS:
+        return [" ".join(words)] if words else []
+    return [
+        " ".join(words[i:i + SHINGLE_WORDS])
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    ]
+
+
+def minhash_signature(text: str) -> List[int]:
+    """MinHash signature of text's shingles (MINHASH_PERMUTATIONS values < 2**32)."""
+    hashes = np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little")
+            for s in set(shingles(text))
+        ),
+        dtype=np.uint64,
+    )
+    if not len(hashes):
+        return [0] * MINHASH_PERMUTATIONS
+    # Multiply-shift hashing: (a * x + b) mod 2**64, top 32 bits
+    with np.errstate(over="ignore"):
+        permuted = (hashes[None, :] * _MULTIPLIERS[:, None] + _OFFSETS[:, None]) >> np.uint64(32)
+    return permuted.min(axis=1).astype(np.int64).tolist()
+
+
+def lsh_bands(signature: Sequence[int]) -> List[int]:
+    """One signed 64-bit key per band; skills sharing a key are LSH candidates."""
+    keys = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * _ROWS_PER_BAND:(band + 1) * _ROWS_PER_BAND]
+        digest = hashlib.blake2b(
+            f"{band}:{','.join(map(str, rows))}".encode(), digest_size=8
+        ).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+def prompt_fingerprint(text: str) -> Tuple[List[int], List[int]]:
+    """(signature, band keys) to store with a skill's prompt."""
+    signature = minhash_signature(text)
+    return signature, lsh_bands(signature)
+
+
+def estimate_jaccard(a: Sequence[int], b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    if not a or not b or len(a) != len(b):
+        return 0.0
+    return float(np.mean(np.asarray(a) == np.asarray(b)))
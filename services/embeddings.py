@@ -0,0 +1,299 @@
+"""Local text encoders and the in-process skill embedding index."""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from database import AsyncSessionLocal
+from models.models import Skill
+
+logger = logging.getLogger(__name__)
+
+# "hashing" (default, no model download) or "sentence-transformers/<model name>"
+SKILL_ENCODER = os.getenv("SKILL_ENCODER", "hashing")
+
+
+class Encoder(Protocol):
+    """Turns texts into L2-normalized float32 vectors of a fixed size."""
+
+    name: str
+    dim: int
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray: ...
+
+
+class HashingEncoder:
+    """
+    Deterministic feature-hashing encoder (words plus character trigrams).
+
+    Captures lexical and sub-word overlap only, not meaning, but needs no
+    model and gives identical vectors on every machine, which is what tests
+    and development want.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                sign = 1.0 if value & 1 else -1.0
+                vectors[row, (value >> 1) % self.dim] += sign
+        return _normalize(vectors)
+
+    @staticmethod
+    def _features(text: str) -> List[str]:
+        words = re.findall(r"\w+", text.lower().replace("_", " "))
+        features = [f"w:{word}" for word in words]
+        for word in words:
+            padded = f"#{word}#"
+            features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+
+
+class SentenceTransformerEncoder:
+    """Local sentence-transformers model (optional dependency)."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self._model = SentenceTransformer(model_name)
+        self.dim = self._model.get_sentence_embedding_dimension()
+        self.name = f"st-{model_name}"
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self._model.encode(list(texts), convert_to_numpy=True)
+        return _normalize(vectors.astype(np.float32))
+
+
+def get_encoder(spec: str = SKILL_ENCODER) -> Encoder:
+    """Build the encoder named by spec (see SKILL_ENCODER)."""
+    if spec.startswith("sentence-transformers/"):
+        try:
+            return SentenceTransformerEncoder(spec.split("/", 1)[1])
+        except ImportError:
+            logger.warning(
+                "sentence-transformers not installed - falling back to hashing encoder"
+            )
+    return HashingEncoder()
+
+
+# skill_metadata keys worth embedding (others are bookkeeping like "version")
+EMBEDDED_METADATA_KEYS = ("category", "intensity", "tracking_type", "tags")
+
+
+def skill_text(
+    name: str,
+    title: str,
+    description: Optional[str],
+    metadata: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Text a skill is embedded from: identity, description and tags."""
+    parts = [name.replace("_", " "), title, description or ""]
+    for key in EMBEDDED_METADATA_KEYS:
+        value = (metadata or {}).get(key)
+        if isinstance(value, list):
+            parts.extend(str(item) for item in value)
+        elif value:
+            parts.append(str(value).replace("_", " "))
+    return " ".join(part for part in parts if part)
+
+
+def _skill_text(skill: Skill) -> str:
+    return skill_text(skill.name, skill.title, skill.description, skill.skill_metadata)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class SkillEmbeddingIndex:
+    """
+    Process-wide matrix of active skill embeddings for top-k cosine search.
+
+    Loaded once per process on first use, reading only ids and vectors;
+    skills without an embedding from the current encoder are embedded in
+    memory at that point (nothing is written back: tasks.skill_embeddings
+    stores them). After that the index is kept current incrementally:
+    upsert() on local skill writes, and a delta query on updated_at at most
+    every refresh_interval seconds to pick up writes from other processes.
+
+    Rows live in a preallocated matrix that grows by doubling, with an
+    id -> row map: adding, replacing or removing a skill touches one row.
+    """
+
+    def __init__(self, encoder: Optional[Encoder] = None, refresh_interval: float = 60):
+        self._encoder = encoder
+        self.refresh_interval = refresh_interval
+        # Rows [0, _size) are in use; the rest is spare capacity
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._matrix: Optional[np.ndarray] = None
+        self._size = 0
+        self._positions: Dict[int, int] = {}
+        self._synced_at: Optional[datetime] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def encoder(self) -> Encoder:
+        if self._encoder is None:
+            self._encoder = get_encoder()
+        return self._encoder
+
+    def __len__(self) -> int:
+        return self._size
+
+    def embed(self, text: str) -> List[float]:
+        """Embedding of skill_text(...) to store with a skill on create/update."""
+        return self.encoder.encode([text])[0].tolist()
+
+    async def top_k(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """Most similar active skills to query as (skill_id, cosine) pairs."""
+        await self._sync()
+        if not self._size:
+            return []
+        similarities = self._matrix[: self._size] @ self.encoder.encode([query])[0]
+        k = min(k, len(similarities))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top])]
+        return [(int(self._ids[i]), float(similarities[i])) for i in top]
+
+    async def similarities(self, query: str, skill_ids: Sequence[int]) -> Dict[int, float]:
+        """Cosine similarity of query to each indexed skill in skill_ids."""
+        await self._sync()
+        rows = [self._positions[i] for i in skill_ids if i in self._positions]
+        if not rows:
+            return {}
+        scores = self._matrix[rows] @ self.encoder.encode([query])[0]
+        return {int(self._ids[row]): float(score) for row, score in zip(rows, scores)}
+
+    def upsert(self, skill: Skill) -> None:
+        """Add, replace or (if inactive) drop one skill after a local write."""
+        if not skill.is_active:
+            self._remove(skill.id)
+            return
+        if skill.embedding and skill.embedding_model == self.encoder.name:
+            vector = np.asarray(skill.embedding, dtype=np.float32)
+        else:
+            vector = self.encoder.encode([_skill_text(skill)])[0]
+        self._set_rows([skill.id], vector[None, :])
+
+    async def _sync(self) -> None:
+        """Load the index on first use, then apply other processes' writes."""
+        if self._matrix is not None and time.monotonic() - self._checked_at < self.refresh_interval:
+            return
+        async with self._lock:
+            if self._matrix is not None and time.monotonic() - self._checked_at < self.refresh_interval:
+                return
+            try:
+                await self._load(since=self._synced_at)
+            except Exception as e:
+                logger.error(f"Skill embedding index sync failed: {e}", exc_info=True)
+                self._reserve(0)
+            self._checked_at = time.monotonic()
+
+    async def _load(self, since: Optional[datetime]) -> None:
+        started = datetime.utcnow()
+        name = self.encoder.name
+        changed = [] if since is None else [Skill.updated_at >= since]
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Skill.id, Skill.is_active, Skill.embedding_model, Skill.embedding)
+                .where(*changed)
+            )
+            rows = result.all()
+            stored = [
+                row
+                for row in rows
+                if row.is_active and row.embedding and row.embedding_model == name
+            ]
+            # Skills with no vector from the current encoder yet are embedded
+            # in memory only; tasks.skill_embeddings stores them (searches
+            # never write). Only these need the text columns
+            stale = []
+            if sum(row.is_active for row in rows) > len(stored):
+                stored_ids = {row.id for row in stored}
+                result = await db.execute(
+                    select(
+                        Skill.id, Skill.name, Skill.title, Skill.description, Skill.skill_metadata
+                    ).where(Skill.is_active, *changed)
+                )
+                stale = [row for row in result.all() if row.id not in stored_ids]
+
+        ids = [row.id for row in stored]
+        vectors = np.asarray([row.embedding for row in stored], dtype=np.float32)
+        vectors = vectors.reshape(len(stored), self.encoder.dim)
+        if stale:
+            # Off the event loop: a model encoder can take a while
+            encoded = await asyncio.to_thread(
+                self.encoder.encode, [skill_text(*row[1:]) for row in stale]
+            )
+            ids += [row.id for row in stale]
+            vectors = np.vstack([vectors, encoded])
+            logger.info(
+                f"Embedded {len(stale)} skills in memory with {name} - "
+                "run python -m tasks.skill_embeddings to store them"
+            )
+
+        self._set_rows(ids, vectors)
+        for row in rows:
+            if not row.is_active:
+                self._remove(row.id)
+        self._synced_at = started
+
+    def _reserve(self, count: int) -> None:
+        """Make room for count more rows, doubling the capacity when full."""
+        needed = self._size + count
+        if self._matrix is not None and needed <= len(self._matrix):
+            return
+        capacity = max(needed, 2 * self._size, 64)
+        matrix = np.zeros((capacity, self.encoder.dim), dtype=np.float32)
+        ids = np.zeros(capacity, dtype=np.int64)
+        if self._matrix is not None:
+            matrix[: self._size] = self._matrix[: self._size]
+            ids[: self._size] = self._ids[: self._size]
+        self._matrix, self._ids = matrix, ids
+
+    def _set_rows(self, skill_ids: List[int], vectors: np.ndarray) -> None:
+        """Add or replace the rows of skill_ids with one assignment."""
+        self._reserve(len(skill_ids))
+        rows = []
+        for skill_id in skill_ids:
+            position = self._positions.get(skill_id)
+            if position is None:
+                position = self._positions[skill_id] = self._size
+                self._ids[position] = skill_id
+                self._size += 1
+            rows.append(position)
+        if rows:
+            self._matrix[rows] = vectors
+
+    def _remove(self, skill_id: int) -> None:
+        """Drop a skill's row, moving the last row into its place."""
+        position = self._positions.pop(skill_id, None)
+        if position is None:
+            return
+        self._size -= 1
+        last = self._size
+        if position != last:
+            moved = int(self._ids[last])
+            self._matrix[position] = self._matrix[last]
+            self._ids[position] = moved
+            self._positions[moved] = position
+
+
+skill_embedding_index = SkillEmbeddingIndex()
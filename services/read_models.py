@@ -0,0 +1,87 @@
+"""
+Read models: slotted, immutable rows for the tools' read paths.
+
+Read queries select just these columns (select(*MESSAGE_COLUMNS)) instead
+of hydrating ORM objects, so a row carries no identity-map entry, change
+tracking or unused columns (for skills: embedding, MinHash and search
+vector arrays). services.serialization.dumps encodes them directly.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from models.models import (
+    Goal,
+    GoalStatus,
+    Message,
+    MessageRole,
+    Skill,
+    SkillCreatedBy,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class GoalRow:
+    """A goal as the agent reads it (cached for the run by AgentContext)."""
+
+    id: int
+    user_id: int
+    title: str
+    status: GoalStatus
+    created_at: datetime
+    updated_at: datetime
+    meta_data: Optional[Dict[str, Any]]
+
+    @classmethod
+    def from_goal(cls, goal: Goal) -> "GoalRow":
+        """Snapshot of a goal ORM object (e.g. one a write tool returned)."""
+        return cls(*(getattr(goal, column.key) for column in GOAL_COLUMNS))
+
+
+GOAL_COLUMNS = (
+    Goal.id,
+    Goal.user_id,
+    Goal.title,
+    Goal.status,
+    Goal.created_at,
+    Goal.updated_at,
+    Goal.meta_data,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class MessageRow:
+    """A message in the conversation history."""
+
+    role: MessageRole
+    content: str
+    goal_id: Optional[int]
+    created_at: datetime
+
+
+MESSAGE_COLUMNS = (Message.role, Message.content, Message.goal_id, Message.created_at)
+
+
+@dataclass(frozen=True, slots=True)
+class SkillRow:
+    """A skill as search results show it (no prompt, vectors or fingerprints)."""
+
+    id: int
+    name: str
+    title: str
+    description: Optional[str]
+    usage_count: int
+    created_by_type: SkillCreatedBy
+    skill_metadata: Optional[Dict[str, Any]]
+
+
+SKILL_COLUMNS = (
+    Skill.id,
+    Skill.name,
+    Skill.title,
+    Skill.description,
+    Skill.usage_count,
+    Skill.created_by_type,
+    Skill.skill_metadata,
+)
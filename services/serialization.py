@@ -0,0 +1,64 @@
+"""
+JSON encoding and decoding for tool arguments and results, prompts, caches
+and external API calls.
+
+Uses orjson when it is installed and stdlib json otherwise. Output is
+compact and deterministic (dict keys sorted), so equal values encode to
+equal strings. That matters for cache keys and keeps prompt prefixes
+stable between runs.
+
+Datetimes, dates, enums and dataclasses (read models) are encoded
+directly, with no .isoformat() or .value at the call site.
+
+The two backends produce the same text except in two cases, so output
+is not byte-identical across them. orjson keeps dataclass fields in
+declaration order, while stdlib json sorts them like any other keys
+(sorting costs orjson ~2x on read models). orjson also writes large
+floats as 1e16 where stdlib writes 1e+16.
+"""
+
+import dataclasses
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Dict keys that aren't strings (e.g. goal ids) become strings, as with
+# json.dumps. Naive datetimes stay without an offset, as with isoformat().
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS) if orjson else 0
+
+
+def _default(value: Any) -> Any:
+    """stdlib fallback for the types orjson encodes natively"""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {f.name: getattr(value, f.name) for f in dataclasses.fields(value)}
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> str:
+    """Compact JSON with sorted keys."""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=_ORJSON_OPTIONS).decode()
+    return json.dumps(
+        value,
+        separators=(",", ":"),
+        sort_keys=True,
+        ensure_ascii=False,
+        default=_default,
+    )
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON text (str or UTF-8 bytes)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -1,9 +1,54 @@
-from typing import Generic, TypeVar, Type, Optional, List, Dict, Any
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
 from datetime import datetime
-from sqlalchemy import select, update, delete, func, or_
+from sqlalchemy import (
+    Integer,
+    column,
+    values,
+    select,
+    insert,
+    update,
+    delete,
+    func,
+    or_,
+    literal,
+    tuple_,
+    true,
+    String,
+    DateTime,
+)
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from models.models import Base, Skill, Message, User, ScheduledMessage, MessageRole, MessageStatus
+from models.models import (
+    Base,
+    Skill,
+    Message,
+    User,
+    Goal,
+    GoalEvent,
+    ScheduledMessage,
+    MessageRole,
+    MessageStatus,
+)
 from database import AsyncSessionLocal
+from services.dedup import estimate_jaccard
+from services.embeddings import skill_embedding_index
+from services.read_models import (
+    MESSAGE_COLUMNS,
+    SKILL_COLUMNS,
+    MessageRow,
+    SkillRow,
+)
 
 ModelType = TypeVar("ModelType", bound=Base)
 
@@ -14,11 +59,19 @@ class BaseCRUD(Generic[ModelType]):
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
+    async def _commit(self, db: AsyncSession) -> None:
+        """Commit, or only flush if the session is an agent run's unit of work
+        (it is committed once when the run finishes)"""
+        if db.info.get("unit_of_work"):
+            await db.flush()
+        else:
+            await db.commit()
+
     async def create(self, db: AsyncSession, **kwargs) -> ModelType:
         """Create a new record"""
         obj = self.model(**kwargs)
         db.add(obj)
-        await db.commit()
+        await self._commit(db)
         await db.refresh(obj)
         return obj
 
@@ -38,14 +91,110 @@ class BaseCRUD(Generic[ModelType]):
     async def get_all(
         self, db: AsyncSession, skip: int = 0, limit: int = 100, **filters
     ) -> List[ModelType]:
-        """Get all records with optional filters and pagination"""
+        """Get records by id with optional filters and OFFSET pagination
+        (for walking large tables use iter_all or stream)"""
         query = select(self.model)
         for key, value in filters.items():
             query = query.where(getattr(self.model, key) == value)
-        query = query.offset(skip).limit(limit)
+        query = query.order_by(self.model.id).offset(skip).limit(limit)
         result = await db.execute(query)
         return list(result.scalars().all())
 
+    def _sort_keys(self, order_by: str) -> Tuple[List[Any], bool]:
+        """Columns to sort by for order_by ("col" or "-col" for descending),
+        with id appended as tie-breaker, and whether to sort descending"""
+        name = order_by.lstrip("-")
+        keys = [getattr(self.model, name)]
+        if name != "id":
+            keys.append(self.model.id)
+        return keys, order_by.startswith("-")
+
+    def _select(self, columns: Sequence[Any], keys: List[Any]) -> Any:
+        """select() of the model, or of columns plus any sort keys they lack
+        (iteration reads the keys of each batch's last row)"""
+        if not columns:
+            return select(self.model)
+        names = {column.key for column in columns}
+        return select(*columns, *(key for key in keys if key.key not in names))
+
+    async def iter_all(
+        self,
+        db: AsyncSession,
+        *criteria: Any,
+        batch_size: int = 1000,
+        order_by: str = "id",
+        columns: Sequence[Any] = (),
+        **filters,
+    ) -> AsyncIterator[Any]:
+        """
+        Iterate over all matching records in order_by order ("-col" for
+        descending), fetching batch_size at a time. With columns, yields rows
+        of just those columns (plus the sort keys) instead of model objects.
+
+        Keyset pagination: each batch continues after the last row of the
+        previous one (WHERE (col, id) > (:last_col, :last_id)) instead of
+        skipping an OFFSET. With an index on (col, id), or one that follows
+        the equality filters, every batch is the same index seek however far
+        the walk has got; only one batch is held in memory. order_by must name
+        a non-null column. criteria are extra SQL conditions, filters
+        equality conditions as in get_all.
+        """
+        keys, descending = self._sort_keys(order_by)
+        query = self._select(columns, keys)
+        for key, value in filters.items():
+            query = query.where(getattr(self.model, key) == value)
+        query = query.where(*criteria).order_by(
+            *(key.desc() if descending else key for key in keys)
+        ).limit(batch_size)
+
+        last = None
+        while True:
+            page = query
+            if last is not None:
+                position, bound = tuple_(*keys), tuple_(*last)
+                page = page.where(position < bound if descending else position > bound)
+            result = await db.execute(page)
+            rows = list(result.all() if columns else result.scalars().all())
+            for row in rows:
+                yield row
+            if len(rows) < batch_size:
+                return
+            last = [getattr(rows[-1], key.key) for key in keys]
+
+    async def stream(
+        self,
+        db: AsyncSession,
+        *criteria: Any,
+        order_by: str = "id",
+        yield_per: int = 1000,
+        columns: Sequence[Any] = (),
+        **filters,
+    ) -> AsyncIterator[Any]:
+        """
+        Iterate over all matching records through a server-side cursor,
+        fetching yield_per rows at a time (rows of just columns, if given,
+        as in iter_all).
+
+        One query and one consistent snapshot for the whole walk, with
+        constant memory; the connection (and its transaction) stays busy
+        until the iteration ends, so prefer iter_all when the caller awaits
+        other I/O between rows.
+        """
+        keys, descending = self._sort_keys(order_by)
+        query = self._select(columns, keys)
+        for key, value in filters.items():
+            query = query.where(getattr(self.model, key) == value)
+        query = query.where(*criteria).order_by(
+            *(key.desc() if descending else key for key in keys)
+        )
+        query = query.execution_options(yield_per=yield_per)
+        result = await (db.stream(query) if columns else db.stream_scalars(query))
+        try:
+            async for row in result:
+                yield row
+        finally:
+            await result.close()
+
     async def update(self, db: AsyncSession, id: int, **kwargs) -> Optional[ModelType]:
         """Update a record by ID"""
         stmt = (
@@ -55,9 +204,76 @@ class BaseCRUD(Generic[ModelType]):
             .returning(self.model)
         )
         result = await db.execute(stmt)
-        await db.commit()
+        await self._commit(db)
         return result.scalar_one_or_none()
 
+    async def jsonb_merge(
+        self,
+        db: AsyncSession,
+        id: Any,
+        column: str,
+        patch: Dict[str, Any],
+        deep: bool = False,
+        upsert_on: Optional[str] = None,
+        guard: Optional[Any] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Merge a JSON patch into a JSONB column server-side in one statement.
+
+        Runs UPDATE ... SET col = coalesce(col, '{}') || :patch RETURNING col,
+        so concurrent merges never lose each other's keys.
+
+        - deep: merge nested objects recursively (jsonb_deep_merge) instead of
+          replacing top-level keys
+        - upsert_on: unique column that id refers to (e.g. "goal_id"); the row
+          is created with the patch as its value if it does not exist yet
+        - guard: extra SQL condition (e.g. goal ownership) checked in the same
+          statement; nothing is written when it does not hold
+
+        Returns the merged document, or None if no row was written.
+        """
+        col = getattr(self.model, column)
+        patch_value = literal(patch, JSONB)
+
+        if upsert_on is None:
+            stmt = (
+                update(self.model)
+                .where(self.model.id == id)
+                .values({column: self._merge_expr(col, patch_value, deep)})
+                .returning(col)
+            )
+            if guard is not None:
+                stmt = stmt.where(guard)
+        else:
+            key_col = getattr(self.model, upsert_on)
+            now = datetime.utcnow()
+            values = {upsert_on: literal(id, key_col.type), column: patch_value}
+            for name in ("created_at", "updated_at"):
+                if hasattr(self.model, name):
+                    values[name] = literal(now, DateTime)
+            source = select(*values.values())
+            if guard is not None:
+                source = source.where(guard)
+            stmt = pg_insert(self.model).from_select(list(values), source)
+            set_ = {column: self._merge_expr(col, stmt.excluded[column], deep)}
+            if hasattr(self.model, "updated_at"):
+                set_["updated_at"] = now
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[key_col], set_=set_
+            ).returning(col)
+
+        result = await db.execute(stmt)
+        await self._commit(db)
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    def _merge_expr(col: Any, patch: Any, deep: bool) -> Any:
+        """SQL expression merging patch into the current value of col"""
+        current = func.coalesce(col, literal({}, JSONB))
+        if deep:
+            return func.jsonb_deep_merge(current, patch, type_=JSONB)
+        return current.op("||")(patch)
+
     async def update_by(
         self, db: AsyncSession, filters: Dict[str, Any], **kwargs
     ) -> int:
@@ -67,14 +283,14 @@ class BaseCRUD(Generic[ModelType]):
             stmt = stmt.where(getattr(self.model, key) == value)
         stmt = stmt.values(**kwargs)
         result = await db.execute(stmt)
-        await db.commit()
+        await self._commit(db)
         return result.rowcount
 
     async def delete(self, db: AsyncSession, id: int) -> bool:
         """Delete a record by ID"""
         stmt = delete(self.model).where(self.model.id == id)
         result = await db.execute(stmt)
-        await db.commit()
+        await self._commit(db)
         return result.rowcount > 0
 
     async def delete_by(self, db: AsyncSession, **filters) -> int:
@@ -83,7 +299,7 @@ class BaseCRUD(Generic[ModelType]):
         for key, value in filters.items():
             stmt = stmt.where(getattr(self.model, key) == value)
         result = await db.execute(stmt)
-        await db.commit()
+        await self._commit(db)
         return result.rowcount
 
     async def count(self, db: AsyncSession, **filters) -> int:
@@ -107,76 +323,353 @@ class BaseCRUD(Generic[ModelType]):
 class SkillCRUD(BaseCRUD[Skill]):
     """Extended CRUD operations for Skills with search functionality"""
 
+    # Weights of the combined search score. ts_rank is usually < 0.1 for a
+    # match, so full-text hits still rank above weak fuzzy matches; usage
+    # only breaks near-ties between similarly relevant skills.
+    TEXT_RANK_WEIGHT = 1.0
+    TRIGRAM_WEIGHT = 0.3
+    USAGE_WEIGHT = 0.01
+
+    # hybrid_search: share of the embedding similarity in the blended score,
+    # cosine a skill found only by the embedding index needs to be returned,
+    # and how many candidates per result each side contributes
+    SEMANTIC_WEIGHT = 0.6
+    MIN_SIMILARITY = 0.3
+    CANDIDATE_FACTOR = 3
+
+    # find_duplicate: estimated prompt Jaccard or name/title trigram
+    # similarity at which a new skill counts as a copy of an existing one
+    DUPLICATE_JACCARD = 0.7
+    DUPLICATE_NAME_SIMILARITY = 0.8
+    DUPLICATE_CANDIDATES = 50
+
     async def search(
         self, db: AsyncSession, query: str, limit: int = 10
     ) -> List[Skill]:
         """
-        Search skills using PostgreSQL full-text search with ILIKE fallback.
+        Search skills by relevance. See search_scored for how matches are ranked.
+        """
+        return [skill for skill, _ in await self.search_scored(db, query, limit)]
 
-        First attempts full-text search which handles:
-        - Word stemming (e.g., "running" matches "run")
-        - Word order independence
-        - Common word filtering
+    async def search_scored(
+        self, db: AsyncSession, query: str, limit: int = 10
+    ) -> List[Tuple[Skill, float]]:
+        """
+        Search skills in a single ranked query, returning (skill, score) pairs.
 
-        Falls back to ILIKE pattern matching if no results found.
+        A skill matches if any of these hold:
+        - Full-text search (stemming, word order independence, stop words)
+        - ILIKE '%query%' on name, title or description
+        - Trigram similarity to name/title, or word similarity to description
+
+        The tsquery is computed once in a CTE. Matches are ordered by one score
+        combining ts_rank, the best trigram similarity and log(usage_count).
+        Every predicate is served by the search_vector or pg_trgm GIN indexes.
         """
-        # Try full-text search first
-        fts_stmt = (
-            select(self.model)
+        result = await db.execute(self._search_stmt(query, limit, self.model))
+        return [(skill, float(score)) for skill, score in result.all()]
+
+    def _search_stmt(self, query: str, limit: int, *entities: Any) -> Any:
+        """search_scored's ranked query, selecting entities plus the score"""
+        tsq = select(func.plainto_tsquery("english", query).label("tsq")).cte("q")
+        pattern = f"%{query}%"
+        text_rank = func.ts_rank(self.model.search_vector, tsq.c.tsq)
+        trigram = func.greatest(
+            func.similarity(self.model.name, query),
+            func.similarity(self.model.title, query),
+            func.word_similarity(query, func.coalesce(self.model.description, "")),
+        )
+        score = (
+            text_rank * self.TEXT_RANK_WEIGHT
+            + trigram * self.TRIGRAM_WEIGHT
+            + func.ln(1 + self.model.usage_count) * self.USAGE_WEIGHT
+        ).label("score")
+
+        return (
+            select(*entities, score)
+            .join(tsq, true())
             .where(self.model.is_active)
             .where(
-                self.model.search_vector.op("@@")(
-                    func.plainto_tsquery("english", query)
+                or_(
+                    self.model.search_vector.op("@@")(tsq.c.tsq),
+                    self.model.name.ilike(pattern),
+                    self.model.title.ilike(pattern),
+                    self.model.description.ilike(pattern),
+                    self.model.name.op("%")(query),
+                    self.model.title.op("%")(query),
+                    literal(query).op("<%")(self.model.description),
                 )
             )
-            .order_by(
-                func.ts_rank(
-                    self.model.search_vector, func.plainto_tsquery("english", query)
-                ).desc(),
-                self.model.usage_count.desc(),
-            )
+            .order_by(score.desc(), self.model.id)
             .limit(limit)
         )
-        result = await db.execute(fts_stmt)
-        skills = list(result.scalars().all())
-
-        # If no results, fall back to ILIKE pattern matching
-        if not skills:
-            search_pattern = f"%{query}%"
-            ilike_stmt = (
-                select(self.model)
-                .where(self.model.is_active)
-                .where(
-                    or_(
-                        self.model.name.ilike(search_pattern),
-                        self.model.title.ilike(search_pattern),
-                        self.model.description.ilike(search_pattern),
-                    )
+
+    async def hybrid_search(
+        self, db: AsyncSession, query: str, limit: int = 10
+    ) -> List[Tuple[SkillRow, float]]:
+        """
+        Rank skills by embedding similarity blended with the lexical score.
+        Returns (SkillRow, score) pairs: only the columns results show are read.
+
+        Candidates are the top search_scored matches plus the nearest skills in
+        the embedding index. With a sentence-transformers SKILL_ENCODER that
+        lets "get fit" find weight_loss_sustainable with no shared words; the
+        default hashing encoder only adds sub-word overlap (e.g. "runing"
+        finds running). Each candidate scores
+        SEMANTIC_WEIGHT * cosine + (1 - SEMANTIC_WEIGHT) * normalized lexical
+        score; candidates found only by the index need MIN_SIMILARITY.
+        """
+        pool = limit * self.CANDIDATE_FACTOR
+        result = await db.execute(self._search_stmt(query, pool, *SKILL_COLUMNS))
+        lexical = [(SkillRow(*row[:-1]), float(row[-1])) for row in result.all()]
+        nearest = await skill_embedding_index.top_k(query, pool)
+
+        skills = {skill.id: skill for skill, _ in lexical}
+        top_lexical = max((score for _, score in lexical), default=0.0) or 1.0
+        lexical_scores = {skill.id: score / top_lexical for skill, score in lexical}
+        cosine = dict(nearest)
+        cosine.update(
+            await skill_embedding_index.similarities(
+                query, [id for id in skills if id not in cosine]
+            )
+        )
+
+        semantic_only = [
+            id for id, sim in nearest if id not in skills and sim >= self.MIN_SIMILARITY
+        ]
+        if semantic_only:
+            result = await db.execute(
+                select(*SKILL_COLUMNS).where(
+                    self.model.id.in_(semantic_only), self.model.is_active
                 )
-                .order_by(self.model.usage_count.desc())
-                .limit(limit)
             )
-            result = await db.execute(ilike_stmt)
-            skills = list(result.scalars().all())
+            skills.update((row.id, SkillRow(*row)) for row in result.all())
 
-        return skills
+        scored = [
+            (
+                skill,
+                self.SEMANTIC_WEIGHT * cosine.get(id, 0.0)
+                + (1 - self.SEMANTIC_WEIGHT) * lexical_scores.get(id, 0.0),
+            )
+            for id, skill in skills.items()
+        ]
+        scored.sort(key=lambda pair: (-pair[1], pair[0].id))
+        return scored[:limit]
+
+    async def increment_usage(self, db: AsyncSession, counts: Dict[int, int]) -> None:
+        """
+        Add counts to usage_count server-side, for any number of skills in one
+        UPDATE ... FROM (VALUES ...). Concurrent increments never lose each
+        other, and updated_at is kept: usage is not an edit of the skill.
+        """
+        if not counts:
+            return
+        deltas = values(
+            column("id", Integer), column("n", Integer), name="deltas"
+        ).data(sorted(counts.items()))
+        table = self.model.__table__
+        await db.execute(
+            update(table)
+            .where(table.c.id == deltas.c.id)
+            .values(
+                usage_count=table.c.usage_count + deltas.c.n,
+                updated_at=table.c.updated_at,
+            )
+        )
+        await self._commit(db)
+
+    async def find_duplicate(
+        self,
+        db: AsyncSession,
+        name: str,
+        title: str,
+        prompt_minhash: List[int],
+        prompt_lsh: List[int],
+    ) -> Optional[Skill]:
+        """
+        Find an active skill that a new skill would duplicate, if any.
+
+        Candidates share an LSH band with the new prompt's MinHash or have a
+        trigram-similar name/title (both index-served). A candidate is a
+        duplicate when its estimated prompt Jaccard reaches DUPLICATE_JACCARD
+        or its name/title similarity reaches DUPLICATE_NAME_SIMILARITY; the
+        closest one is returned.
+        """
+        name_similarity = func.greatest(
+            func.similarity(self.model.name, name),
+            func.similarity(self.model.title, title),
+        ).label("name_similarity")
+        stmt = (
+            select(self.model, name_similarity)
+            .where(self.model.is_active)
+            .where(
+                or_(
+                    self.model.prompt_lsh.overlap(
+                        literal(prompt_lsh, self.model.prompt_lsh.type)
+                    ),
+                    self.model.name.op("%")(name),
+                    self.model.title.op("%")(title),
+                )
+            )
+            .order_by(name_similarity.desc(), self.model.id)
+            .limit(self.DUPLICATE_CANDIDATES)
+        )
+        result = await db.execute(stmt)
+
+        best, best_score = None, 0.0
+        for skill, similarity in result.all():
+            jaccard = estimate_jaccard(skill.prompt_minhash or [], prompt_minhash)
+            if (
+                jaccard >= self.DUPLICATE_JACCARD
+                or similarity >= self.DUPLICATE_NAME_SIMILARITY
+            ):
+                score = max(jaccard, similarity)
+                if score > best_score:
+                    best, best_score = skill, score
+        return best
+
+
+class GoalEventCRUD(BaseCRUD[GoalEvent]):
+    """Append-only operations for the goal event log"""
+
+    async def append(
+        self,
+        db: AsyncSession,
+        goal_id: int,
+        user_id: int,
+        event_type: str,
+        payload: Dict[str, Any],
+    ) -> Optional[Any]:
+        """
+        Append an event with a single INSERT ... SELECT.
+
+        The SELECT only yields a row when the goal belongs to the user, so the
+        ownership check and the write happen in one statement. Returns the
+        inserted (id, ts) row, or None if the goal is missing or not owned.
+        """
+        source = select(
+            Goal.id,
+            literal(datetime.utcnow(), DateTime),
+            literal(event_type, String),
+            literal(payload, JSONB),
+        ).where(Goal.id == goal_id, Goal.user_id == user_id)
+        stmt = (
+            insert(self.model)
+            .from_select(["goal_id", "ts", "type", "payload"], source)
+            .returning(self.model.id, self.model.ts)
+        )
+        result = await db.execute(stmt)
+        await self._commit(db)
+        return result.first()
+
+    async def get_events(
+        self,
+        db: AsyncSession,
+        goal_id: int,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        before_id: Optional[int] = None,
+        limit: int = 50,
+    ) -> List[GoalEvent]:
+        """
+        Get a page of events for a goal, newest first.
+
+        since/until bound the time window (until is exclusive). Pass the id of
+        the last event of the previous page as before_id to get the next page;
+        paging seeks on (ts, id) so it stays on the (goal_id, ts) index.
+        """
+        query = (
+            select(self.model)
+            .where(self.model.goal_id == goal_id)
+            .order_by(self.model.ts.desc(), self.model.id.desc())
+            .limit(limit)
+        )
+        if since is not None:
+            query = query.where(self.model.ts >= since)
+        if until is not None:
+            query = query.where(self.model.ts < until)
+        if before_id is not None:
+            anchor_ts = (
+                select(self.model.ts)
+                .where(self.model.id == before_id)
+                .scalar_subquery()
+            )
+            query = query.where(
+                tuple_(self.model.ts, self.model.id) < tuple_(anchor_ts, before_id)
+            )
+        result = await db.execute(query)
+        return list(result.scalars().all())
+
+    async def get_recent_by_goals(
+        self, db: AsyncSession, goal_ids: List[int], per_goal: int = 10
+    ) -> Dict[int, List[GoalEvent]]:
+        """Get the latest events for several goals in one query, oldest first per goal"""
+        if not goal_ids:
+            return {}
+        rank = (
+            func.row_number()
+            .over(
+                partition_by=self.model.goal_id,
+                order_by=(self.model.ts.desc(), self.model.id.desc()),
+            )
+            .label("rank")
+        )
+        ranked = (
+            select(self.model.id, rank)
+            .where(self.model.goal_id.in_(goal_ids))
+            .subquery()
+        )
+        query = (
+            select(self.model)
+            .join(ranked, ranked.c.id == self.model.id)
+            .where(ranked.c.rank <= per_goal)
+            .order_by(self.model.goal_id, self.model.ts, self.model.id)
+        )
+        result = await db.execute(query)
+        events: Dict[int, List[GoalEvent]] = {}
+        for event in result.scalars().all():
+            events.setdefault(event.goal_id, []).append(event)
+        return events
 
 
 class MessageCRUD(BaseCRUD[Message]):
     """Extended CRUD operations for Messages"""
 
     async def get_by_user(
-        self, db: AsyncSession, user_id: int, limit: int = 100
+        self,
+        db: AsyncSession,
+        user_id: int,
+        limit: int = 100,
+        goal_id: Optional[int] = None,
     ) -> List[Message]:
-        """Get messages for a specific user"""
+        """Get a user's most recent messages (optionally for one goal), newest
+        first; served by the (user_id | goal_id, created_at, id) indexes"""
+        result = await db.execute(self._recent(user_id, limit, goal_id, self.model))
+        return list(result.scalars().all())
+
+    async def get_recent_rows(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        limit: int = 100,
+        goal_id: Optional[int] = None,
+    ) -> List[MessageRow]:
+        """get_by_user as MessageRow read models (selects only their columns)"""
+        result = await db.execute(self._recent(user_id, limit, goal_id, *MESSAGE_COLUMNS))
+        return [MessageRow(*row) for row in result.all()]
+
+    def _recent(
+        self, user_id: int, limit: int, goal_id: Optional[int], *entities: Any
+    ) -> Any:
         query = (
-            select(self.model)
+            select(*entities)
             .where(self.model.user_id == user_id)
-            .order_by(self.model.created_at.desc())
+            .order_by(self.model.created_at.desc(), self.model.id.desc())
             .limit(limit)
         )
-        result = await db.execute(query)
-        return list(result.scalars().all())
+        if goal_id is not None:
+            query = query.where(self.model.goal_id == goal_id)
+        return query
 
 
 class UserCRUD(BaseCRUD[User]):
@@ -220,17 +713,8 @@ class MessageService:
     async def get_recent_messages(
         self, user_id: int, limit: int = 20, goal_id: Optional[int] = None
     ) -> List[Message]:
-        """Get recent messages for a user"""
-        query = (
-            select(Message)
-            .where(Message.user_id == user_id)
-            .order_by(Message.created_at.desc())
-            .limit(limit)
-        )
-        if goal_id:
-            query = query.where(Message.goal_id == goal_id)
-        result = await self.db.execute(query)
-        return list(result.scalars().all())
+        """Get recent messages for a user, newest first"""
+        return await self.crud.get_by_user(self.db, user_id, limit=limit, goal_id=goal_id)
 
 
 class ScheduledMessageService:
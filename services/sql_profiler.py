@@ -0,0 +1,332 @@
+"""
+Opt-in SQL profiler: statistics per statement shape and per call site, and an
+N+1 detector per agent run or job.
+
+Enable with SQL_PROFILE=1. Every statement on the shared engine is then
+normalized to its shape (literals, IN lists and VALUES rows collapsed) and
+attributed to the application code that issued it. The report lists count,
+total and p95 time and rows per shape and per call site; it is logged (and
+written to SQL_PROFILE_REPORT, if set) at shutdown, on SIGUSR1, or whenever
+report() is called.
+
+Within a query_scope() (opened by trace_run for agent runs and by worker
+jobs) the detector warns once when the same shape runs more than
+SQL_PROFILE_N1_THRESHOLD times: the usual sign of a lazy load or a per-row
+lookup in a loop.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import signal
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+SQL_PROFILE = os.getenv("SQL_PROFILE", "0") == "1"
+SQL_PROFILE_N1_THRESHOLD = int(os.getenv("SQL_PROFILE_N1_THRESHOLD", "10"))
+SQL_PROFILE_REPORT = os.getenv("SQL_PROFILE_REPORT", "")
+
+# Durations kept per shape / call site for the p95 (most recent)
+SAMPLES = 2048
+# Application frames shown per call site (innermost first)
+CALLSITE_DEPTH = 2
+
+_ROOT = str(Path(__file__).resolve().parent.parent) + os.sep
+_THIS_FILE = str(Path(__file__).resolve())
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"\$\d+|%\(\w+\)s")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)", re.IGNORECASE)
+_VALUES = re.compile(r"\bVALUES\s*\([^()]*\)(?:\s*,\s*\([^()]*\))+", re.IGNORECASE)
+_CAST = re.compile(r"::\w+(?:\(\d+(?:,\s*\d+)?\))?(?:\[\])*")
+
+
+def normalize(statement: str) -> str:
+    """Statement shape: parameters and literals as ?, lists collapsed.
+
+    'SELECT * FROM goals WHERE id IN ($1::INTEGER, $2::INTEGER)'
+    -> 'SELECT * FROM goals WHERE id IN (?)'
+    """
+    shape = " ".join(statement.split())
+    shape = _STRING.sub("?", shape)
+    shape = _CAST.sub("", shape)
+    shape = _PARAM.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _IN_LIST.sub("IN (?)", shape)
+    shape = _VALUES.sub("VALUES (?)", shape)
+    return shape
+
+
+def _app_frames(frame) -> List[str]:
+    frames = []
+    while frame is not None and len(frames) < CALLSITE_DEPTH:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(_ROOT)
+            and filename != _THIS_FILE
+            and "site-packages" not in filename
+        ):
+            frames.append(
+                f"{filename[len(_ROOT):]}:{frame.f_lineno} {frame.f_code.co_name}"
+            )
+        frame = frame.f_back
+    return frames
+
+
+def callsite() -> str:
+    """The application code that issued the current statement.
+
+    Under the asyncio extension the cursor runs in a greenlet whose stack
+    stops at SQLAlchemy internals; the awaiting coroutine's frames are found
+    through the parent greenlet.
+    """
+    frames = _app_frames(sys._getframe(1))
+    if not frames:
+        try:
+            import greenlet
+
+            parent = greenlet.getcurrent().parent
+            if parent is not None:
+                frames = _app_frames(parent.gr_frame)
+        except ImportError:
+            pass
+    return " <- ".join(frames) or "<unknown>"
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    total_ms: float = 0.0
+    rows: int = 0
+    samples: Deque[float] = field(default_factory=lambda: deque(maxlen=SAMPLES))
+
+    def add(self, ms: float, rows: Optional[int]) -> None:
+        self.count += 1
+        self.total_ms += ms
+        self.rows += rows or 0
+        self.samples.append(ms)
+
+    @property
+    def p95_ms(self) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 2),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p95_ms": round(self.p95_ms, 3),
+            "rows": self.rows,
+        }
+
+
+@dataclass
+class _Scope:
+    name: str
+    shapes: Counter = field(default_factory=Counter)
+    warned: set = field(default_factory=set)
+
+
+_scope: ContextVar[Optional[_Scope]] = ContextVar("sql_profile_scope", default=None)
+
+
+@contextmanager
+def query_scope(name: str) -> Iterator[None]:
+    """Count statement shapes for the N+1 detector within the block."""
+    token = _scope.set(_Scope(name))
+    try:
+        yield
+    finally:
+        try:
+            _scope.reset(token)
+        except ValueError:
+            # Closed from another context; nothing to restore
+            pass
+
+
+class SQLProfiler:
+    """Aggregates statement timings from the engines' cursor events."""
+
+    def __init__(self, n1_threshold: int = SQL_PROFILE_N1_THRESHOLD):
+        self.n1_threshold = n1_threshold
+        self.by_shape: Dict[str, QueryStats] = {}
+        self.by_callsite: Dict[Tuple[str, str], QueryStats] = {}
+        self.n1_warnings: Counter = Counter()
+        self._engines: List[Engine] = []
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._engines)
+
+    def attach(self, *engines: Engine) -> None:
+        """Start profiling statements on engines (sync Engines)."""
+        if self._engines:
+            return
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self._before)
+            event.listen(engine, "after_cursor_execute", self._after)
+            event.listen(engine, "handle_error", self._error)
+        self._engines = list(engines)
+        logger.info(f"SQL profiler attached (N+1 threshold {self.n1_threshold})")
+
+    def detach(self) -> None:
+        for engine in self._engines:
+            event.remove(engine, "before_cursor_execute", self._before)
+            event.remove(engine, "after_cursor_execute", self._after)
+            event.remove(engine, "handle_error", self._error)
+        self._engines = []
+
+    def reset(self) -> None:
+        with self._lock:
+            self.by_shape.clear()
+            self.by_callsite.clear()
+            self.n1_warnings.clear()
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("sql_profile_start", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("sql_profile_start")
+        if not starts:
+            return
+        ms = (time.perf_counter() - starts.pop()) * 1000
+        shape = normalize(statement)
+        site = callsite()
+        rows = self._rows(cursor)
+        with self._lock:
+            self.by_shape.setdefault(shape, QueryStats()).add(ms, rows)
+            self.by_callsite.setdefault((shape, site), QueryStats()).add(ms, rows)
+        self._check_n1(shape, site)
+
+    def _error(self, exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("sql_profile_start"):
+            conn.info["sql_profile_start"].pop()
+
+    @staticmethod
+    def _rows(cursor) -> Optional[int]:
+        """Rows returned (buffered SELECT) or affected (DML); None if unknown."""
+        if cursor.description is not None:
+            buffered = getattr(cursor, "_rows", None)
+            return len(buffered) if buffered is not None else None
+        return cursor.rowcount if cursor.rowcount >= 0 else None
+
+    def _check_n1(self, shape: str, site: str) -> None:
+        scope = _scope.get()
+        if scope is None:
+            return
+        scope.shapes[shape] += 1
+        if scope.shapes[shape] > self.n1_threshold and shape not in scope.warned:
+            scope.warned.add(shape)
+            self.n1_warnings[shape] += 1
+            logger.warning(
+                f"Possible N+1 in {scope.name}: statement ran more than "
+                f"{self.n1_threshold} times, last from {site}: {shape[:300]}"
+            )
+
+    def to_dict(self, limit: int = 20) -> Dict[str, Any]:
+        with self._lock:
+            shapes = sorted(self.by_shape.items(), key=lambda i: -i[1].total_ms)
+            sites = sorted(self.by_callsite.items(), key=lambda i: -i[1].total_ms)
+            n1 = dict(self.n1_warnings)
+        return {
+            "statements": sum(s.count for _, s in shapes),
+            "total_ms": round(sum(s.total_ms for _, s in shapes), 2),
+            "by_statement": [
+                {"statement": shape, **stats.to_dict()} for shape, stats in shapes[:limit]
+            ],
+            "by_callsite": [
+                {"callsite": site, "statement": shape, **stats.to_dict()}
+                for (shape, site), stats in sites[:limit]
+            ],
+            "n1_warnings": [
+                {"statement": shape, "scopes": count} for shape, count in n1.items()
+            ],
+        }
+
+    def report(self, limit: int = 20) -> str:
+        """Human-readable report: top statements and call sites by total time."""
+        data = self.to_dict(limit)
+        lines = [
+            "=" * 80,
+            f"SQL PROFILE: {data['statements']} statements, {data['total_ms']:.0f}ms total",
+            "=" * 80,
+            f"{'count':>7} {'total ms':>10} {'p95 ms':>8} {'rows':>8}  statement",
+        ]
+        for item in data["by_statement"]:
+            lines.append(
+                f"{item['count']:>7} {item['total_ms']:>10.1f} {item['p95_ms']:>8.2f} "
+                f"{item['rows']:>8}  {item['statement'][:120]}"
+            )
+        lines += ["-" * 80, f"{'count':>7} {'total ms':>10} {'p95 ms':>8} {'rows':>8}  call site"]
+        for item in data["by_callsite"]:
+            lines.append(
+                f"{item['count']:>7} {item['total_ms']:>10.1f} {item['p95_ms']:>8.2f} "
+                f"{item['rows']:>8}  {item['callsite']}"
+            )
+            lines.append(f"{'':>38}  {item['statement'][:100]}")
+        if data["n1_warnings"]:
+            lines += ["-" * 80, "Possible N+1 (statement, scopes where it exceeded the threshold):"]
+            for item in data["n1_warnings"]:
+                lines.append(f"{item['scopes']:>7}  {item['statement'][:120]}")
+        return "\n".join(lines)
+
+    def dump(self, path: str = SQL_PROFILE_REPORT) -> None:
+        """Log the report and, if path is set, write it as JSON."""
+        if not self.enabled:
+            return
+        logger.info("\n" + self.report())
+        if path:
+            Path(path).write_text(json.dumps(self.to_dict(limit=200), indent=2))
+            logger.info(f"SQL profile written to {path}")
+
+
+sql_profiler = SQLProfiler()
+
+
+def start() -> None:
+    """Attach the profiler to the shared engines when SQL_PROFILE=1, with a
+    SIGUSR1 handler to dump the report on demand."""
+    if not SQL_PROFILE:
+        return
+    from database import engine, replica_engines
+
+    sql_profiler.attach(*(e.sync_engine for e in (engine, *replica_engines)))
+    if not hasattr(signal, "SIGUSR1"):
+        return
+    # Dump from the event loop rather than in a signal handler, which would
+    # interrupt the main thread anywhere, e.g. in _after holding the
+    # (non-reentrant) stats lock
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, sql_profiler.dump)
+    except (RuntimeError, ValueError) as e:
+        logger.warning(f"SQL profiler: no SIGUSR1 dump ({e})")
+
+
+def stop() -> None:
+    """Dump the report (if profiling) and detach."""
+    if sql_profiler.enabled:
+        if hasattr(signal, "SIGUSR1"):
+            try:
+                asyncio.get_running_loop().remove_signal_handler(signal.SIGUSR1)
+            except RuntimeError:
+                pass
+        sql_profiler.dump()
+        sql_profiler.detach()
@@ -0,0 +1,111 @@
+"""Exa web search with a pooled HTTP client, result cache and trimmed results."""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from services.cache import CACHE_REDIS_URL, DiskCache, QueryCache, content_key
+from services.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+EXA_BASE_URL = os.getenv("EXA_BASE_URL", "https://api.exa.ai")
+WEB_SEARCH_CACHE_TTL = float(os.getenv("WEB_SEARCH_CACHE_TTL", "86400"))
+WEB_SEARCH_CACHE_DIR = os.getenv("WEB_SEARCH_CACHE_DIR", ".cache/web_search")
+
+# Text fetched per result upstream. Results are cached at this size and
+# trimmed per call, so asking for a longer snippet is served from cache.
+FETCH_CHARACTERS = 10000
+
+
+def trim_results(response: Dict[str, Any], snippet_chars: int) -> List[Dict[str, Any]]:
+    """Title, url, date and a snippet of at most snippet_chars per result."""
+    trimmed = []
+    for result in response.get("results", []):
+        text = " ".join((result.get("text") or "").split())
+        if len(text) > snippet_chars:
+            cut = text.rfind(" ", 0, snippet_chars)
+            text = text[: cut if cut > snippet_chars // 2 else snippet_chars] + "…"
+        item = {"title": result.get("title"), "url": result.get("url")}
+        if result.get("publishedDate"):
+            item["published_date"] = result["publishedDate"]
+        item["snippet"] = text
+        trimmed.append(item)
+    return trimmed
+
+
+class ExaSearchClient:
+    """
+    Exa /search client shared by all agent runs in a process.
+
+    One httpx.AsyncClient keeps connections (and TLS sessions) to Exa open
+    across calls. Responses are cached by a content address of the request
+    (query + parameters) for WEB_SEARCH_CACHE_TTL seconds: in Redis when
+    CACHE_REDIS_URL is set, else on local disk under WEB_SEARCH_CACHE_DIR.
+    Point EXA_BASE_URL at a stub server (benchmarks/fakes/exa.py) to run
+    without the real API.
+    """
+
+    def __init__(self, base_url: str = EXA_BASE_URL, cache: Optional[Any] = None):
+        self.base_url = base_url.rstrip("/")
+        if cache is None:
+            cache = (
+                QueryCache("web_search", ttl=WEB_SEARCH_CACHE_TTL, maxsize=256)
+                if CACHE_REDIS_URL
+                else DiskCache(WEB_SEARCH_CACHE_DIR, ttl=WEB_SEARCH_CACHE_TTL)
+            )
+        self.cache = cache
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _http(self) -> httpx.AsyncClient:
+        """The pooled client, recreated if used from a new event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(30.0, connect=5.0),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+            self._loop = loop
+        return self._client
+
+    async def search(
+        self, query: str, num_results: int = 5, search_type: str = "auto"
+    ) -> Dict[str, Any]:
+        """Raw Exa response for a search, from cache when possible."""
+        api_key = os.getenv("EXA_API_KEY")
+        if not api_key:
+            raise ValueError("EXA_API_KEY not found in environment variables")
+
+        payload = {
+            "query": query,
+            "type": search_type,
+            "num_results": num_results,
+            "contents": {"text": {"max_characters": FETCH_CHARACTERS}},
+        }
+        key = content_key(payload)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = await self._http().post(
+            "/search",
+            headers={"x-api-key": api_key, "Content-Type": "application/json"},
+            content=dumps(payload),
+        )
+        response.raise_for_status()
+        result = loads(response.content)
+        await self.cache.set(key, result)
+        return result
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+exa_client = ExaSearchClient()
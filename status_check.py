@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-"""Quick status check for Streamlit app setup."""
+"""Quick status check for the app setup and running services."""
 
 import sys
 import os
@@ -12,16 +12,16 @@ def check_status():
     
     # Check files exist
     files_to_check = [
+        ".env",
+        "app_telegram.py",
+        "worker.py",
         "app_streamlit.py",
         "run_streamlit.sh",
-        "STREAMLIT_README.md",
-        "test_prompts.py",
-        "check_user.py",
-        "IMPLEMENTATION_SUMMARY.md",
+        "tests/test_agents.py",
     ]
     
     print("=" * 70)
-    print("🪶 PARTH AI STREAMLIT - STATUS CHECK")
+    print("🪶 PARTH AI - STATUS CHECK")
     print("=" * 70)
     print()
     
@@ -117,6 +117,22 @@ def check_status():
         print("   → Open: http://localhost:8501")
     else:
         print("   → Start with: ./run_streamlit.sh")
+
+    # Bot and worker serve Prometheus metrics while running
+    import urllib.request
+    for name, env, default in (
+        ("Telegram bot", "METRICS_PORT", "9100"),
+        ("Worker", "WORKER_METRICS_PORT", "9101"),
+    ):
+        port = os.getenv(env, default)
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/metrics", timeout=2) as resp:
+                running = resp.status == 200
+        except OSError:
+            running = False
+        print(f"{'✅' if running else '⚠️ '} {name} {'running' if running else 'not running'} (metrics :{port})")
+        if running:
+            print(f"   → Metrics: http://localhost:{port}/metrics")
     print()
     
     # Summary
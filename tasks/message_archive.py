@@ -0,0 +1,264 @@
+"""
+Daily job: keep the messages table's monthly partitions ahead of time and
+retire cold ones.
+
+messages is range-partitioned by month on created_at (messages_yYYYYmMM,
+plus messages_default for rows no partition covers). Each run:
+
+- creates partitions through MESSAGE_PARTITIONS_AHEAD months from now,
+  and for any month that has rows in messages_default (moving them in)
+- with retention enabled, archives partitions older than
+  MESSAGE_HOT_MONTHS: totals per user go to message_summaries, the rows to
+  a gzipped CSV in MESSAGE_ARCHIVE_DIR, then the partition is detached and
+  dropped
+
+Retention is off unless MESSAGE_HOT_MONTHS is set, and nothing is dropped
+without MESSAGE_ARCHIVE_DIR: the export is the only copy of the messages
+left, so the directory must be durable storage (a mounted volume or
+network share that outlives the worker's container), not its local disk.
+
+Reads only need the recent tail (history, get_recent_messages, proactive
+context), and a recency query probes each partition's index once, so
+retention keeps those queries, the indexes and autovacuum work bounded
+however long the history grows. Dropping a partition leaves no dead rows
+behind, unlike a DELETE of old messages.
+
+Usage:
+    python -m tasks.message_archive [--dry-run]
+"""
+
+import asyncio
+import gzip
+import logging
+import os
+import re
+import sys
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from database import AsyncSessionLocal
+from services import sql_profiler
+
+logger = logging.getLogger(__name__)
+
+# Months kept in the database, not counting the current one (unset: keep
+# every month)
+MESSAGE_HOT_MONTHS = (
+    int(os.environ["MESSAGE_HOT_MONTHS"]) if os.getenv("MESSAGE_HOT_MONTHS") else None
+)
+MESSAGE_PARTITIONS_AHEAD = int(os.getenv("MESSAGE_PARTITIONS_AHEAD", "3"))
+# Durable storage for archived months; required for retention
+MESSAGE_ARCHIVE_DIR = os.getenv("MESSAGE_ARCHIVE_DIR") or None
+# DETACH locks the messages table; give up rather than queue behind long
+# queries (and block everything queued behind it). The next run retries
+ARCHIVE_LOCK_TIMEOUT = "5s"
+
+PARTITION_NAME = re.compile(r"^messages_y(\d{4})m(\d{2})$")
+
+LIST_PARTITIONS = """
+    SELECT c.relname FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'messages'::regclass
+"""
+
+SUMMARIZE = """
+    INSERT INTO message_summaries (
+        user_id, month, message_count, user_messages, assistant_messages,
+        goal_ids, first_at, last_at, created_at, updated_at
+    )
+    SELECT user_id, :month, count(*),
+           count(*) FILTER (WHERE role = 'user'),
+           count(*) FILTER (WHERE role = 'assistant'),
+           array_agg(DISTINCT goal_id) FILTER (WHERE goal_id IS NOT NULL),
+           min(created_at), max(created_at), :now, :now
+    FROM {partition}
+    GROUP BY user_id
+    -- A month archived again (late rows recreated its partition) adds up
+    ON CONFLICT (user_id, month) DO UPDATE SET
+        message_count = message_summaries.message_count + EXCLUDED.message_count,
+        user_messages = message_summaries.user_messages + EXCLUDED.user_messages,
+        assistant_messages =
+            message_summaries.assistant_messages + EXCLUDED.assistant_messages,
+        goal_ids = ARRAY(
+            SELECT DISTINCT unnest(message_summaries.goal_ids || EXCLUDED.goal_ids)
+        ),
+        first_at = least(message_summaries.first_at, EXCLUDED.first_at),
+        last_at = greatest(message_summaries.last_at, EXCLUDED.last_at),
+        updated_at = EXCLUDED.updated_at
+"""
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _this_month() -> date:
+    return datetime.utcnow().date().replace(day=1)
+
+
+async def ensure_partitions(db, months_ahead: int = MESSAGE_PARTITIONS_AHEAD) -> int:
+    """Create monthly partitions up to months_ahead; returns how many were created."""
+    this_month = _this_month()
+    ranges = [(this_month, _add_months(this_month, months_ahead))]
+    # Months with rows that fell through to the default partition (written
+    # before their month was created) get a partition too
+    stray = await db.execute(
+        text("SELECT DISTINCT date_trunc('month', created_at)::date FROM messages_default")
+    )
+    ranges += [(month, month) for (month,) in stray.all()]
+    created = 0
+    for from_month, to_month in ranges:
+        created += (
+            await db.execute(
+                text("SELECT ensure_message_partitions(:from_month, :to_month)"),
+                {"from_month": from_month, "to_month": to_month},
+            )
+        ).scalar_one()
+    await db.commit()
+    return created
+
+
+async def cold_partitions(db, hot_months: int) -> List[Tuple[str, date]]:
+    """Monthly partitions older than the hot window, oldest first."""
+    cutoff = _add_months(_this_month(), -hot_months)
+    partitions = []
+    for (name,) in (await db.execute(text(LIST_PARTITIONS))).all():
+        match = PARTITION_NAME.match(name)
+        if match:
+            month = date(int(match.group(1)), int(match.group(2)), 1)
+            if month < cutoff:
+                partitions.append((name, month))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def _archive_path(directory: Path, partition: str) -> Path:
+    path = directory / f"{partition}.csv.gz"
+    n = 1
+    while path.exists():
+        path = directory / f"{partition}.{n}.csv.gz"
+        n += 1
+    return path
+
+
+async def _export(db, partition: str, directory: Path) -> Path:
+    """COPY the partition to a gzipped CSV; returns the temporary file."""
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp = directory / f"{partition}.csv.gz.tmp"
+    raw = await (await db.connection()).get_raw_connection()
+    with gzip.open(tmp, "wb") as out:
+
+        async def write(chunk: bytes) -> None:
+            out.write(chunk)
+
+        await raw.driver_connection.copy_from_table(
+            partition, output=write, format="csv", header=True
+        )
+    return tmp
+
+
+async def archive_partition(
+    db, partition: str, month: date, archive_dir: str
+) -> Dict[str, Any]:
+    """Summarize, export and drop one monthly partition (one transaction)."""
+    if not archive_dir:
+        raise ValueError(f"No archive directory - refusing to drop {partition}")
+    tmp = None
+    try:
+        await db.execute(text(f"SET LOCAL lock_timeout = '{ARCHIVE_LOCK_TIMEOUT}'"))
+        await db.execute(text("SET LOCAL statement_timeout = 0"))
+        # Writes to the partition wait until it is gone; reads carry on
+        await db.execute(text(f"LOCK TABLE {partition} IN SHARE MODE"))
+        rows = (await db.execute(text(f"SELECT count(*) FROM {partition}"))).scalar_one()
+        users = (
+            await db.execute(
+                text(SUMMARIZE.format(partition=partition)),
+                {"month": month, "now": datetime.utcnow()},
+            )
+        ).rowcount
+        if rows:
+            tmp = await _export(db, partition, Path(archive_dir))
+        await db.execute(text(f"ALTER TABLE messages DETACH PARTITION {partition}"))
+        await db.execute(text(f"DROP TABLE {partition}"))
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        if tmp is not None:
+            tmp.unlink(missing_ok=True)
+        raise
+
+    path = None
+    if tmp is not None:
+        path = _archive_path(tmp.parent, partition)
+        tmp.rename(path)
+    logger.info(
+        f"Archived {partition}: {rows} messages, {users} user summaries"
+        + (f", exported to {path}" if path else "")
+    )
+    return {
+        "partition": partition,
+        "messages": rows,
+        "users": users,
+        "file": str(path) if path else None,
+    }
+
+
+async def archive_messages(ctx: Optional[dict] = None, dry_run: bool = False) -> Dict[str, Any]:
+    """Cron: create upcoming message partitions and archive cold ones."""
+    retention = MESSAGE_HOT_MONTHS is not None
+    if retention and not MESSAGE_ARCHIVE_DIR:
+        logger.error(
+            "MESSAGE_HOT_MONTHS is set but MESSAGE_ARCHIVE_DIR is not - "
+            "not dropping any message partitions"
+        )
+        retention = False
+    with sql_profiler.query_scope("archive_messages"):
+        async with AsyncSessionLocal() as db:
+            created = 0 if dry_run else await ensure_partitions(db)
+            archived = []
+            cold = await cold_partitions(db, MESSAGE_HOT_MONTHS) if retention else []
+            for partition, month in cold:
+                if dry_run:
+                    archived.append({"partition": partition})
+                    continue
+                archived.append(
+                    await archive_partition(db, partition, month, MESSAGE_ARCHIVE_DIR)
+                )
+    logger.info(
+        f"Message partitions: {created} created, {len(archived)} archived"
+        + (" (dry run)" if dry_run else "")
+    )
+    return {"partitions_created": created, "archived": archived}
+
+
+async def main():
+    dry_run = "--dry-run" in sys.argv[1:]
+    report = await archive_messages(dry_run=dry_run)
+
+    print("=" * 70)
+    print(
+        f"{report['partitions_created']} partitions created, "
+        f"{len(report['archived'])} {'to archive' if dry_run else 'archived'} "
+        + (
+            f"(hot window {MESSAGE_HOT_MONTHS} months)"
+            if MESSAGE_HOT_MONTHS is not None and MESSAGE_ARCHIVE_DIR
+            else "(retention off)"
+        )
+    )
+    print("=" * 70)
+    for item in report["archived"]:
+        if dry_run:
+            print(f"  {item['partition']}")
+        else:
+            print(
+                f"  {item['partition']:<20} {item['messages']:>10,} messages "
+                f"{item['users']:>8,} users  {item['file'] or '-'}"
+            )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
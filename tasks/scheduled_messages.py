@@ -9,6 +9,7 @@ from database import AsyncSessionLocal
 from models.models import User
 from services.services import ScheduledMessageService
 from ai.reactive_agent import ReactiveAgent
+from services.sql_profiler import query_scope
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,11 @@ async def execute_scheduled_messages(ctx):
     """
     logger.info("🕐 Checking for scheduled messages to send")
 
+    with query_scope("execute_scheduled_messages"):
+        return await _execute_due_messages()
+
+
+async def _execute_due_messages():
     async with AsyncSessionLocal() as db:
         try:
             # Get scheduled messages that are due
@@ -0,0 +1,205 @@
+"""
+Offline job: find clusters of near-duplicate skills and propose merges.
+
+Skills without a prompt fingerprint (created before create-time dedup) are
+fingerprinted first. Candidate pairs come from shared LSH bands and from
+trigram-similar names/titles, and are kept when they pass the same
+thresholds create_skill uses (SkillCRUD.DUPLICATE_*). Pairs are grouped
+into clusters, each with a proposed canonical skill to keep: system skills
+first, then the most used. Nothing is merged; the report is for review.
+
+Usage:
+    python -m tasks.skill_dedup [report.json]
+"""
+
+import asyncio
+import json
+import logging
+import sys
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import bindparam, select, text, update
+
+from database import AsyncSessionLocal
+from models.models import Skill, SkillCreatedBy
+from services.dedup import estimate_jaccard, prompt_fingerprint
+from services.services import SkillCRUD
+
+BACKFILL_BATCH = 500
+
+NAME_PAIRS = """
+    SELECT a.id, b.id,
+           greatest(similarity(a.name, b.name), similarity(a.title, b.title))
+    FROM skills a
+    JOIN skills b ON b.id > a.id AND (a.name % b.name OR a.title % b.title)
+    WHERE a.is_active AND b.is_active
+"""
+
+
+async def backfill_fingerprints(db) -> int:
+    """Fingerprint skills that have no prompt MinHash yet; returns the count."""
+    table = Skill.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("skill_id"))
+        # Keep updated_at so backfills don't look like skill edits
+        .values(
+            prompt_minhash=bindparam("minhash"),
+            prompt_lsh=bindparam("lsh"),
+            updated_at=table.c.updated_at,
+        )
+    )
+    total = 0
+    while True:
+        result = await db.execute(
+            select(Skill.id, Skill.skill_prompt)
+            .where(Skill.prompt_minhash.is_(None))
+            .order_by(Skill.id)
+            .limit(BACKFILL_BATCH)
+        )
+        rows = result.all()
+        if not rows:
+            return total
+        params = []
+        for skill_id, prompt in rows:
+            minhash, lsh = prompt_fingerprint(prompt)
+            params.append({"skill_id": skill_id, "minhash": minhash, "lsh": lsh})
+        await db.execute(stmt, params)
+        await db.commit()
+        total += len(rows)
+
+
+def _cluster(pairs: List[Dict[str, Any]]) -> List[List[int]]:
+    """Connected components of the duplicate pairs (union-find)."""
+    parent: Dict[int, int] = {}
+
+    def find(x: int) -> int:
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for pair in pairs:
+        parent[find(pair["skill_a"])] = find(pair["skill_b"])
+
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for skill_id in parent:
+        groups[find(skill_id)].append(skill_id)
+    return [sorted(group) for group in groups.values()]
+
+
+async def find_duplicates() -> Dict[str, Any]:
+    """Build the duplicate report (candidate pairs and proposed merges)."""
+    async with AsyncSessionLocal() as db:
+        backfilled = await backfill_fingerprints(db)
+
+        result = await db.execute(
+            select(
+                Skill.id,
+                Skill.name,
+                Skill.created_by_type,
+                Skill.usage_count,
+                Skill.prompt_minhash,
+                Skill.prompt_lsh,
+            ).where(Skill.is_active)
+        )
+        skills = {row.id: row for row in result.all()}
+
+        # LSH: skills sharing any band key are candidates
+        buckets: Dict[int, List[int]] = defaultdict(list)
+        for skill in skills.values():
+            for key in skill.prompt_lsh or []:
+                buckets[key].append(skill.id)
+        candidates: Dict[tuple, float] = {}
+        for ids in buckets.values():
+            for i, a in enumerate(ids):
+                for b in ids[i + 1:]:
+                    candidates.setdefault((min(a, b), max(a, b)), 0.0)
+
+        # Trigram-similar names/titles (served by the pg_trgm indexes)
+        for a, b, similarity in (await db.execute(text(NAME_PAIRS))).all():
+            candidates[(a, b)] = float(similarity)
+
+    pairs = []
+    for (a, b), similarity in candidates.items():
+        jaccard = estimate_jaccard(
+            skills[a].prompt_minhash or [], skills[b].prompt_minhash or []
+        )
+        if (
+            jaccard >= SkillCRUD.DUPLICATE_JACCARD
+            or similarity >= SkillCRUD.DUPLICATE_NAME_SIMILARITY
+        ):
+            pairs.append(
+                {
+                    "skill_a": a,
+                    "skill_b": b,
+                    "name_a": skills[a].name,
+                    "name_b": skills[b].name,
+                    "prompt_jaccard": round(jaccard, 3),
+                    "name_similarity": round(similarity, 3),
+                }
+            )
+    pairs.sort(key=lambda p: -max(p["prompt_jaccard"], p["name_similarity"]))
+
+    merges = []
+    for cluster in _cluster(pairs):
+        keep = min(
+            cluster,
+            key=lambda id: (
+                skills[id].created_by_type != SkillCreatedBy.system,
+                -skills[id].usage_count,
+                id,
+            ),
+        )
+        merges.append(
+            {
+                "keep": {"id": keep, "name": skills[keep].name},
+                "merge": [
+                    {"id": id, "name": skills[id].name} for id in cluster if id != keep
+                ],
+            }
+        )
+
+    return {
+        "generated_at": datetime.utcnow().isoformat(),
+        "skills_scanned": len(skills),
+        "fingerprints_backfilled": backfilled,
+        "candidate_pairs": pairs,
+        "proposed_merges": merges,
+    }
+
+
+async def main():
+    report = await find_duplicates()
+
+    print("=" * 70)
+    print(
+        f"Scanned {report['skills_scanned']} skills "
+        f"({report['fingerprints_backfilled']} fingerprinted)"
+    )
+    print(f"{len(report['candidate_pairs'])} duplicate pairs")
+    print("=" * 70)
+    for pair in report["candidate_pairs"]:
+        print(
+            f"  {pair['skill_a']:>6} {pair['name_a']:<28} "
+            f"{pair['skill_b']:>6} {pair['name_b']:<28} "
+            f"jaccard={pair['prompt_jaccard']:.2f} name={pair['name_similarity']:.2f}"
+        )
+
+    print(f"\n{len(report['proposed_merges'])} proposed merges")
+    for merge in report["proposed_merges"]:
+        others = ", ".join(f"{s['id']} {s['name']}" for s in merge["merge"])
+        print(f"  keep {merge['keep']['id']} {merge['keep']['name']} <- {others}")
+
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {sys.argv[1]}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
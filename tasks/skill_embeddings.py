@@ -0,0 +1,83 @@
+"""
+Offline job: embed skills that have no vector from the current encoder.
+
+Skill writes store an embedding (create_skill / update_skill), so this is
+needed once after adding the embedding columns and again after switching
+SKILL_ENCODER. Until it runs, the search index embeds such skills in memory
+on every process start; searches never write.
+
+Usage:
+    python -m tasks.skill_embeddings
+"""
+
+import asyncio
+import logging
+
+from sqlalchemy import bindparam, or_, select, update
+
+from database import AsyncSessionLocal
+from models.models import Skill
+from services.embeddings import skill_embedding_index, skill_text
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH = 500
+
+
+async def backfill_embeddings(db) -> int:
+    """Embed active skills with a missing or stale embedding; returns the count."""
+    encoder = skill_embedding_index.encoder
+    table = Skill.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("skill_id"))
+        # Keep updated_at so backfills don't look like skill edits
+        .values(
+            embedding=bindparam("vector"),
+            embedding_model=encoder.name,
+            updated_at=table.c.updated_at,
+        )
+    )
+    total = 0
+    last_id = 0
+    while True:
+        result = await db.execute(
+            select(
+                Skill.id, Skill.name, Skill.title, Skill.description, Skill.skill_metadata
+            )
+            .where(
+                Skill.is_active,
+                Skill.id > last_id,
+                or_(
+                    Skill.embedding.is_(None),
+                    Skill.embedding_model.is_distinct_from(encoder.name),
+                ),
+            )
+            .order_by(Skill.id)
+            .limit(BACKFILL_BATCH)
+        )
+        rows = result.all()
+        if not rows:
+            return total
+        vectors = encoder.encode([skill_text(*row[1:]) for row in rows])
+        await db.execute(
+            stmt,
+            [
+                {"skill_id": row.id, "vector": vector.tolist()}
+                for row, vector in zip(rows, vectors)
+            ],
+        )
+        await db.commit()
+        total += len(rows)
+        last_id = rows[-1].id
+
+
+async def main():
+    async with AsyncSessionLocal() as db:
+        total = await backfill_embeddings(db)
+    print(f"Embedded {total} skills with {skill_embedding_index.encoder.name}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -7,8 +7,29 @@ import re
 
 import httpx
 
+from metrics import counter
+
 logger = logging.getLogger(__name__)
 
+# Bot API endpoint; override to use a fake (python -m benchmarks.fakes.telegram)
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+
+TELEGRAM_SENDS = counter(
+    "telegram_sends_total",
+    "Telegram API calls by method and outcome (ok, rate_limited, error)",
+    ("method", "outcome"),
+)
+TELEGRAM_RATE_LIMITED = counter(
+    "telegram_rate_limited_total", "Telegram 429 responses by method", ("method",)
+)
+
+
+def record_send(method: str, outcome: str) -> None:
+    """Count one Telegram API call; outcome is ok, rate_limited or error."""
+    TELEGRAM_SENDS.inc(method=method, outcome=outcome)
+    if outcome == "rate_limited":
+        TELEGRAM_RATE_LIMITED.inc(method=method)
+
 
 def md_to_html(text: str) -> str:
     """Convert AI markdown to Telegram HTML. Shared by app_telegram and send_telegram_message."""
@@ -45,7 +66,7 @@ async def send_telegram_message(
     if len(formatted) > 4096:
         formatted = formatted[:4090] + "..."
 
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
+    url = f"{TELEGRAM_API_URL}/bot{token}/sendMessage"
     payload = {
         "chat_id": chat_id,
         "text": formatted,
@@ -56,7 +77,12 @@ async def send_telegram_message(
         async with httpx.AsyncClient() as client:
             resp = await client.post(url, json=payload, timeout=10.0)
             resp.raise_for_status()
-            return resp.json()
     except httpx.HTTPError as e:
+        rate_limited = (
+            isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 429
+        )
+        record_send("sendMessage", "rate_limited" if rate_limited else "error")
         logger.error(f"Telegram send failed: {e}")
         return None
+    record_send("sendMessage", "ok")
+    return resp.json()
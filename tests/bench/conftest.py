@@ -0,0 +1,299 @@
+"""
+Fixtures for the benchmark suite (pytest-benchmark).
+
+Runs against the database configured in .env, which must be migrated; if
+it is not reachable the database benchmarks are skipped. A bench user with
+goals, goal events, messages, preferences and skills is created for the
+session and deleted afterwards. Benchmarks that write use a unit-of-work
+session (or AgentContext) that is rolled back after every round. Telegram
+and Exa are served by the stubs in benchmarks/fakes.
+
+Runs are stored in tests/bench/.baselines, which is gitignored: timings
+only compare on the machine that recorded them, so each machine (or CI
+runner) keeps its own. Save a baseline with --benchmark-save=NAME (or
+--benchmark-autosave), then compare against the latest saved run with
+--bench-compare=PCT, which fails the session if any benchmark's median is
+more than PCT% slower.
+"""
+
+import asyncio
+import os
+import tempfile
+from contextlib import ExitStack
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Without the plugin every benchmark would fail on the missing fixture; in a
+# conftest this stops the session with the reason instead
+pytest.importorskip(
+    "pytest_benchmark",
+    reason="tests/bench needs pytest-benchmark (dev dependency group: uv sync --group dev)",
+)
+
+BENCH_TELEGRAM_ID = 7_600_000_000
+BASELINES = Path(__file__).parent / ".baselines"
+_DEFAULT_STORAGE = "file://./.benchmarks"
+
+_fakes = ExitStack()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--bench-compare",
+        type=int,
+        metavar="PCT",
+        default=None,
+        help="compare with the latest saved run; fail if any median is more than PCT%% slower",
+    )
+
+
+def pytest_configure(config):
+    from pytest_benchmark.utils import parse_compare_fail
+
+    if config.getoption("benchmark_storage") == _DEFAULT_STORAGE:
+        config.option.benchmark_storage = f"file://{BASELINES}"
+    pct = config.getoption("bench_compare")
+    if pct is not None:
+        config.option.benchmark_compare = True
+        config.option.benchmark_compare_fail = [parse_compare_fail(f"median:{pct}%")]
+
+    # Stubs for external APIs, before the app modules read their URLs at import
+    from benchmarks.fakes import exa as fake_exa
+    from benchmarks.fakes import telegram as fake_telegram
+
+    telegram_url, _ = _fakes.enter_context(fake_telegram.running())
+    exa_url, _ = _fakes.enter_context(fake_exa.running())
+    os.environ.update(
+        TELEGRAM_API_URL=telegram_url,
+        TELEGRAM_BOT_TOKEN="stub",
+        EXA_BASE_URL=exa_url,
+        EXA_API_KEY="stub",
+        WEB_SEARCH_CACHE_DIR=_fakes.enter_context(tempfile.TemporaryDirectory()),
+        AGENT_TRACE_LOG="0",
+    )
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+
+
+def pytest_unconfigure(config):
+    _fakes.close()
+
+
+@pytest.fixture(scope="session")
+def loop():
+    """One event loop for the session: the shared engine's pooled
+    connections belong to the loop that opened them."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    from database import engine
+
+    loop.run_until_complete(engine.dispose())
+    loop.close()
+
+
+@pytest.fixture
+def abench(benchmark, loop):
+    """benchmark for coroutine functions: abench(fn, *args, **kwargs)"""
+
+    def run(fn, *args, **kwargs):
+        return benchmark(lambda: loop.run_until_complete(fn(*args, **kwargs)))
+
+    return run
+
+
+@pytest.fixture
+def bench_db(abench):
+    """Benchmark fn(db) with a fresh session per round. With write=True the
+    session is a unit of work (CRUD writes only flush) and is rolled back."""
+    from database import AsyncSessionLocal
+
+    def run(fn, write: bool = False):
+        async def round_():
+            info = {"unit_of_work": True} if write else {}
+            async with AsyncSessionLocal(info=info) as db:
+                try:
+                    return await fn(db)
+                finally:
+                    if write:
+                        await db.rollback()
+
+        return abench(round_)
+
+    return run
+
+
+async def _cleanup() -> None:
+    from sqlalchemy import delete, select
+
+    from database import AsyncSessionLocal
+    from models.models import (
+        Goal,
+        GoalData,
+        GoalEvent,
+        GoalSkill,
+        Message,
+        ScheduledMessage,
+        Skill,
+        User,
+        UserPreference,
+    )
+
+    async with AsyncSessionLocal() as db:
+        users = select(User.id).where(User.telegram_id == BENCH_TELEGRAM_ID)
+        goals = select(Goal.id).where(Goal.user_id.in_(users))
+        skills = select(Skill.id).where(Skill.name.like("bench-%"))
+        await db.execute(delete(Message).where(Message.user_id.in_(users)))
+        await db.execute(delete(ScheduledMessage).where(ScheduledMessage.user_id.in_(users)))
+        await db.execute(delete(GoalEvent).where(GoalEvent.goal_id.in_(goals)))
+        await db.execute(
+            delete(GoalSkill).where(GoalSkill.goal_id.in_(goals) | GoalSkill.skill_id.in_(skills))
+        )
+        await db.execute(delete(GoalData).where(GoalData.goal_id.in_(goals)))
+        await db.execute(delete(Goal).where(Goal.id.in_(goals)))
+        await db.execute(delete(UserPreference).where(UserPreference.user_id.in_(users)))
+        await db.execute(delete(Skill).where(Skill.id.in_(skills)))
+        await db.execute(delete(User).where(User.telegram_id == BENCH_TELEGRAM_ID))
+        await db.commit()
+
+
+async def _seed() -> SimpleNamespace:
+    """A user the size of an engaged one: 3 goals (2 active) with 200
+    events each, 500 messages, pending check-ins and 20 skills."""
+    from database import AsyncSessionLocal
+    from models.models import (
+        Goal,
+        GoalData,
+        GoalEvent,
+        GoalSkill,
+        GoalStatus,
+        Message,
+        MessageRole,
+        ScheduledMessage,
+        Skill,
+        SkillCreatedBy,
+        User,
+        UserPreference,
+    )
+    from services.embeddings import skill_embedding_index, skill_text
+
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        user = User(telegram_id=BENCH_TELEGRAM_ID, timezone="Asia/Kolkata")
+        goals = [
+            Goal(user=user, title="Run a 5K", status=GoalStatus.active),
+            Goal(user=user, title="Read 24 books this year", status=GoalStatus.active),
+            Goal(user=user, title="Learn guitar chords", status=GoalStatus.completed),
+        ]
+        db.add(UserPreference(user=user, agent_data={"tone": "direct", "check_in_hour": 8}))
+        for goal in goals:
+            db.add(
+                GoalData(
+                    goal=goal,
+                    agent_data={
+                        "target_level": "beginner",
+                        "motivation": "health",
+                        "daily_minutes": 30,
+                        "check_in_frequency": "daily",
+                        "snapshot": {"current_streak": 12, "longest_streak": 21},
+                    },
+                )
+            )
+        skills = []
+        for i in range(20):
+            name, title = f"bench-skill-{i}", f"Bench coaching framework {i}"
+            description = f"Daily practice plan number {i} with weekly reviews."
+            metadata = {"category": "health", "intensity": "medium", "tracking_type": "numeric"}
+            skills.append(
+                Skill(
+                    name=name,
+                    title=title,
+                    description=description,
+                    skill_prompt=f"Coach the user through plan {i}. Track streaks weekly.",
+                    skill_metadata=metadata,
+                    created_by_type=SkillCreatedBy.agent if i % 2 else SkillCreatedBy.system,
+                    usage_count=i,
+                    embedding=skill_embedding_index.embed(
+                        skill_text(name, title, description, metadata)
+                    ),
+                    embedding_model=skill_embedding_index.encoder.name,
+                )
+            )
+        db.add_all(skills)
+        await db.flush()
+
+        for goal in goals:
+            db.add(GoalSkill(goal_id=goal.id, skill_id=skills[0].id, customizations={}))
+            db.add_all(
+                GoalEvent(
+                    goal_id=goal.id,
+                    ts=now - timedelta(hours=200 - i),
+                    type="milestone" if i % 25 == 0 else "check_in",
+                    payload={"value": i},
+                )
+                for i in range(200)
+            )
+        db.add_all(
+            Message(
+                user_id=user.id,
+                goal_id=goals[i % 2].id if i % 3 else None,
+                role=MessageRole.user if i % 2 == 0 else MessageRole.assistant,
+                content=f"Message {i}: ran **{i % 10} km** today, feeling good",
+                created_at=now - timedelta(minutes=500 - i),
+                updated_at=now - timedelta(minutes=500 - i),
+            )
+            for i in range(500)
+        )
+        db.add_all(
+            ScheduledMessage(
+                user_id=user.id,
+                goal_id=goals[0].id,
+                scheduled_for=now + timedelta(hours=i + 1),
+                message_content="Quick check-in: how did today go?",
+            )
+            for i in range(5)
+        )
+        await db.commit()
+        return SimpleNamespace(
+            user_id=user.id,
+            telegram_id=user.telegram_id,
+            goal_ids=[goal.id for goal in goals],
+            skill_ids=[skill.id for skill in skills],
+        )
+
+
+@pytest.fixture(scope="session")
+def bench_data(loop):
+    """The bench user's ids (user_id, telegram_id, goal_ids, skill_ids)."""
+    from services.catalog import skill_catalog
+
+    try:
+        loop.run_until_complete(_cleanup())
+    except (OSError, ConnectionError) as e:
+        pytest.skip(f"database not reachable: {e}")
+    data = loop.run_until_complete(_seed())
+    loop.run_until_complete(skill_catalog.start())
+    yield data
+    loop.run_until_complete(skill_catalog.stop())
+    loop.run_until_complete(_cleanup())
+
+
+@pytest.fixture(scope="session")
+def trigram(loop, bench_data):
+    """Skip benchmarks of queries that need the pg_trgm extension."""
+    from sqlalchemy import text
+
+    from database import AsyncSessionLocal
+
+    async def installed() -> bool:
+        async with AsyncSessionLocal() as db:
+            return bool(
+                await db.scalar(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))
+            )
+
+    if not loop.run_until_complete(installed()):
+        pytest.skip("pg_trgm extension not installed")
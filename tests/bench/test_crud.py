@@ -0,0 +1,192 @@
+"""BaseCRUD operations, SkillCRUD.search and MessageService.get_recent_messages."""
+
+from models.models import Message
+from services import goal_crud, goal_data_crud, message_crud
+from services.services import MessageService
+
+
+def test_create(bench_data, bench_db):
+    from models.models import MessageRole
+
+    async def create(db):
+        return await message_crud.create(
+            db, user_id=bench_data.user_id, role=MessageRole.user, content="Done for today"
+        )
+
+    assert bench_db(create, write=True).id
+
+
+def test_get(bench_data, bench_db):
+    goal_id = bench_data.goal_ids[0]
+    assert bench_db(lambda db: goal_crud.get(db, goal_id)).id == goal_id
+
+
+def test_get_by(bench_data, bench_db):
+    goal_id = bench_data.goal_ids[0]
+    assert bench_db(lambda db: goal_data_crud.get_by(db, goal_id=goal_id)).goal_id == goal_id
+
+
+def test_get_all(bench_data, bench_db):
+    user_id = bench_data.user_id
+    assert len(bench_db(lambda db: message_crud.get_all(db, limit=100, user_id=user_id))) == 100
+
+
+def test_update(bench_data, bench_db):
+    goal_id = bench_data.goal_ids[0]
+    assert bench_db(lambda db: goal_crud.update(db, goal_id, title="Run a 10K"), write=True)
+
+
+def test_update_by(bench_data, bench_db):
+    user_id = bench_data.user_id
+    assert bench_db(
+        lambda db: message_crud.update_by(db, {"user_id": user_id}, goal_id=None), write=True
+    ) == 500
+
+
+def test_jsonb_merge_deep_upsert(bench_data, bench_db):
+    from sqlalchemy import and_
+
+    from models.models import Goal
+
+    goal_id = bench_data.goal_ids[0]
+    patch = {"snapshot": {"current_streak": 13}, "last_check_in": "2026-10-19"}
+
+    async def merge(db):
+        return await goal_data_crud.jsonb_merge(
+            db,
+            goal_id,
+            "agent_data",
+            patch,
+            deep=True,
+            upsert_on="goal_id",
+            guard=and_(Goal.id == goal_id, Goal.user_id == bench_data.user_id),
+        )
+
+    assert bench_db(merge, write=True)["snapshot"]["longest_streak"] == 21
+
+
+def test_delete(bench_data, bench_db):
+    goal_id = bench_data.goal_ids[2]
+
+    async def delete(db):
+        from models.models import GoalData, GoalEvent, GoalSkill
+        from sqlalchemy import delete
+
+        for model in (GoalEvent, GoalSkill, GoalData):
+            await db.execute(delete(model).where(model.goal_id == goal_id))
+        return await goal_crud.delete(db, goal_id)
+
+    assert bench_db(delete, write=True)
+
+
+def test_delete_by(bench_data, bench_db):
+    user_id = bench_data.user_id
+    assert bench_db(lambda db: message_crud.delete_by(db, user_id=user_id), write=True) == 500
+
+
+def test_count(bench_data, bench_db):
+    user_id = bench_data.user_id
+    assert bench_db(lambda db: message_crud.count(db, user_id=user_id)) == 500
+
+
+def test_exists(bench_data, bench_db):
+    user_id = bench_data.user_id
+    assert bench_db(lambda db: goal_crud.exists(db, user_id=user_id))
+
+
+def test_skill_search(bench_data, trigram, bench_db):
+    from services import skill_crud
+
+    assert bench_db(lambda db: skill_crud.search(db, "coaching framework", limit=10))
+
+
+def test_get_recent_messages(bench_data, bench_db):
+    user_id = bench_data.user_id
+    messages = bench_db(lambda db: MessageService(db).get_recent_messages(user_id, limit=20))
+    assert len(messages) == 20
+
+
+def test_get_recent_messages_by_goal(bench_data, bench_db):
+    user_id, goal_id = bench_data.user_id, bench_data.goal_ids[0]
+    messages = bench_db(
+        lambda db: MessageService(db).get_recent_messages(user_id, limit=20, goal_id=goal_id)
+    )
+    assert len(messages) == 20
+
+
+def test_get_recent_rows(bench_data, bench_db):
+    user_id = bench_data.user_id
+    rows = bench_db(lambda db: message_crud.get_recent_rows(db, user_id, limit=200))
+    assert len(rows) == 200
+
+
+def test_iter_all(bench_data, bench_db):
+    user_id = bench_data.user_id
+
+    async def walk(db):
+        return [
+            m.id
+            async for m in message_crud.iter_all(
+                db, batch_size=100, order_by="-created_at", user_id=user_id
+            )
+        ]
+
+    assert len(bench_db(walk)) == 500
+
+
+def test_iter_all_columns(bench_data, bench_db):
+    user_id = bench_data.user_id
+
+    async def walk(db):
+        return [
+            row.id
+            async for row in message_crud.iter_all(
+                db,
+                batch_size=100,
+                order_by="-created_at",
+                columns=(Message.id,),
+                user_id=user_id,
+            )
+        ]
+
+    ids = bench_db(walk)
+    assert len(ids) == len(set(ids)) == 500
+
+
+def test_stream(bench_data, bench_db):
+    user_id = bench_data.user_id
+
+    async def walk(db):
+        return [m.id async for m in message_crud.stream(db, yield_per=100, user_id=user_id)]
+
+    assert len(bench_db(walk)) == 500
+
+
+def test_skill_usage_stop_keeps_increments_of_a_cancelled_flush(loop):
+    # stop() cancels the flush loop; a flush cancelled mid-write must put its
+    # increments back for the final flush instead of dropping them
+    import asyncio
+
+    from services.counters import SkillUsageCounter
+
+    counter = SkillUsageCounter(flush_interval=0.01, redis_url=None)
+    writing = asyncio.Event()
+    written = []
+
+    async def write(counts):
+        if not written:
+            written.append(None)
+            writing.set()
+            await asyncio.sleep(60)  # the first write hangs until cancelled
+        written.append(dict(counts))
+
+    counter._write = write
+
+    async def run():
+        await counter.start()
+        await counter.record(7, 3)
+        await writing.wait()
+        await counter.stop()
+
+    loop.run_until_complete(run())
+    assert written == [None, {7: 3}]
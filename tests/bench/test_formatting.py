@@ -0,0 +1,26 @@
+"""Telegram reply formatting: md_to_html and the streaming display text."""
+
+from app_telegram import _build_display
+from telegram_client import md_to_html
+
+REPLY = (
+    "**Great week!** You ran *4 times* and hit `12.5 km` total.\n\n"
+    "- Monday: 3 km <easy pace>\n- Wednesday: 3.5 km & hills\n"
+    "- Saturday: **6 km** long run\n\n"
+    "Next: keep the *streak* going & plan Sunday's `recovery` walk."
+) * 4
+LONG_REPLY = REPLY * 6
+
+
+def test_md_to_html(benchmark):
+    assert "<b>Great week!</b>" in benchmark(md_to_html, REPLY)
+
+
+def test_build_display(benchmark):
+    tools = ["list_goals", "get_goal_events", "get_recent_messages"]
+    text = benchmark(_build_display, REPLY, tools, ["update_goal_data"])
+    assert text.startswith("🔧 Tools: list_goals")
+
+
+def test_build_display_truncated(benchmark):
+    assert len(benchmark(_build_display, LONG_REPLY, ["list_goals"], [])) <= 4096
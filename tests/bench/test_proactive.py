@@ -0,0 +1,8 @@
+"""ProactiveAgent.build_context: everything a check-in decision reads."""
+
+from ai.proactive_agent import ProactiveAgent
+
+
+def test_build_context(bench_data, abench):
+    context = abench(ProactiveAgent().build_context, bench_data.user_id)
+    assert len(context["active_goals"]) == 2
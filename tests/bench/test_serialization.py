@@ -0,0 +1,112 @@
+"""services.serialization dumps/loads on typical tool, prompt and API payloads,
+with orjson and with the stdlib fallback."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.models import GoalStatus, MessageRole
+from services.read_models import MessageRow
+from services import serialization
+from services.serialization import dumps, loads
+
+NOW = datetime(2026, 10, 19, 8, 30)
+AGENT_DATA = {
+    "target_level": "beginner",
+    "daily_minutes": 30,
+    "snapshot": {"current_streak": 12, "longest_streak": 21, "last_check_in": "2026-10-18"},
+    "weekly_summaries": [
+        {"week": f"2026-W{w}", "sessions": 4, "km": 14.5, "notes": "Felt strong on hills"}
+        for w in range(30, 42)
+    ],
+}
+
+PAYLOADS = {
+    # list_goals
+    "goals": [
+        {
+            "id": i,
+            "title": f"Goal {i}",
+            "status": GoalStatus.active,
+            "created_at": NOW - timedelta(days=30),
+            "updated_at": NOW,
+            "data": AGENT_DATA,
+        }
+        for i in range(8)
+    ],
+    # get_recent_messages
+    "messages": [
+        MessageRow(
+            MessageRole.user if i % 2 else MessageRole.assistant,
+            "Ran 3 km this morning, legs are a bit sore but the streak is alive. " * 3,
+            None,
+            NOW - timedelta(minutes=i),
+        )
+        for i in range(50)
+    ],
+    # ProactiveAgent.build_context
+    "proactive_context": {
+        "user_id": 1,
+        "current_datetime": NOW,
+        "active_goals": [
+            {
+                "id": i,
+                "title": f"Goal {i}",
+                "created_at": NOW,
+                "data": AGENT_DATA,
+                "recent_events": [
+                    {"type": "check_in", "timestamp": NOW, "distance_km": 3.2}
+                ]
+                * 10,
+            }
+            for i in range(3)
+        ],
+        "recent_messages": [
+            {"role": MessageRole.user, "content": "Done for today", "created_at": NOW}
+        ]
+        * 20,
+        "user_preferences": {"tone": "gentle", "quiet_hours": [22, 7]},
+    },
+    # Exa /search response
+    "exa_response": {
+        "results": [
+            {
+                "title": f"Result {i}",
+                "url": f"https://example.com/{i}",
+                "publishedDate": "2026-10-01",
+                "text": "Interval training improves running economy. " * 230,
+            }
+            for i in range(5)
+        ]
+    },
+}
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_dumps(benchmark, backend, payload):
+    assert benchmark(dumps, PAYLOADS[payload])
+
+
+@pytest.mark.parametrize("payload", ["goals", "proactive_context", "exa_response"])
+def test_loads(benchmark, backend, payload):
+    text = dumps(PAYLOADS[payload])
+    assert benchmark(loads, text)
+
+
+def test_backends_agree(monkeypatch):
+    if serialization.orjson is None:
+        pytest.skip("orjson not installed")
+    # Read models (dataclasses) are left out: orjson keeps their field order
+    plain = ["goals", "proactive_context", "exa_response"]
+    encoded = [dumps(PAYLOADS[name]) for name in plain]
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert encoded == [dumps(PAYLOADS[name]) for name in plain]
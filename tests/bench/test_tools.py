@@ -0,0 +1,289 @@
+"""
+Each llm_tools tool body, invoked directly (no LLM) the way the Agents SDK
+runs a tool call: in a fresh AgentContext per round, whose writes are
+rolled back. Queries of the cached search tools change every round, so
+the search itself is measured rather than the cache.
+"""
+
+import itertools
+import json
+
+import pytest
+
+from ai import llm_tools
+from ai.context import AgentContext
+
+
+class _Rollback(Exception):
+    """Raised at the end of a round so AgentContext rolls its writes back."""
+
+
+async def _invoke(context, tool, **kwargs):
+    from agents.tool_context import ToolContext
+
+    arguments = json.dumps(kwargs)
+    tool_context = ToolContext(
+        context=context,
+        tool_name=tool.name,
+        tool_call_id=f"bench-{tool.name}",
+        tool_arguments=arguments,
+    )
+    return await tool.on_invoke_tool(tool_context, arguments)
+
+
+async def _call(user_id: int, tool, kwargs: dict):
+    try:
+        async with AgentContext(user_id=str(user_id)) as context:
+            raise _Rollback(await _invoke(context, tool, **kwargs))
+    except _Rollback as done:
+        return done.args[0]
+
+
+# tool -> (arguments for round n, needs pg_trgm)
+TOOL_CALLS = {
+    "update_user_preferences": (
+        lambda d, n: {"data_json": json.dumps({"tone": "gentle", "round": n}), "deep_merge": True},
+        False,
+    ),
+    "list_goals": (lambda d, n: {}, False),
+    "get_goal": (lambda d, n: {"goal_id": d.goal_ids[0]}, False),
+    "get_goal_data": (lambda d, n: {"goal_id": d.goal_ids[0]}, False),
+    "update_goal_data": (
+        lambda d, n: {
+            "goal_id": d.goal_ids[0],
+            "data_json": json.dumps({"snapshot": {"current_streak": 13}}),
+            "deep_merge": True,
+        },
+        False,
+    ),
+    "append_goal_event": (
+        lambda d, n: {
+            "goal_id": d.goal_ids[0],
+            "event_json": json.dumps({"type": "check_in", "distance_km": 3.2}),
+        },
+        False,
+    ),
+    "get_goal_events": (lambda d, n: {"goal_id": d.goal_ids[0], "limit": 20}, False),
+    "send_message": (
+        lambda d, n: {"content": "Quick check-in: how did **today** go?", "goal_id": d.goal_ids[0]},
+        False,
+    ),
+    "get_recent_messages": (lambda d, n: {"limit": 20}, False),
+    "search_skills": (lambda d, n: {"query": f"coaching framework {n}", "top_k": 3}, True),
+    "get_skill": (lambda d, n: {"skill_id": d.skill_ids[1]}, False),
+    "create_skill": (
+        lambda d, n: {
+            "name": f"bench-new-{n}",
+            "title": f"Bench new skill {n}",
+            "description": "Evening reading habit with a weekly page target.",
+            "skill_prompt": f"Coach the user to read every evening. Variant {n}.",
+            "metadata_json": json.dumps({"category": "wisdom", "intensity": "low"}),
+        },
+        True,
+    ),
+    "update_skill": (
+        lambda d, n: {"skill_id": d.skill_ids[1], "description": "Updated practice plan."},
+        False,
+    ),
+    "link_goal_to_skill": (
+        lambda d, n: {"goal_id": d.goal_ids[1], "skill_id": d.skill_ids[2]},
+        False,
+    ),
+    "get_goal_skill": (lambda d, n: {"goal_id": d.goal_ids[0]}, False),
+    "create_goal": (lambda d, n: {"title": "Drink 2L of water daily"}, False),
+    "update_goal_status": (lambda d, n: {"goal_id": d.goal_ids[0], "status": "paused"}, False),
+    "read_reference_doc": (lambda d, n: {"doc_name": "skills", "section": "Skill Anatomy"}, False),
+    "search_web": (lambda d, n: {"query": f"beginner 5k training plan {n}"}, False),
+}
+
+
+def test_every_tool_is_benchmarked():
+    tools = {
+        name
+        for name, value in vars(llm_tools).items()
+        if type(value).__name__ == "FunctionTool"
+    }
+    assert tools == set(TOOL_CALLS)
+
+
+@pytest.mark.parametrize("name", TOOL_CALLS)
+def test_tool(name, request, bench_data, abench):
+    arguments, needs_trigram = TOOL_CALLS[name]
+    if needs_trigram:
+        request.getfixturevalue("trigram")
+    tool = getattr(llm_tools, name)
+    rounds = itertools.count()
+
+    async def round_():
+        return await _call(bench_data.user_id, tool, arguments(bench_data, next(rounds)))
+
+    result = abench(round_)
+    # The SDK turns tool exceptions into an error string for the model
+    assert not str(result).startswith("An error occurred"), result
+
+
+@pytest.mark.parametrize("name", [tool.name for tool in llm_tools.READ_ONLY_TOOLS])
+def test_read_only_tool_never_writes(name, request, monkeypatch, bench_data, loop):
+    # Read-only tools may run in parallel only as long as none of them takes
+    # the run's write session
+    arguments, needs_trigram = TOOL_CALLS[name]
+    if needs_trigram:
+        request.getfixturevalue("trigram")
+
+    def db(self, goal_id=None):
+        raise AssertionError(f"{name} opened the run's write session")
+
+    monkeypatch.setattr(AgentContext, "db", db)
+    tool = getattr(llm_tools, name)
+    result = loop.run_until_complete(_call(bench_data.user_id, tool, arguments(bench_data, 0)))
+    assert not str(result).startswith("An error occurred"), result
+
+
+def test_send_message_joins_the_run(bench_data, monkeypatch, loop):
+    # A message about a goal created earlier in the same run is written in
+    # the run's transaction, and only reaches Telegram once that commits
+    import telegram_client
+    from sqlalchemy import delete, select
+
+    from database import AsyncSessionLocal
+    from models.models import Goal, Message, ScheduledMessage
+
+    sent = []
+
+    async def send_telegram_message(chat_id, text, parse_mode="HTML"):
+        sent.append(text)
+
+    monkeypatch.setattr(telegram_client, "send_telegram_message", send_telegram_message)
+
+    async def run(commit: bool):
+        async with AgentContext(user_id=str(bench_data.user_id)) as context:
+            goal_id = await _invoke(context, llm_tools.create_goal, title="Stretch daily")
+            for is_scheduled in (False, True):
+                result = await _invoke(
+                    context,
+                    llm_tools.send_message,
+                    content=f"Goal {goal_id} set",
+                    goal_id=int(goal_id),
+                    is_scheduled=is_scheduled,
+                )
+                assert not str(result).startswith("An error occurred"), result
+            assert sent == []
+            if not commit:
+                raise _Rollback()
+        return int(goal_id)
+
+    async def rows(goal_id):
+        async with AsyncSessionLocal() as db:
+            messages = await db.scalars(select(Message.content).where(Message.goal_id == goal_id))
+            scheduled = await db.scalars(
+                select(ScheduledMessage.id).where(ScheduledMessage.goal_id == goal_id)
+            )
+            return list(messages), list(scheduled)
+
+    async def cleanup(goal_id):
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Message).where(Message.goal_id == goal_id))
+            await db.execute(delete(ScheduledMessage).where(ScheduledMessage.goal_id == goal_id))
+            await db.execute(delete(Goal).where(Goal.id == goal_id))
+            await db.commit()
+
+    goal_id = loop.run_until_complete(run(commit=True))
+    try:
+        messages, scheduled = loop.run_until_complete(rows(goal_id))
+        assert messages == [f"Goal {goal_id} set"] and len(scheduled) == 1
+        assert sent == [f"Goal {goal_id} set"]
+    finally:
+        loop.run_until_complete(cleanup(goal_id))
+
+    sent.clear()
+    with pytest.raises(_Rollback):
+        loop.run_until_complete(run(commit=False))
+    assert sent == []
+
+
+def test_skill_write_elsewhere_drops_cached_searches(bench_data, loop):
+    # Another process's skill write reaches this one's search cache through
+    # the catalog's NOTIFY, with or without a shared Redis generation
+    import asyncio
+
+    from database import AsyncSessionLocal
+    from services import skill_search_cache
+    from services.catalog import skill_catalog
+
+    if skill_catalog._listener is None:
+        pytest.skip("skill catalog LISTEN not available")
+
+    async def check():
+        generation = await skill_search_cache.generation()
+        await skill_search_cache.set("notify-check", [1], generation=generation)
+        assert await skill_search_cache.get("notify-check") == [1]
+
+        async with AsyncSessionLocal() as db:
+            await skill_catalog.notify(db, bench_data.skill_ids[0])
+            await db.commit()
+        for _ in range(50):
+            if await skill_search_cache.get("notify-check") is None:
+                break
+            await asyncio.sleep(0.02)
+        assert await skill_search_cache.get("notify-check") is None
+
+        # A search that started before the change is not cached after it
+        await skill_search_cache.set("notify-check", [1], generation=generation)
+        assert await skill_search_cache.get("notify-check") is None
+
+    loop.run_until_complete(check())
+
+
+def test_goal_event_payload_cannot_shadow_event_fields(bench_data, loop):
+    from models.models import GoalEvent
+
+    goal_id = bench_data.goal_ids[0]
+
+    async def read():
+        try:
+            async with AgentContext(user_id=str(bench_data.user_id)) as context:
+                async with context.db(goal_id=goal_id) as db:
+                    event = GoalEvent(
+                        goal_id=goal_id,
+                        type="check_in",
+                        payload={"id": -1, "type": "forged", "timestamp": "never", "km": 3},
+                    )
+                    db.add(event)
+                    await db.flush()
+                result = await _invoke(context, llm_tools.get_goal_events, goal_id=goal_id, limit=1)
+                raise _Rollback(event.id, json.loads(result)["events"][0])
+        except _Rollback as done:
+            return done.args
+
+    event_id, event = loop.run_until_complete(read())
+    assert event["id"] == event_id and event["type"] == "check_in"
+    assert event["timestamp"] != "never" and event["km"] == 3
+
+
+def test_queries_saved_counts_cache_hits_only(bench_data, loop):
+    from sqlalchemy import event
+
+    from database import AsyncSessionLocal, engine
+
+    goal_id = bench_data.goal_ids[0]
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    async def lookups():
+        context = AgentContext(user_id=str(bench_data.user_id))
+        async with AsyncSessionLocal() as db:
+            await context.get_goal(db, goal_id)  # loads the cache: not a saving
+            assert context.queries_saved == 0
+            await context.get_goal(db, goal_id)
+            await context.get_goal_data(db, goal_id)
+        return context.queries_saved
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    try:
+        saved = loop.run_until_complete(lookups())
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count)
+    assert len(statements) == 1
+    assert saved == 2
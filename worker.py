@@ -5,14 +5,22 @@ Background job processing for proactive agent check-ins
 
 import logging
 import os
+import time
+from functools import partial
 
 from arq import cron, create_pool
 from arq.connections import RedisSettings
-from sqlalchemy import select
+from arq.constants import default_queue_name
 
 from ai.proactive_agent import ProactiveAgent
-from database import AsyncSessionLocal
+from database import WORKER_MAX_JOBS, ReadSessionLocal
 from models.models import User, Goal, GoalStatus
+from services.catalog import skill_catalog
+from services.counters import skill_usage
+from services.web_search import exa_client
+from services import sql_profiler, user_crud
+from tasks.message_archive import archive_messages
+import metrics
 
 # Configure logging
 logging.basicConfig(
@@ -23,13 +31,31 @@ logger = logging.getLogger(__name__)
 
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
 REDIS_SETTINGS = RedisSettings(host=REDIS_HOST, port=6379, database=0)
+# Port for the Prometheus /metrics endpoint (0 disables it)
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "9101"))
+
+QUEUE_DEPTH = metrics.gauge(
+    "arq_queue_jobs", "Jobs in the arq queue: ready to run now, or all queued", ("state",)
+)
+QUEUE_LAG_MS = metrics.histogram(
+    "arq_job_queue_lag_ms",
+    "Time from when a job was due to when a worker started it",
+    buckets=metrics.LATENCY_BUCKETS_MS + (120000, 300000, 600000),
+)
+
+
+async def _collect_queue_depth(redis) -> None:
+    now_ms = int(time.time() * 1000)
+    QUEUE_DEPTH.set(await redis.zcard(default_queue_name), state="queued")
+    QUEUE_DEPTH.set(await redis.zcount(default_queue_name, "-inf", now_ms), state="ready")
 
 
 async def run_proactive_checkin(ctx: dict, user_id: int) -> dict:
     """Run proactive evaluation for a single user. Enqueued per-user or by cron."""
     logger.info(f"Running proactive check-in for user {user_id}")
     agent = ProactiveAgent()
-    return await agent.run(user_id)
+    with sql_profiler.query_scope(f"run_proactive_checkin (user {user_id})"):
+        return await agent.run(user_id)
 
 
 async def run_all_proactive_checkins(ctx: dict) -> None:
@@ -39,31 +65,47 @@ async def run_all_proactive_checkins(ctx: dict) -> None:
         logger.error("Redis not in ctx - cannot enqueue jobs")
         return
 
-    async with AsyncSessionLocal() as db:
-        result = await db.execute(
-            select(User.id)
-            .join(Goal, Goal.user_id == User.id)
-            .where(Goal.status == GoalStatus.active, User.is_active)
-            .distinct()
-        )
-        user_ids = [r[0] for r in result.fetchall()]
-        logger.info(f"Found {len(user_ids)} users with active goals")
+    enqueued = 0
+    async with ReadSessionLocal() as db:
+        # Keyset walk a batch of user ids at a time: flat memory and no long
+        # open cursor while enqueueing, however many users there are
+        async for user in user_crud.iter_all(
+            db,
+            User.goals.any(Goal.status == GoalStatus.active),
+            columns=(User.id,),
+            is_active=True,
+        ):
+            await redis.enqueue_job("run_proactive_checkin", user.id)
+            enqueued += 1
+    logger.info(f"Enqueued proactive check-ins for {enqueued} users with active goals")
+
 
-    for uid in user_ids:
-        await redis.enqueue_job("run_proactive_checkin", uid)
-    logger.info(f"Enqueued proactive check-ins for {len(user_ids)} users")
+async def on_job_start(ctx: dict) -> None:
+    # score is when the job was due (ms); later for deferred jobs than enqueue_time
+    QUEUE_LAG_MS.observe(max(time.time() * 1000 - ctx["score"], 0))
 
 
 async def startup(ctx: dict) -> None:
-    """Add redis pool to ctx for enqueueing from within jobs."""
+    """Add redis pool to ctx for enqueueing from within jobs; preload skills,
+    start batching skill usage counts and serve metrics."""
     ctx["redis"] = await create_pool(REDIS_SETTINGS)
+    sql_profiler.start()
+    await skill_catalog.start()
+    await skill_usage.start()
+    metrics.add_collector(partial(_collect_queue_depth, ctx["redis"]))
+    await metrics.start_server(WORKER_METRICS_PORT)
 
 
 async def shutdown(ctx: dict) -> None:
-    """Close redis connection."""
+    """Flush skill usage counts and close redis, skill catalog and Exa connections."""
+    await metrics.stop_server()
     redis = ctx.get("redis")
     if redis:
         await redis.close()
+    await skill_usage.stop()
+    await skill_catalog.stop()
+    await exa_client.close()
+    sql_profiler.stop()
 
 
 class WorkerSettings:
@@ -71,7 +113,13 @@ class WorkerSettings:
     cron_jobs = [
         # Every 2 min for testing (prod: hour=set(range(0, 24, 2)), minute=0)
         cron(run_all_proactive_checkins, minute=set(range(0, 60, 2))),
+        # Daily: message partitions ahead; with retention on, cold months
+        # are summarized, exported and dropped
+        cron(archive_messages, hour=3, minute=30, timeout=3600),
     ]
     redis_settings = REDIS_SETTINGS
+    # The DB pool is sized from this too (database.py)
+    max_jobs = WORKER_MAX_JOBS
     on_startup = startup
     on_shutdown = shutdown
+    on_job_start = on_job_start